@@ -25,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "LibraryProject.middleware.QueryMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,6 +35,15 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Request metrics (see LibraryProject.middleware.QueryMetricsMiddleware)
+# Each worker writes its per-route aggregates to DIR every FLUSH_INTERVAL
+# seconds; `python manage.py dump_request_metrics` merges and prints them.
+REQUEST_METRICS = {
+    "DIR": BASE_DIR / "request_metrics",
+    "FLUSH_INTERVAL": 10,
+    "SERVER_TIMING": True,
+}
+
 ROOT_URLCONF = "LibraryProject.urls"
 
 TEMPLATES = [
@@ -60,8 +70,20 @@ WSGI_APPLICATION = "LibraryProject.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # django.db.backends.sqlite3 plus per-connection PRAGMAs (WAL,
+        # synchronous=NORMAL, mmap, cache size, busy timeout); override them
+        # with OPTIONS["pragmas"], see LibraryProject.sqlite_backend.base
+        "ENGINE": "LibraryProject.sqlite_backend",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Reuse connections across requests. Under ASGI the async ORM uses a
+        # new thread, and so a new connection, per request: set this to 0.
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Take the write lock at BEGIN (waiting up to busy_timeout), so a
+            # transaction never fails when it turns from reading to writing
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
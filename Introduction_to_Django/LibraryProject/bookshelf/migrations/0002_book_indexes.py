@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookshelf', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title'], name='bookshelf_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'title'], name='bookshelf_author_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year'], name='bookshelf_pub_year_idx'),
+        ),
+    ]
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LibraryProject.settings')
 
 application = get_asgi_application()
+
+# Compile templates now rather than on the first requests (WARM_TEMPLATES)
+from LibraryProject.template_warmup import warm_templates_on_startup  # noqa: E402
+
+warm_templates_on_startup()
@@ -0,0 +1,206 @@
+"""
+Read-replica routing for the catalog read paths.
+
+ReplicaRouter sends every write to the primary database. Reads go to a
+replica only inside replica_reads() blocks, which the book list and
+library detail views open (the read_from_replica decorator in
+relationship_app.views). Everything else, such as session and
+permission lookups, reads from the primary.
+
+Read-your-writes: a request that writes is marked by
+ReplicaPinMiddleware, and for the next STICKY_SECONDS that client's
+reads also go to the primary. A client is identified by its
+Authorization header and by its session cookie. Set
+STICKY_SECONDS above the replicas' worst lag. Other clients may see a
+lagging replica until it catches up. A cached fragment rendered from
+such a read (relationship_app.catalog) can outlive the lag, so keep
+replicas close behind.
+
+Configuration (settings.REPLICA_ROUTER):
+    PRIMARY: Alias that takes writes (default "default")
+    REPLICAS: Aliases to spread reads over (default [], i.e. routing is off)
+    STICKY_SECONDS: Read-your-writes window (default 5)
+
+The pins live in the default cache; use a shared backend when running
+several workers.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.template.response import SimpleTemplateResponse
+
+DEFAULTS = {
+    "PRIMARY": "default",
+    "REPLICAS": [],
+    "STICKY_SECONDS": 5,
+}
+PIN_KEY_PREFIX = "db_router:pin:"
+
+
+def get_router_settings():
+    return {**DEFAULTS, **getattr(settings, "REPLICA_ROUTER", {})}
+
+
+class RoutingState:
+    """What the router knows about the current request."""
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica_reads = False
+        self.replica = None
+
+
+_state = ContextVar("db_router_state", default=None)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Let reads in this block go to a replica (outside requests, a no-op).
+
+    replica_reads(False) sends the reads in a block back to the primary,
+    e.g. to fill a cache that must not pick up a lagging row.
+    """
+    state = _state.get()
+    if state is None:
+        yield
+        return
+    previous = state.replica_reads
+    state.replica_reads = enabled
+    try:
+        yield
+    finally:
+        state.replica_reads = previous
+
+
+def read_from_replica(view_func):
+    """
+    View decorator running the whole view inside replica_reads().
+
+    A TemplateResponse is rendered before leaving the block, so that the
+    lazy querysets in its context read from the replica too.
+    """
+    if iscoroutinefunction(view_func):
+        async def wrapper(*args, **kwargs):
+            with replica_reads():
+                response = await view_func(*args, **kwargs)
+                if _needs_render(response):
+                    await sync_to_async(response.render)()
+                return response
+    else:
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                response = view_func(*args, **kwargs)
+                if _needs_render(response):
+                    response.render()
+                return response
+    return wraps(view_func)(wrapper)
+
+
+def _needs_render(response):
+    return isinstance(response, SimpleTemplateResponse) and not response.is_rendered
+
+
+class ReplicaRouter:
+    """Database router: writes to PRIMARY, opted-in reads to REPLICAS."""
+
+    def db_for_read(self, model, **hints):
+        conf = get_router_settings()
+        state = _state.get()
+        if (
+            state is None
+            or not state.replica_reads
+            or state.pinned
+            or state.wrote
+            or not conf["REPLICAS"]
+        ):
+            return conf["PRIMARY"]
+        if state.replica is None:
+            # One replica per request, so its reads agree with each other
+            state.replica = random.choice(conf["REPLICAS"])
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return get_router_settings()["PRIMARY"]
+
+    def allow_relation(self, obj1, obj2, **hints):
+        conf = get_router_settings()
+        aliases = {conf["PRIMARY"], *conf["REPLICAS"]}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def pin_key(credential):
+    digest = hashlib.sha256(credential.encode("utf-8")).hexdigest()
+    return f"{PIN_KEY_PREFIX}{digest}"
+
+
+class ReplicaPinMiddleware:
+    """
+    Track writes per request and pin the writing client to the primary.
+
+    Put it near the top of MIDDLEWARE, so that writes made by the
+    middleware below it (such as saving the session) are seen too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def get_credentials(self, request, response=None):
+        credentials = [
+            request.headers.get("Authorization"),
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME),
+        ]
+        if response is not None and settings.SESSION_COOKIE_NAME in response.cookies:
+            # A new session (e.g. after logging in) belongs to the same client
+            credentials.append(response.cookies[settings.SESSION_COOKIE_NAME].value)
+        return [credential for credential in credentials if credential]
+
+    def start(self, request):
+        keys = [pin_key(credential) for credential in self.get_credentials(request)]
+        pinned = bool(keys) and bool(cache.get_many(keys))
+        return _state.set(RoutingState(pinned=pinned))
+
+    def finish(self, request, response, state):
+        if state.wrote:
+            timeout = get_router_settings()["STICKY_SECONDS"]
+            keys = [pin_key(c) for c in self.get_credentials(request, response)]
+            if keys and timeout:
+                cache.set_many(dict.fromkeys(keys, True), timeout=timeout)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = _state.get()
+            _state.reset(token)
+        return self.finish(request, response, state)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = _state.get()
+            _state.reset(token)
+        return self.finish(request, response, state)
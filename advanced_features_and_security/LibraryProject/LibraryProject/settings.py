@@ -61,10 +61,35 @@ WSGI_APPLICATION = "LibraryProject.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # django.db.backends.sqlite3 plus per-connection PRAGMAs (WAL,
+        # synchronous=NORMAL, mmap, cache size, busy timeout); override them
+        # with OPTIONS["pragmas"], see LibraryProject.sqlite_backend.base
+        "ENGINE": "LibraryProject.sqlite_backend",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Reuse connections across requests. Under ASGI the async ORM uses a
+        # new thread, and so a new connection, per request: set this to 0.
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Take the write lock at BEGIN (waiting up to busy_timeout), so a
+            # transaction never fails when it turns from reading to writing
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
+# Stand-in read replica: a second SQLite file. Point it at a real replica
+# and list it in REPLICA_ROUTER["REPLICAS"] to move catalog reads there.
+DATABASES["replica"] = {**DATABASES["default"], "NAME": BASE_DIR / "db-replica.sqlite3"}
+
+# Writes go to PRIMARY; the book list and library detail views read from
+# REPLICAS, except for clients that wrote in the last STICKY_SECONDS (see
+# LibraryProject.db_router). No REPLICAS means every query uses PRIMARY.
+DATABASE_ROUTERS = ["LibraryProject.db_router.ReplicaRouter"]
+REPLICA_ROUTER = {
+    "PRIMARY": "default",
+    "REPLICAS": [],
+    "STICKY_SECONDS": 5,
+}
 
 
 # Password validation
@@ -117,6 +142,8 @@ SECURE_CONTENT_TYPE_NOSNIFF = True
 CSRF_COOKIE_SECURE = True
 SESSION_COOKIE_SECURE = True
 MIDDLEWARE = [
+    'LibraryProject.middleware.QueryMetricsMiddleware',
+    'LibraryProject.db_router.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -126,6 +153,36 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'LibraryProject.middleware.CSPMiddleware',
 ]
+
+# Request metrics (see LibraryProject.middleware.QueryMetricsMiddleware)
+# Each worker writes its per-route aggregates to DIR every FLUSH_INTERVAL
+# seconds; `python manage.py dump_request_metrics` merges and prints them.
+REQUEST_METRICS = {
+    'DIR': BASE_DIR / 'request_metrics',
+    'FLUSH_INTERVAL': 10,
+    'SERVER_TIMING': True,
+}
+
+# Cache
+# Role lookups (relationship_app.roles), permission sets
+# (bookshelf.backends) and rendered book lists (relationship_app.catalog)
+# live here. Point this at a shared backend (memcached/redis) when running
+# more than one worker process; until then the *_CACHE_TIMEOUT settings
+# bound how long another worker can serve stale data.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-project',
+    }
+}
+ROLE_CACHE_TIMEOUT = 300
+CATALOG_CACHE_TIMEOUT = 3600
+
+# Permission checks read each user's permission set from the cache above
+# (see bookshelf.backends) instead of joining groups and permissions on
+# every request.
+AUTHENTICATION_BACKENDS = ['bookshelf.backends.CachedPermissionBackend']
+PERMISSION_CACHE_TIMEOUT = 300
 SECURE_SSL_REDIRECT = True
 SECURE_HSTS_SECONDS = 31536000
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
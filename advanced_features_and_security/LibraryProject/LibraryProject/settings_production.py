@@ -0,0 +1,22 @@
+"""
+Production settings for LibraryProject.
+
+Everything from settings.py, plus template loading tuned for long-lived
+workers:
+
+* with DEBUG off, Django wraps the default loaders (filesystem and, as
+  APP_DIRS is on, app directories) in its cached loader, so each
+  template is read and parsed once per process;
+* WARM_TEMPLATES lists the apps whose templates wsgi.py / asgi.py
+  compile at startup (see LibraryProject.template_warmup), so the first
+  requests after a worker boots don't pay for parsing.
+
+Use it with DJANGO_SETTINGS_MODULE=LibraryProject.settings_production.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# The cached template loader depends on it
+DEBUG = False
+
+WARM_TEMPLATES = ["relationship_app", "bookshelf"]
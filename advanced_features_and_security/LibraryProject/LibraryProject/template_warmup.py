@@ -0,0 +1,55 @@
+"""
+Compile templates ahead of the first request.
+
+With the cached template loader every template is parsed the first time
+it is rendered in a process. warm_templates() loads every template under
+the given apps' templates/ directories up front, through each configured
+engine, so that cost is paid while the worker boots. wsgi.py and asgi.py
+call warm_templates_on_startup(), which does nothing unless
+settings.WARM_TEMPLATES lists some apps.
+"""
+
+import logging
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_names(app_label):
+    """Return the names of the templates in an app's templates/ directory."""
+    directory = Path(apps.get_app_config(app_label).path) / "templates"
+    return sorted(
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob("*")
+        if path.is_file()
+    )
+
+
+def warm_templates(app_labels):
+    """
+    Load every template of `app_labels` and return how many were loaded.
+
+    A template that fails to compile is logged and skipped; it fails the
+    same way when a request renders it, as it would without warming.
+    """
+    names = [name for label in app_labels for name in get_template_names(label)]
+    loaded = 0
+    for engine in engines.all():
+        for name in names:
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError:
+                logger.exception("Could not compile template %s", name)
+            else:
+                loaded += 1
+    return loaded
+
+
+def warm_templates_on_startup():
+    app_labels = getattr(settings, "WARM_TEMPLATES", ())
+    if app_labels:
+        warm_templates(app_labels)
@@ -0,0 +1,10 @@
+"""
+Stand-alone benchmarks for LibraryProject.
+
+Run from the LibraryProject directory, e.g.:
+
+    python -m benchmarks.bench_query_samples --names 10000
+
+Each benchmark builds its own throwaway SQLite database, so it never
+touches db.sqlite3.
+"""
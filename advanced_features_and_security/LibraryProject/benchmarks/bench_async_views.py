@@ -0,0 +1,204 @@
+"""
+Throughput of the sync views under WSGI against their async variants
+under ASGI, at several levels of client concurrency.
+
+Requests go through Django's real WSGIHandler (called from a thread pool,
+like a threaded WSGI server) and ASGIHandler (one event loop, one task
+per client), with the full middleware stack but without a network
+server. Fragment caching is disabled (DummyCache) so every request
+reads the database. --latency adds a sleep to every query to stand in
+for a database across the network, where async views pay off most.
+
+    python -m benchmarks.bench_async_views --books 20000 --clients 1 8 32 --latency 0 2
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import fill_catalog, print_table, setup_django
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, nargs="+", default=[0, 2],
+                        help="Milliseconds added to every query")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--wsgi-threads", type=int, default=8)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+class QueryLatency:
+    """execute_wrapper that sleeps before every query."""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.seconds:
+            time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+
+def split_url(url):
+    path, _, query = url.partition("?")
+    return path, query
+
+
+def wsgi_get(application, url):
+    path, query = split_url(url)
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "443",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.url_scheme": "https",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    status = []
+    body = application(environ, lambda code, headers: status.append(int(code.split()[0])))
+    size = sum(len(chunk) for chunk in body)
+    body.close()
+    return status[0], size
+
+
+async def asgi_get(application, url):
+    path, query = split_url(url)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 443),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            # Wait for a disconnect that never comes; the handler cancels us
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)
+    size = sum(len(m.get("body", b"")) for m in messages if m["type"] == "http.response.body")
+    return messages[0]["status"], size
+
+
+def run_wsgi(application, url, clients, total, threads):
+    # A threaded WSGI server serves at most `threads` requests at once,
+    # however many clients are waiting
+    with ThreadPoolExecutor(max_workers=min(clients, threads)) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda _: wsgi_get(application, url), range(total)))
+        elapsed = time.perf_counter() - start
+    return elapsed, results
+
+
+def run_asgi(application, url, clients, total):
+    async def client(count):
+        return [await asgi_get(application, url) for _ in range(count)]
+
+    async def main():
+        counts = [total // clients + (n < total % clients) for n in range(clients)]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client(count) for count in counts))
+        return time.perf_counter() - start, [r for batch in results for r in batch]
+
+    return asyncio.run(main())
+
+
+def run(args):
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test import override_settings
+    from django.urls import reverse
+
+    from relationship_app.models import Book, Library
+
+    fill_catalog(args.books // 100, books_per_author=100)
+    library = Library.objects.create(name="Everything")
+    Through = Library.books.through
+    Through.objects.bulk_create(
+        Through(library_id=library.pk, book_id=pk)
+        for pk in Book.objects.values_list("pk", flat=True)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    connection.close()
+
+    latency = QueryLatency()
+    connection_created.connect(
+        lambda sender, connection, **kwargs: connection.execute_wrappers.append(latency),
+        weak=False,
+    )
+    settings.DEBUG = False
+
+    cases = [
+        ("list_books", reverse("list_books"), reverse("list_books_async")),
+        (
+            "library detail",
+            reverse("library_detail", kwargs={"pk": library.pk}),
+            reverse("library_detail_async", kwargs={"pk": library.pk}),
+        ),
+    ]
+    rows = []
+    with override_settings(CACHES=DUMMY_CACHE):
+        wsgi_app = get_wsgi_application()
+        asgi_app = get_asgi_application()
+        for delay in args.latency:
+            latency.seconds = delay / 1000
+            for label, sync_url, async_url in cases:
+                for clients in args.clients:
+                    wsgi_time, wsgi_results = run_wsgi(
+                        wsgi_app, sync_url, clients, args.requests, args.wsgi_threads
+                    )
+                    asgi_time, asgi_results = run_asgi(asgi_app, async_url, clients, args.requests)
+                    # Same status and body size for every request on both sides
+                    assert set(wsgi_results) == set(asgi_results) == {wsgi_results[0]}
+                    wsgi_rps = args.requests / wsgi_time
+                    asgi_rps = args.requests / asgi_time
+                    rows.append((
+                        f"{delay:g}", label, clients,
+                        f"{wsgi_rps:.0f}", f"{asgi_rps:.0f}", f"{asgi_rps / wsgi_rps:.2f}x",
+                    ))
+
+    print(f"{args.books} books, {args.requests} requests per cell, "
+          f"{args.wsgi_threads} WSGI threads, {os.cpu_count()} CPU(s)")
+    print_table(
+        ("query ms", "view", "clients", "WSGI req/s", "ASGI req/s", "ASGI/WSGI"), rows
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Books per author / per library: COUNT aggregates versus counter columns.
+
+Builds catalogs of N books (100 per author, every book in one of 50
+libraries), rebuilds the counters, and times the report queries both
+ways, plus the write overhead the counters add to creating a book and
+adding it to a library.
+
+    python -m benchmarks.bench_book_counts --sizes 10000 100000 500000
+"""
+
+import argparse
+import os
+
+from .common import print_table, setup_django, timed
+
+LIBRARIES = 50
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def fill(start, stop, libraries, batch_size=10000):
+    from relationship_app.models import Author, Book, Library
+
+    Through = Library.books.through
+    for offset in range(start, stop, batch_size):
+        end = min(offset + batch_size, stop)
+        authors = Author.objects.bulk_create(
+            Author(name=f"Author {i}") for i in range(offset // 100, (end + 99) // 100)
+        )
+        first_author = offset // 100
+        books = Book.objects.bulk_create(
+            Book(title=f"Title {i}", author=authors[i // 100 - first_author])
+            for i in range(offset, end)
+        )
+        Through.objects.bulk_create(
+            Through(library_id=libraries[book.pk % len(libraries)].pk, book_id=book.pk)
+            for book in books
+        )
+
+
+def run(args):
+    from django.db.models import Count
+
+    from relationship_app.counters import rebuild_counts
+    from relationship_app.models import Author, Book, Library
+
+    libraries = Library.objects.bulk_create(Library(name=f"Library {i}") for i in range(LIBRARIES))
+    author = Author.objects.create(name="Writer")
+    reports = [
+        ("all authors",
+         lambda: list(Author.objects.annotate(n=Count("books")).values_list("name", "n")),
+         lambda: list(Author.objects.values_list("name", "book_count"))),
+        ("top 20 authors",
+         lambda: list(Author.objects.annotate(n=Count("books")).order_by("-n")[:20]),
+         lambda: list(Author.objects.order_by("-book_count")[:20])),
+        ("all libraries",
+         lambda: list(Library.objects.annotate(n=Count("books")).values_list("name", "n")),
+         lambda: list(Library.objects.values_list("name", "book_count"))),
+        ("one author",
+         lambda: Book.objects.filter(author=author).count(),
+         lambda: Author.objects.values_list("book_count", flat=True).get(pk=author.pk)),
+    ]
+
+    rows = []
+    loaded = 0
+    for size in sorted(args.sizes):
+        fill(loaded, size, libraries)
+        loaded = size
+        rebuild_counts()
+        for label, aggregate, counter in reports:
+            agg_median, _ = timed(aggregate, repeat=args.repeat)
+            counter_median, _ = timed(counter, repeat=args.repeat)
+            rows.append((size, label, f"{agg_median:.2f}", f"{counter_median:.2f}"))
+
+    def write():
+        book = Book.objects.create(title="New", author=author)
+        libraries[0].books.add(book)
+        book.delete()
+
+    write_median, _ = timed(write, repeat=args.repeat)
+    rows.append((loaded, "create + add + delete a book", "-", f"{write_median:.2f}"))
+    print_table(("books", "query", "COUNT ms", "counter ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
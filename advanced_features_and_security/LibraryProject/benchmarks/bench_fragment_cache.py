@@ -0,0 +1,91 @@
+"""
+Cached versus uncached rendering of the book and library pages.
+
+Fills a catalog, then requests list_books and a library detail page
+repeatedly through the test client, once with the locmem cache and once
+with DummyCache (every {% cache %} block re-renders), and reports
+requests per second and queries per request. With --write-every N, every
+Nth request first saves a book, as a rough read/write mix.
+
+    python -m benchmarks.bench_fragment_cache --books 1000 --requests 500
+"""
+
+import argparse
+import os
+import time
+
+from .common import fill_catalog, print_table, setup_django
+
+CACHE_CONFIGS = (
+    ("cached", {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}),
+    ("uncached", {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--books", type=int, default=1000)
+    parser.add_argument("--library-books", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--write-every", type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def run(args):
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from relationship_app.models import Book, Library
+
+    fill_catalog(args.books // 3 or 1)
+    library = Library.objects.create(name="Benchmark")
+    library.books.set(Book.objects.all()[:args.library_books])
+    book = Book.objects.first()
+
+    pages = (
+        ("list_books", reverse("list_books")),
+        ("library_detail", reverse("library_detail", kwargs={"pk": library.pk})),
+    )
+
+    rows = []
+    for page, url in pages:
+        for label, caches in CACHE_CONFIGS:
+            with override_settings(CACHES=caches):
+                client = Client()
+                client.get(url, secure=True)
+                queries = []
+
+                def record(execute, sql, params, many, context):
+                    queries.append(sql)
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(record):
+                    start = time.perf_counter()
+                    for index in range(args.requests):
+                        if args.write_every and index % args.write_every == 0:
+                            book.save()
+                        client.get(url, secure=True)
+                    elapsed = time.perf_counter() - start
+
+            rows.append((
+                page,
+                label,
+                f"{args.requests / elapsed:.0f}",
+                f"{elapsed / args.requests * 1000:.2f}",
+                f"{len(queries) / args.requests:.2f}",
+            ))
+
+    print(f"{Book.objects.count()} books, {args.library_books} in the library"
+          + (f", a write every {args.write_every} requests" if args.write_every else ""))
+    print_table(("page", "cache", "req/s", "ms/req", "queries/req"), rows)
+
+
+if __name__ == "__main__":
+    main()
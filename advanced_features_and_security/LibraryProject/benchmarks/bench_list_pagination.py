@@ -0,0 +1,103 @@
+"""
+list_books and LibraryDetailView response time across catalog sizes.
+
+For each size, builds a catalog (100 books per author) and one library
+holding every book, then times first pages, a deep page near the end,
+an author-filtered page and, for reference, rendering the whole list the
+way the views did before pagination. Fragment caching is disabled
+(DummyCache) so every request renders.
+
+    python -m benchmarks.bench_list_pagination --sizes 10000 100000 200000
+"""
+
+import argparse
+import os
+
+from .common import print_table, setup_django, timed
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 200000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def fill(total, start, library, batch_size=10000):
+    from relationship_app.models import Author, Book, Library
+
+    for offset in range(start, start + total, batch_size):
+        stop = min(offset + batch_size, start + total)
+        authors = Author.objects.bulk_create(
+            Author(name=f"Author {i}") for i in range(offset // 100, (stop + 99) // 100)
+        )
+        by_index = {offset // 100 + n: author for n, author in enumerate(authors)}
+        books = Book.objects.bulk_create(
+            Book(title=f"Title {i * 7919 % 1000003:07d}", author=by_index[i // 100])
+            for i in range(offset, stop)
+        )
+        Through = Library.books.through
+        Through.objects.bulk_create(Through(library_id=library.pk, book_id=b.pk) for b in books)
+
+
+def run(args):
+    from django.db import connection
+    from django.template.loader import render_to_string
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    from relationship_app.catalog import catalog_cache_context
+    from relationship_app.models import Book, Library
+    from relationship_app.pagination import KeysetPaginator
+
+    library = Library.objects.create(name="Everything")
+    list_url = reverse("list_books")
+    detail_url = reverse("library_detail", kwargs={"pk": library.pk})
+    client = Client()
+    rows = []
+    loaded = 0
+
+    with override_settings(CACHES=DUMMY_CACHE):
+        for size in sorted(args.sizes):
+            fill(size - loaded, loaded, library)
+            loaded = size
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+            deep = Book.objects.order_by("-title", "-id")[100]
+            cursor = KeysetPaginator(None).encode_cursor(deep.title, deep.pk)
+            author_id = Book.objects.order_by("-id").values_list("author_id", flat=True)[0]
+            cases = [
+                ("list_books first page", list_url),
+                ("list_books deep page", f"{list_url}?cursor={cursor}"),
+                ("list_books by author", f"{list_url}?author={author_id}"),
+                ("library first page", detail_url),
+                ("library deep page", f"{detail_url}?cursor={cursor}"),
+            ]
+            for label, url in cases:
+                median, p95 = timed(lambda: client.get(url, secure=True), repeat=args.repeat)
+                size_kb = len(client.get(url, secure=True).content) / 1024
+                rows.append((size, label, f"{median:.2f}", f"{p95:.2f}", f"{size_kb:.1f}"))
+
+            def render_everything():
+                books = Book.objects.select_related("author")
+                context = {"books": books, **catalog_cache_context()}
+                return render_to_string("relationship_app/list_books.html", context)
+
+            median, p95 = timed(render_everything, repeat=3, warmup=0)
+            size_kb = len(render_everything()) / 1024
+            rows.append((size, "whole list (unpaginated)", f"{median:.2f}", f"{p95:.2f}", f"{size_kb:.1f}"))
+
+    print_table(("books", "request", "median ms", "p95 ms", "KiB"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Guarded-view throughput with ModelBackend versus CachedPermissionBackend.
+
+Logs in a user who gets relationship_app permissions through several
+groups and requests a permission_required view repeatedly through the
+test client, reporting requests per second and queries per request.
+
+    python -m benchmarks.bench_permissions --requests 2000
+"""
+
+import argparse
+import os
+import time
+
+from .common import print_table, setup_django
+
+BACKENDS = (
+    ("ModelBackend", "django.contrib.auth.backends.ModelBackend"),
+    ("CachedPermissionBackend", "bookshelf.backends.CachedPermissionBackend"),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def make_user(groups):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Group, Permission
+
+    user = get_user_model().objects.create_user("bench", password="bench")
+    perms = list(Permission.objects.filter(content_type__app_label="relationship_app"))
+    for index in range(groups):
+        group = Group.objects.create(name=f"Group {index}")
+        group.permissions.set(perms[index::groups])
+        user.groups.add(group)
+    return user
+
+
+def run(args):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.urls import reverse
+
+    user = make_user(args.groups)
+    url = reverse("view_book", kwargs={"pk": 1})
+
+    rows = []
+    for label, backend in BACKENDS:
+        with override_settings(AUTHENTICATION_BACKENDS=[backend]):
+            cache.clear()
+            client = Client()
+            client.force_login(user)
+            client.get(url, secure=True)
+
+            queries = []
+
+            def record(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(record):
+                start = time.perf_counter()
+                for _ in range(args.requests):
+                    response = client.get(url, secure=True)
+                elapsed = time.perf_counter() - start
+            assert response.status_code == 200, response.status_code
+
+        rows.append((
+            label,
+            f"{args.requests / elapsed:.0f}",
+            f"{elapsed / args.requests * 1000:.2f}",
+            f"{len(queries) / args.requests:.1f}",
+        ))
+
+    print(f"{args.requests} requests, permissions from {args.groups} groups")
+    print_table(("backend", "req/s", "ms/req", "queries/req"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Batched query_samples helpers versus calling the single-name helpers in a loop.
+
+Builds a catalog of authors and libraries, then resolves N names per
+helper both ways and reports wall time and query count. The single-name
+helpers return lazy QuerySets, so the loop evaluates them.
+
+    python -m benchmarks.bench_query_samples --names 10000
+"""
+
+import argparse
+import os
+
+from .common import fill_catalog, print_table, setup_django, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def run(args):
+    from django.db import connection
+
+    from relationship_app import query_samples
+
+    fill_catalog(args.names)
+    authors = [f"Author {i}" for i in range(args.names)]
+    libraries = [f"Library {i}" for i in range(args.names)]
+
+    cases = [
+        (
+            "books by author",
+            lambda: [list(query_samples.get_books_by_author(name)) for name in authors],
+            lambda: query_samples.get_books_by_authors(authors),
+        ),
+        (
+            "books in library",
+            lambda: [list(query_samples.get_books_in_library(name)) for name in libraries],
+            lambda: query_samples.get_books_in_libraries(libraries),
+        ),
+        (
+            "librarian for library",
+            lambda: [query_samples.get_librarian_for_library(name) for name in libraries],
+            lambda: query_samples.get_librarians_for_libraries(libraries),
+        ),
+    ]
+
+    rows = []
+    for label, looped, batched in cases:
+        for path, func in (("loop", looped), ("batched", batched)):
+            queries = []
+
+            def record(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(record):
+                func()
+            median, p95 = timed(func, repeat=args.repeat, warmup=0)
+            rows.append((label, path, len(queries), f"{median:.1f}", f"{p95:.1f}"))
+
+    print(f"{args.names} names")
+    print_table(("helper", "path", "queries", "median ms", "p95 ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
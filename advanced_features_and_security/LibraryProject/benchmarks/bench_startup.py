@@ -0,0 +1,106 @@
+"""
+Worker start-up cost with and without template warming.
+
+Starts a fresh Python process per run, loads the WSGI application and
+times the first and second request to each page, for:
+
+    default      LibraryProject.settings
+    production   LibraryProject.settings_production, WARM_TEMPLATES off
+    warmed       LibraryProject.settings_production (templates compiled at boot)
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .common import PROJECT_DIR, print_table, setup_django
+
+MODES = {
+    "default": ("LibraryProject.settings", True),
+    "production": ("LibraryProject.settings_production", False),
+    "warmed": ("LibraryProject.settings_production", True),
+}
+PAGES = ("list_books", "login", "register")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    db_path = setup_django()
+    try:
+        run(args, db_path)
+    finally:
+        os.remove(db_path)
+
+
+def child(mode, db_path):
+    """Boot the application in this process and print timings as JSON."""
+    settings_module, warm = MODES[mode]
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.REQUEST_METRICS = {**getattr(settings, "REQUEST_METRICS", {}), "DIR": None}
+    if not warm:
+        settings.WARM_TEMPLATES = []
+
+    start = time.perf_counter()
+    from LibraryProject.wsgi import application  # noqa: F401
+    timings = {"boot": (time.perf_counter() - start) * 1000}
+
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client()
+    for page in PAGES:
+        url = reverse(page)
+        for attempt in ("first", "second"):
+            start = time.perf_counter()
+            client.get(url, secure=True)
+            timings[f"{page} {attempt}"] = (time.perf_counter() - start) * 1000
+    print(json.dumps(timings))
+
+
+def run(args, db_path):
+    from relationship_app.models import Author, Book
+
+    author = Author.objects.create(name="Author")
+    Book.objects.bulk_create(Book(title=f"Title {i}", author=author) for i in range(50))
+
+    results = {}
+    for mode in MODES:
+        samples = []
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode, db_path],
+                cwd=PROJECT_DIR, check=True, capture_output=True, text=True,
+            ).stdout
+            samples.append(json.loads(output.splitlines()[-1]))
+        results[mode] = {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+    keys = list(results["default"])
+    print(f"median of {args.runs} fresh processes, ms")
+    print_table(
+        ["measurement", *MODES],
+        [[key, *(f"{results[mode][key]:.2f}" for mode in MODES)] for key in keys],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Query counts for logging in and importing users.
+
+Logs in an existing user through the test client, and imports N users
+either one by one (create_user, which creates each profile through the
+post_save signal) or with bulk_create() plus
+UserProfile.objects.create_for_users(). Passwords are hashed once up
+front so the numbers show database work, not hashing.
+
+    python -m benchmarks.bench_user_profiles --users 1000
+"""
+
+import argparse
+import os
+import time
+
+from .common import print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+class QueryLog:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def count(self, table=None):
+        return sum(1 for sql in self.queries if table is None or table in sql)
+
+
+def measure(func):
+    from django.db import connection
+
+    log = QueryLog()
+    with connection.execute_wrapper(log):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+    return log, elapsed
+
+
+def run(args):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.test import Client
+
+    from relationship_app.models import UserProfile
+
+    User = get_user_model()
+    password = make_password("bench")
+    profile_table = UserProfile._meta.db_table
+
+    def one_by_one():
+        for i in range(args.users):
+            user = User(username=f"single{i}", password=password)
+            user.save()
+
+    def bulk():
+        users = User.objects.bulk_create(
+            [User(username=f"bulk{i}", password=password) for i in range(args.users)]
+        )
+        UserProfile.objects.create_for_users(users)
+
+    User.objects.create_user("login", password="bench")
+
+    def login():
+        Client().login(username="login", password="bench")
+
+    rows = []
+    for label, func in (
+        ("login", login),
+        (f"import {args.users} (create)", one_by_one),
+        (f"import {args.users} (bulk)", bulk),
+    ):
+        log, elapsed = measure(func)
+        rows.append((label, log.count(), log.count(profile_table), f"{elapsed:.1f}"))
+
+    print_table(("operation", "queries", "profile queries", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
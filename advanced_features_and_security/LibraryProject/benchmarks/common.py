@@ -0,0 +1,99 @@
+"""
+Shared helpers for the LibraryProject benchmarks.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None):
+    """
+    Configure Django against a scratch SQLite database and migrate it.
+
+    Returns the path of the database file (removed by the caller if needed).
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "LibraryProject.settings")
+
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(prefix="library-bench-", suffix=".sqlite3")
+        os.close(fd)
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.ALLOWED_HOSTS = ["*"]
+    # Don't leave request-metrics files behind
+    settings.REQUEST_METRICS = {**getattr(settings, "REQUEST_METRICS", {}), "DIR": None}
+    django.setup()
+
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0)
+    return db_path
+
+
+def fill_catalog(authors, books_per_author=3, batch_size=5000):
+    """
+    Insert `authors` authors with `books_per_author` books each, and one
+    library (with a librarian) per author holding that author's books.
+
+    Names are "Author <i>" and "Library <i>".
+    """
+    from relationship_app.models import Author, Book, Librarian, Library
+
+    for offset in range(0, authors, batch_size):
+        indexes = range(offset, min(offset + batch_size, authors))
+        new_authors = Author.objects.bulk_create(Author(name=f"Author {i}") for i in indexes)
+        books = Book.objects.bulk_create(
+            Book(title=f"Title {i}-{n}", author=author)
+            for i, author in zip(indexes, new_authors)
+            for n in range(books_per_author)
+        )
+        libraries = Library.objects.bulk_create(Library(name=f"Library {i}") for i in indexes)
+        Librarian.objects.bulk_create(
+            Librarian(name=f"Librarian {i}", library=library)
+            for i, library in zip(indexes, libraries)
+        )
+        Through = Library.books.through
+        Through.objects.bulk_create(
+            Through(library_id=library.pk, book_id=book.pk)
+            for index, library in enumerate(libraries)
+            for book in books[index * books_per_author:(index + 1) * books_per_author]
+        )
+
+
+def timed(func, repeat=20, warmup=2):
+    """
+    Call `func` repeatedly and return (median, p95) wall time in milliseconds.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples), p95
+
+
+def print_table(headers, rows):
+    """Print rows as a fixed-width text table."""
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) if rows else len(str(h))
+        for i, h in enumerate(headers)
+    ]
+    line = "  ".join(str(h).rjust(w) for h, w in zip(headers, widths))
+    print(line)
+    print("-" * len(line))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
@@ -3,4 +3,13 @@ from django.apps import AppConfig
 
 class BookshelfConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'bookshelf'
\ No newline at end of file
+    name = 'bookshelf'
+
+    def ready(self):
+        from relationship_app.catalog import watch_model
+
+        from .backends import connect_signals
+        from .models import Book
+
+        connect_signals()
+        watch_model(Book)
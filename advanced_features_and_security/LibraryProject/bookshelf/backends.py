@@ -0,0 +1,177 @@
+"""
+Authentication backend with a shared per-user permission cache.
+
+ModelBackend keeps a user's permission set on the user instance, so it
+is rebuilt (two joins over groups and permissions) on every request.
+CachedPermissionBackend stores the set in Django's cache, under
+"bookshelf:perms:user:<pk>", together with the permission versions it
+was computed at, the shared one and the user's own:
+
+* changing a user's groups or direct permissions, or saving the user
+  (is_active / is_superuser may have changed), bumps that user's
+  version and drops their entry;
+* changing a group's permissions, or deleting a group or permission,
+  bumps the shared version, which retires every entry at once.
+
+An entry is only used while both versions match, so a set computed
+before a change and stored after it is never served.
+
+Async permission checks (ahas_perm, as used by permission_required on
+async views) go through aget_all_permissions and share the same cache.
+
+PERMISSION_CACHE_TIMEOUT (seconds, default 300) bounds how long an
+entry lives. Use a shared cache backend when running several workers,
+otherwise other workers see changes only after the timeout.
+"""
+
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "bookshelf:perms:version"
+USER_KEY_PREFIX = "bookshelf:perms:user:"
+USER_VERSION_KEY_PREFIX = "bookshelf:perms:user-version:"
+
+
+def user_cache_key(user_pk):
+    return f"{USER_KEY_PREFIX}{user_pk}"
+
+
+def user_version_key(user_pk):
+    return f"{USER_VERSION_KEY_PREFIX}{user_pk}"
+
+
+def get_permission_version(values=None):
+    """
+    Return the current permission version, starting one if the key is
+    missing. Pass the result of a get_many() that included VERSION_KEY to
+    avoid another cache round trip.
+    """
+    version = (values or {}).get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a restarted cache never reuses a version
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_permission_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_users(user_pks):
+    for pk in user_pks:
+        try:
+            cache.incr(user_version_key(pk))
+        except ValueError:
+            cache.add(user_version_key(pk), time.time_ns(), timeout=None)
+    cache.delete_many([user_cache_key(pk) for pk in user_pks])
+
+
+def on_commit_too(func, *args):
+    """
+    Run `func` now and, inside a transaction, again after commit, so a
+    request that recomputes permissions before the commit cannot leave
+    the old set cached.
+    """
+    func(*args)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: func(*args))
+
+
+class CachedPermissionBackend(ModelBackend):
+    """
+    ModelBackend whose get_all_permissions() is cached across requests.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key, user_key = user_cache_key(user_obj.pk), user_version_key(user_obj.pk)
+            values = cache.get_many([VERSION_KEY, key, user_key])
+            version = (get_permission_version(values), values.get(user_key))
+            perms = self.get_cached_permissions(values.get(key), version)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, (version, perms), timeout=self.get_cache_timeout())
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
+
+    async def aget_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, "_perm_cache"):
+            key, user_key = user_cache_key(user_obj.pk), user_version_key(user_obj.pk)
+            values = await cache.aget_many([VERSION_KEY, key, user_key])
+            if VERSION_KEY in values:
+                version = values[VERSION_KEY]
+            else:
+                version = await sync_to_async(get_permission_version)()
+            version = (version, values.get(user_key))
+            perms = self.get_cached_permissions(values.get(key), version)
+            if perms is None:
+                perms = await super().aget_all_permissions(user_obj)
+                await cache.aset(key, (version, perms), timeout=self.get_cache_timeout())
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
+
+    def get_cached_permissions(self, entry, version):
+        """Return the permissions of a cache entry still at `version`, else None."""
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+
+    def get_cache_timeout(self):
+        return getattr(settings, "PERMISSION_CACHE_TIMEOUT", 300)
+
+
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """m2m_changed receiver for User.groups and User.user_permissions."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        on_commit_too(invalidate_users, [instance.pk])
+    elif pk_set:
+        on_commit_too(invalidate_users, list(pk_set))
+    elif action == "post_clear":
+        # e.g. group.user_set.clear(): the affected users are unknown
+        on_commit_too(bump_permission_version)
+
+
+def group_permissions_changed(sender, action, **kwargs):
+    """m2m_changed receiver for Group.permissions."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        on_commit_too(bump_permission_version)
+
+
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which cannot change permissions
+    if created or (update_fields and set(update_fields) <= {"last_login"}):
+        return
+    on_commit_too(invalidate_users, [instance.pk])
+
+
+def permissions_deleted(sender, **kwargs):
+    on_commit_too(bump_permission_version)
+
+
+def connect_signals():
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    User = get_user_model()
+    m2m_changed.connect(user_permissions_changed, sender=User.groups.through)
+    m2m_changed.connect(user_permissions_changed, sender=User.user_permissions.through)
+    m2m_changed.connect(group_permissions_changed, sender=Group.permissions.through)
+    post_save.connect(user_saved, sender=User)
+    post_delete.connect(permissions_deleted, sender=Group)
+    post_delete.connect(permissions_deleted, sender=Permission)
@@ -0,0 +1,149 @@
+"""
+Bulk-import users from a CSV file.
+
+    python manage.py import_users users.csv [--batch-size 1000] [--processes 8] [--role Member]
+
+The file needs a header row with a "username" column; "email",
+"password", "first_name", "last_name" and "role" columns are optional.
+Rows without a password get an unusable one, and rows without a role get
+--role.
+
+Creating users with create_user() hashes one password at a time and
+fires post_save for every user, which creates its UserProfile with
+another INSERT. This command hashes each batch of passwords across a
+process pool and inserts the users and their profiles with bulk_create(),
+producing the same rows as the create_user() path. Usernames that
+already exist, or repeat within the file, are skipped.
+"""
+
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, router, transaction
+
+from relationship_app.models import ROLE_CHOICES, UserProfile
+
+ROLES = [value for value, label in ROLE_CHOICES]
+
+
+def init_worker():
+    # Needed where worker processes are spawned rather than forked
+    import django
+
+    django.setup()
+
+
+def hash_password(raw_password):
+    # create_user(password=None) stores an unusable password
+    return make_password(raw_password or None)
+
+
+class Command(BaseCommand):
+    help = "Create users and their profiles from a CSV file in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file", help="CSV file with a header row.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 1,
+            help="Processes to hash passwords with (1 hashes in this process).",
+        )
+        parser.add_argument("--role", choices=ROLES, default="Member", help="Default role.")
+
+    def handle(self, *args, **options):
+        self.User = get_user_model()
+        self.default_role = options["role"]
+        self.seen = set()
+        self.row_number = 0
+        self.imported = self.skipped = 0
+
+        processes = max(1, options["processes"])
+        pool = ProcessPoolExecutor(processes, initializer=init_worker) if processes > 1 else None
+        chunksize = max(1, options["batch_size"] // (processes * 4))
+
+        def hash_passwords(raw_passwords):
+            if pool is None:
+                return [hash_password(raw) for raw in raw_passwords]
+            return list(pool.map(hash_password, raw_passwords, chunksize=chunksize))
+
+        self.hash_passwords = hash_passwords
+
+        try:
+            with open(options["csv_file"], newline="", encoding="utf-8") as handle:
+                reader = csv.DictReader(handle)
+                if "username" not in (reader.fieldnames or ()):
+                    raise CommandError('The CSV file needs a "username" column.')
+                while True:
+                    batch = list(itertools.islice(reader, options["batch_size"]))
+                    if not batch:
+                        break
+                    self.import_batch(batch)
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.stdout.write(f"Imported {self.imported} users, skipped {self.skipped}.")
+
+    def import_batch(self, rows):
+        rows = self.filter_rows(rows)
+        if not rows:
+            return
+
+        passwords = self.hash_passwords([row.get("password") for row in rows])
+
+        users = [
+            self.User(
+                username=row["username"],
+                email=self.User.objects.normalize_email(row.get("email") or ""),
+                first_name=row.get("first_name") or "",
+                last_name=row.get("last_name") or "",
+                password=password,
+            )
+            for row, password in zip(rows, passwords)
+        ]
+
+        using = router.db_for_write(self.User)
+        with transaction.atomic(using=using):
+            users = self.User.objects.bulk_create(users)
+            if not connections[using].features.can_return_rows_from_bulk_insert:
+                by_name = self.User.objects.in_bulk(
+                    [user.username for user in users], field_name="username"
+                )
+                users = [by_name[user.username] for user in users]
+
+            roles = [row.get("role") or self.default_role for row in rows]
+            for role in set(roles):
+                UserProfile.objects.create_for_users(
+                    [user for user, user_role in zip(users, roles) if user_role == role], role=role
+                )
+        self.imported += len(users)
+
+    def filter_rows(self, rows):
+        """Drop (and report) rows that cannot be imported."""
+        usernames = [row["username"] for row in rows]
+        existing = set(
+            self.User.objects.filter(username__in=usernames).values_list("username", flat=True)
+        )
+        kept = []
+        for row in rows:
+            self.row_number += 1
+            username = row["username"]
+            role = row.get("role") or self.default_role
+            if not username:
+                reason = "missing username"
+            elif username in existing or username in self.seen:
+                reason = f"username {username!r} already exists"
+            elif role not in ROLES:
+                reason = f"unknown role {role!r}"
+            else:
+                self.seen.add(username)
+                kept.append(row)
+                continue
+            self.skipped += 1
+            self.stderr.write(f"Row {self.row_number}: skipped, {reason}.")
+        return kept
@@ -1,3 +1,224 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+from unittest import addModuleCleanup, mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from relationship_app.models import UserProfile
+
+from .backends import CachedPermissionBackend, user_cache_key
+from .models import Book
+from .views import book_list, book_list_async
+
+
+def setUpModule():
+    # Keep the metrics these requests generate out of the source tree
+    metrics = override_settings(REQUEST_METRICS={"DIR": None})
+    metrics.enable()
+    addModuleCleanup(metrics.disable)
+
+
+class CachedPermissionBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("ada", password="pw")
+        self.group = Group.objects.create(name="Editors")
+        self.perm = Permission.objects.get(
+            content_type__app_label="relationship_app", codename="can_view"
+        )
+
+    def has_perm(self):
+        # A fresh instance per check, like a new request
+        user = get_user_model().objects.get(pk=self.user.pk)
+        return user.has_perm("relationship_app.can_view")
+
+    def test_permissions_are_cached(self):
+        self.user.user_permissions.add(self.perm)
+        self.assertTrue(self.has_perm())
+        user = get_user_model().objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm("relationship_app.can_view"))
+
+    def test_async_checks_share_the_cache(self):
+        self.user.user_permissions.add(self.perm)
+        self.assertTrue(self.has_perm())
+        user = get_user_model().objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(async_to_sync(user.ahas_perm)("relationship_app.can_view"))
+        self.user.user_permissions.remove(self.perm)
+        user = get_user_model().objects.get(pk=self.user.pk)
+        self.assertFalse(async_to_sync(user.ahas_perm)("relationship_app.can_view"))
+        self.assertFalse(self.has_perm())
+
+    def test_user_permission_change_invalidates(self):
+        self.assertFalse(self.has_perm())
+        self.user.user_permissions.add(self.perm)
+        self.assertTrue(self.has_perm())
+        self.user.user_permissions.remove(self.perm)
+        self.assertFalse(self.has_perm())
+
+    def test_group_changes_invalidate(self):
+        self.user.groups.add(self.group)
+        self.assertFalse(self.has_perm())
+        self.group.permissions.add(self.perm)
+        self.assertTrue(self.has_perm())
+        self.group.user_set.remove(self.user)
+        self.assertFalse(self.has_perm())
+        self.group.user_set.add(self.user)
+        self.assertTrue(self.has_perm())
+        self.group.delete()
+        self.assertFalse(self.has_perm())
+
+    def test_change_during_fill_is_not_cached(self):
+        original = ModelBackend.get_all_permissions
+
+        def granted_meanwhile(backend, user_obj, obj=None):
+            perms = original(backend, user_obj, obj)
+            # Another request grants the permission before this one stores the old set
+            self.user.user_permissions.add(self.perm)
+            return perms
+
+        with mock.patch.object(ModelBackend, "get_all_permissions", granted_meanwhile):
+            self.assertFalse(self.has_perm())
+        self.assertTrue(self.has_perm())
+
+    def test_user_save_invalidates_except_last_login(self):
+        self.assertFalse(self.has_perm())
+        self.user.save(update_fields=["last_login"])
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(self.has_perm())
+
+    def test_inactive_and_object_permissions(self):
+        self.user.user_permissions.add(self.perm)
+        backend = CachedPermissionBackend()
+        self.assertEqual(backend.get_all_permissions(self.user, obj=object()), set())
+        self.user.is_active = False
+        self.assertEqual(backend.get_all_permissions(self.user), set())
+
+    def test_guarded_view_skips_permission_queries(self):
+        self.user.user_permissions.add(self.perm)
+        self.client.force_login(self.user)
+        url = reverse("view_book", kwargs={"pk": 1})
+        # SECURE_SSL_REDIRECT is on, so requests are made over HTTPS
+        self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn("auth_permission", sql)
+
+
+class ImportUsersCommandTests(TestCase):
+    def import_users(self, content, **options):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", newline="") as csv_file:
+            csv_file.write(content)
+        self.addCleanup(os.remove, path)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        options.setdefault("processes", 1)
+        call_command("import_users", path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def assertSameAsCreateUser(self, imported, created):
+        fields = ["email", "first_name", "last_name", "is_active", "is_staff", "is_superuser"]
+        self.assertEqual(
+            [getattr(imported, field) for field in fields],
+            [getattr(created, field) for field in fields],
+        )
+        self.assertEqual(imported.has_usable_password(), created.has_usable_password())
+        self.assertEqual(imported.userprofile.role, created.userprofile.role)
+
+    def test_matches_create_user(self):
+        User = get_user_model()
+        expected = User.objects.create_user("ref", "Ada@EXAMPLE.com", "s3cret")
+        expected_unusable = User.objects.create_user("ref2")
+
+        stdout, stderr = self.import_users(
+            "username,email,password\n"
+            "ada,Ada@EXAMPLE.com,s3cret\n"
+            "nopass,,\n",
+            batch_size=1,
+        )
+
+        self.assertIn("Imported 2 users, skipped 0.", stdout)
+        ada = User.objects.get(username="ada")
+        self.assertTrue(ada.check_password("s3cret"))
+        self.assertSameAsCreateUser(ada, User.objects.get(pk=expected.pk))
+        self.assertSameAsCreateUser(
+            User.objects.get(username="nopass"), User.objects.get(pk=expected_unusable.pk)
+        )
+
+    def test_roles_and_skipped_rows(self):
+        get_user_model().objects.create_user("taken")
+        stdout, stderr = self.import_users(
+            "username,password,role\n"
+            "lib,pw,Librarian\n"
+            "member,pw,\n"
+            "taken,pw,\n"
+            "member,pw,\n"
+            "bad,pw,Owner\n",
+            role="Member",
+        )
+        self.assertIn("Imported 2 users, skipped 3.", stdout)
+        self.assertIn("Row 3: skipped, username 'taken' already exists.", stderr)
+        self.assertIn("Row 5: skipped, unknown role 'Owner'.", stderr)
+        roles = dict(UserProfile.objects.values_list("user__username", "role"))
+        self.assertEqual(roles["lib"], "Librarian")
+        self.assertEqual(roles["member"], "Member")
+
+    def test_hashes_in_process_pool(self):
+        self.import_users("username,password\na,pw-a\nb,pw-b\n", processes=2)
+        User = get_user_model()
+        self.assertTrue(User.objects.get(username="a").check_password("pw-a"))
+        self.assertTrue(User.objects.get(username="b").check_password("pw-b"))
+
+    def test_requires_username_column(self):
+        with self.assertRaisesMessage(CommandError, 'needs a "username" column'):
+            self.import_users("email\nada@example.com\n")
+
+
+class BookListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser("admin", password="pw")
+        Book.objects.create(title="Dune")
+
+    def render(self):
+        request = RequestFactory().get("/books/")
+        request.user = self.user
+        return book_list(request).content.decode()
+
+    def test_list_is_cached_until_a_book_changes(self):
+        self.render()
+        with self.assertNumQueries(0):
+            self.assertIn("Dune", self.render())
+        Book.objects.create(title="Emma")
+        self.assertIn("Emma", self.render())
+
+    def render_async(self):
+        request = AsyncRequestFactory().get("/books/")
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        return async_to_sync(book_list_async)(request).render().content.decode()
+
+    def test_async_view_matches_sync_view(self):
+        self.assertEqual(self.render_async(), self.render())
+        # Permissions and the fragment are both cached by now
+        with self.assertNumQueries(0):
+            self.assertIn("Dune", self.render_async())
+        Book.objects.create(title="Emma")
+        self.assertIn("Emma", self.render_async())
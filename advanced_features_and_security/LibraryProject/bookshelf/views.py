@@ -1,5 +1,8 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import permission_required
+from django.template.response import TemplateResponse
+from relationship_app.catalog import catalog_cache_context, fragment_is_cached
+
 from .models import Book
 from .forms import ExampleForm
 
@@ -7,7 +10,19 @@ from .forms import ExampleForm
 @permission_required("bookshelf.can_view", raise_exception=True)
 def book_list(request):
     books = Book.objects.all()
-    return render(request, "bookshelf/book_list.html", {"books": books})
+    context = {"books": books, **catalog_cache_context()}
+    return render(request, "bookshelf/book_list.html", context)
+
+
+# Async variant of book_list, for ASGI deployments
+@permission_required("bookshelf.can_view", raise_exception=True)
+async def book_list_async(request):
+    context = catalog_cache_context()
+    if fragment_is_cached("bookshelf_book_list", context["catalog_version"]):
+        context["books"] = Book.objects.all()
+    else:
+        context["books"] = [book async for book in Book.objects.aiterator()]
+    return TemplateResponse(request, "bookshelf/book_list.html", context)
 
 
 def form_view(request):
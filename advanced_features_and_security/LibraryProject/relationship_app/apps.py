@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class RelationshipAppConfig(AppConfig):
     name = 'relationship_app'
+
+    def ready(self):
+        from . import catalog, counters
+        from . import roles  # noqa: F401  (connects the role cache signals)
+
+        catalog.connect_signals()
+        counters.connect_signals()
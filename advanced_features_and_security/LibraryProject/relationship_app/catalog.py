@@ -0,0 +1,88 @@
+"""
+Catalog version for caching rendered book and library lists.
+
+The book list, library detail and bookshelf book list templates wrap
+their lists in {% cache %} blocks keyed on get_catalog_version(). Any
+save or delete of a watched model (Book, Author, Library and
+bookshelf's Book) and any change to Library.books bumps the version, so
+the next request renders fresh fragments and the stale ones simply
+expire after CATALOG_CACHE_TIMEOUT seconds (default 3600).
+
+The version lives in the default cache; use a shared backend when
+running several workers so they all see the bump.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+VERSION_KEY = "relationship_app:catalog:version"
+
+
+def get_catalog_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a restarted cache never reuses a version
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def catalog_changed(using=None):
+    """
+    Bump the version now and, inside a transaction, again after commit,
+    so a page rendered before the commit cannot stay cached.
+    """
+    bump_catalog_version()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(bump_catalog_version, using=using)
+
+
+def catalog_cache_context():
+    """Template context for the {% cache %} blocks of catalog pages."""
+    return {
+        "catalog_version": get_catalog_version(),
+        "catalog_cache_timeout": getattr(settings, "CATALOG_CACHE_TIMEOUT", 3600),
+    }
+
+
+def fragment_is_cached(fragment_name, *vary_on):
+    """
+    Return True if the {% cache %} fragment is cached for `vary_on`, so
+    rendering it will not evaluate the querysets inside it.
+    """
+    return cache.has_key(make_template_fragment_key(fragment_name, vary_on))
+
+
+def model_changed(sender, using=None, **kwargs):
+    catalog_changed(using)
+
+
+def library_books_changed(sender, action, using=None, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        catalog_changed(using)
+
+
+def watch_model(model):
+    """Bump the catalog version whenever an instance of `model` changes."""
+    post_save.connect(model_changed, sender=model, dispatch_uid=f"catalog-save-{model._meta.label}")
+    post_delete.connect(model_changed, sender=model, dispatch_uid=f"catalog-delete-{model._meta.label}")
+
+
+def connect_signals():
+    from .models import Author, Book, Library
+
+    for model in (Author, Book, Library):
+        watch_model(model)
+    m2m_changed.connect(library_books_changed, sender=Library.books.through)
@@ -0,0 +1,104 @@
+"""
+Run EXPLAIN QUERY PLAN over the relationship_app's known queries.
+
+    python manage.py explain_queries [--verbose]
+
+Exits with an error if any query plan contains a full table scan or a
+temporary sort, so it can run in CI to catch index regressions.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+
+from relationship_app.models import Author, Book, Librarian, Library, UserProfile
+
+# "SCAN <table>" reads the whole table. "SCAN <table> USING INDEX ..."
+# walks an index in order, which is only cheap when a LIMIT stops it early.
+SCAN_RE = re.compile(
+    r"\bSCAN (?:TABLE )?\w+\b(?! VIRTUAL TABLE)(?P<index> USING (?:COVERING )?INDEX)?"
+)
+TEMP_SORT_RE = re.compile(r"USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY|DISTINCT)")
+
+
+def get_known_queries():
+    """
+    Return (label, queryset, allowed) for the queries the project issues.
+
+    `allowed` lists plan features that are expected for that query:
+    "scan" (it reads the whole table on purpose) or "sort".
+    """
+    return [
+        ("list_books",
+         Book.objects.select_related("author").order_by("title", "id")[:51], ()),
+        ("list_books page",
+         Book.objects.select_related("author")
+         .filter(Q(title__gte="M") & (Q(title__gt="M") | Q(id__gt=1)))
+         .order_by("title", "id")[:51], ()),
+        ("list_books by author",
+         Book.objects.filter(author_id=1, title__gte="M").order_by("title", "id")[:51], ()),
+        ("LibraryDetailView", Library.objects.filter(pk=1), ()),
+        # A library's books are sorted after the join; the page is limited
+        ("Library books",
+         Book.objects.filter(libraries=1).order_by("title", "id")[:51], ("sort",)),
+        ("Author by name", Author.objects.filter(name="George Orwell"), ()),
+        ("Books by author",
+         Book.objects.filter(author_id=1).order_by("title"), ()),
+        ("Library by name", Library.objects.filter(name="Central"), ()),
+        ("Librarian for library", Librarian.objects.filter(library_id=1), ()),
+        ("UserProfile for user", UserProfile.objects.filter(user_id=1), ()),
+    ]
+
+
+def find_problems(plan, allowed=(), limited=False):
+    """
+    Return the plan lines that indicate a full scan or a temp sort.
+
+    `limited` says whether the query has a LIMIT, which turns an ordered
+    index walk into a short read.
+    """
+    problems = []
+    for line in plan.splitlines():
+        scan = SCAN_RE.search(line)
+        if "scan" not in allowed and scan and not (scan["index"] and limited):
+            problems.append(line.strip())
+        elif "sort" not in allowed and TEMP_SORT_RE.search(line):
+            problems.append(line.strip())
+    return problems
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN QUERY PLAN over the relationship_app's known queries and flag full scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose", action="store_true", help="Print every query plan."
+        )
+        parser.add_argument(
+            "--database", default="default", help="Database alias to explain against."
+        )
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        if connections[alias].vendor != "sqlite":
+            raise CommandError("explain_queries understands SQLite query plans only.")
+
+        failures = 0
+        for label, queryset, allowed in get_known_queries():
+            plan = queryset.using(alias).explain()
+            problems = find_problems(plan, allowed, queryset.query.is_sliced)
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f"FAIL {label}"))
+                for line in problems:
+                    self.stdout.write(f"    {line}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok   {label}"))
+            if options["verbose"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    | {line}")
+
+        if failures:
+            raise CommandError(f"{failures} known queries fall back to a full scan.")
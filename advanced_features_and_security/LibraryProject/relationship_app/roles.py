@@ -0,0 +1,73 @@
+"""
+Cached role lookups for role-based access control.
+
+A user's role lives on UserProfile, so checking it used to cost a profile
+query on every guarded request. get_user_role() remembers the role on the
+user object for the rest of the request and in the Django cache for
+settings.ROLE_CACHE_TIMEOUT seconds (default 300). Saving or deleting a
+UserProfile drops the cached entry.
+"""
+
+from django.conf import settings
+from django.contrib.auth import REDIRECT_FIELD_NAME
+from django.contrib.auth.decorators import user_passes_test
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import UserProfile
+
+KEY_PREFIX = "relationship_app:role:"
+# Cached for users without a profile, since the cache cannot store "miss"
+NO_ROLE = ""
+
+
+def role_cache_key(user_pk):
+    return f"{KEY_PREFIX}{user_pk}"
+
+
+def get_user_role(user):
+    """
+    Return the role of `user`, or None for anonymous users and users
+    without a profile.
+    """
+    if not user.is_authenticated:
+        return None
+    role = getattr(user, "_cached_role", None)
+    if role is None:
+        key = role_cache_key(user.pk)
+        role = cache.get(key)
+        if role is None:
+            role = (
+                UserProfile.objects.filter(user_id=user.pk)
+                .values_list("role", flat=True)
+                .first()
+            ) or NO_ROLE
+            cache.set(key, role, timeout=getattr(settings, "ROLE_CACHE_TIMEOUT", 300))
+        user._cached_role = role
+    return role or None
+
+
+def invalidate_user_role(user_pk):
+    cache.delete(role_cache_key(user_pk))
+
+
+def role_required(*roles, login_url=None, redirect_field_name=REDIRECT_FIELD_NAME):
+    """
+    Decorator for views that checks the user has one of `roles`,
+    redirecting to the log-in page if not (like user_passes_test).
+
+        @role_required("Librarian", "Admin")
+        def librarian_view(request):
+            ...
+    """
+    def check_role(user):
+        return get_user_role(user) in roles
+
+    return user_passes_test(check_role, login_url, redirect_field_name)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def evict_user_role(sender, instance, **kwargs):
+    invalidate_user_role(instance.user_id)
@@ -0,0 +1,32 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountMixin:
+    """
+    TestCase mixin for catching N+1 queries.
+
+    assertConstantQueries() runs `func` at several data sizes and fails if
+    the number of queries changes with the number of rows.
+    """
+
+    def assertConstantQueries(self, func, add_rows, sizes=(1, 5, 20)):
+        """
+        Args:
+            func: Callable issuing the queries under test (e.g. a client.get)
+            add_rows: Callable taking a count and creating that many more rows
+            sizes: Increasing row counts to measure at
+        """
+        counts = []
+        created = 0
+        for size in sizes:
+            add_rows(size - created)
+            created = size
+            with CaptureQueriesContext(connection) as context:
+                func()
+            counts.append(len(context.captured_queries))
+
+        if len(set(counts)) != 1:
+            detail = ", ".join(f"{size} rows: {count}" for size, count in zip(sizes, counts))
+            self.fail(f"Query count depends on the number of rows ({detail})")
+        return counts[0]
@@ -1,3 +1,620 @@
-from django.test import TestCase
+import html
+import io
+import os
+import re
+import tempfile
+import time
 
-# Create your tests here.
+from unittest import addModuleCleanup, mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from LibraryProject.db_router import ReplicaRouter, replica_reads
+from LibraryProject.sqlite_backend.base import DatabaseWrapper
+
+from . import query_samples
+from .models import Author, Book, Library, Librarian, UserProfile
+from .testing import QueryCountMixin
+
+# SECURE_SSL_REDIRECT is on, so requests are made over HTTPS
+
+
+def setUpModule():
+    # Keep the metrics these requests generate out of the source tree
+    metrics = override_settings(REQUEST_METRICS={"DIR": None})
+    metrics.enable()
+    addModuleCleanup(metrics.disable)
+
+
+class ListBooksQueryTests(QueryCountMixin, TestCase):
+    def test_list_books_query_count_is_constant(self):
+        def add_books(count):
+            for _ in range(count):
+                author = Author.objects.create(name="Author")
+                Book.objects.create(title="Book", author=author)
+
+        self.assertConstantQueries(
+            lambda: self.client.get(reverse("list_books"), secure=True), add_books
+        )
+
+    def test_list_books_renders_authors(self):
+        author = Author.objects.create(name="George Orwell")
+        Book.objects.create(title="1984", author=author)
+        response = self.client.get(reverse("list_books"), secure=True)
+        self.assertContains(response, "1984 by George Orwell")
+
+
+class LibraryDetailQueryTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.library = Library.objects.create(name="Central")
+        self.url = reverse("library_detail", kwargs={"pk": self.library.pk})
+
+    def test_library_detail_query_count_is_constant(self):
+        def add_books(count):
+            for _ in range(count):
+                author = Author.objects.create(name="Author")
+                self.library.books.add(Book.objects.create(title="Book", author=author))
+
+        self.assertConstantQueries(lambda: self.client.get(self.url, secure=True), add_books)
+
+    def test_library_detail_renders_books(self):
+        author = Author.objects.create(name="J. R. R. Tolkien")
+        self.library.books.add(Book.objects.create(title="The Hobbit", author=author))
+        response = self.client.get(self.url, secure=True)
+        self.assertContains(response, "The Hobbit by J. R. R. Tolkien")
+
+
+class QueryMetricsMiddlewareTests(TestCase):
+    def test_server_timing_reports_queries(self):
+        author = Author.objects.create(name="Author")
+        Book.objects.create(title="Book", author=author)
+        response = self.client.get(reverse("list_books"), secure=True)
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+    def test_failed_flush_does_not_fail_request(self):
+        from LibraryProject.middleware import registry
+
+        self.addCleanup(registry.configure, registry.directory, registry.flush_interval)
+        self.client.get(reverse("list_books"), secure=True)
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            registry.configure(not_a_directory.name, 0)
+            with self.assertLogs("LibraryProject.middleware", "WARNING"):
+                response = self.client.get(reverse("list_books"), secure=True)
+        self.assertEqual(response.status_code, 200)
+
+
+class BatchedQuerySamplesTests(QueryCountMixin, TestCase):
+    def test_books_by_authors_query_count_is_constant(self):
+        names = []
+
+        def add_authors(count):
+            for _ in range(count):
+                author = Author.objects.create(name=f"Author {len(names)}")
+                Book.objects.create(title="Book", author=author)
+                names.append(author.name)
+
+        self.assertConstantQueries(
+            lambda: query_samples.get_books_by_authors(names), add_authors
+        )
+
+    def test_books_by_authors_skips_unknown_names(self):
+        orwell = Author.objects.create(name="George Orwell")
+        book = Book.objects.create(title="1984", author=orwell)
+        no_books = Author.objects.create(name="No Books")
+
+        with self.assertNumQueries(2):
+            result = query_samples.get_books_by_authors(
+                ["George Orwell", "No Books", "Unknown"]
+            )
+            self.assertEqual(result[orwell][0].author.name, "George Orwell")
+        self.assertEqual(result, {orwell: [book], no_books: []})
+
+    def test_books_and_librarians_for_libraries(self):
+        author = Author.objects.create(name="Author")
+        book = Book.objects.create(title="Book", author=author)
+        central = Library.objects.create(name="Central")
+        central.books.add(book)
+        librarian = Librarian.objects.create(name="Ada", library=central)
+        annex = Library.objects.create(name="Annex")
+
+        names = ["Central", "Annex", "Unknown"]
+        with self.assertNumQueries(2):
+            books = query_samples.get_books_in_libraries(names)
+        with self.assertNumQueries(1):
+            librarians = query_samples.get_librarians_for_libraries(names)
+
+        self.assertEqual(books, {central: [book], annex: []})
+        self.assertEqual(librarians, {central: librarian, annex: None})
+
+    def test_duplicate_names_are_not_merged(self):
+        first = Author.objects.create(name="Anonymous")
+        second = Author.objects.create(name="Anonymous")
+        first_book = Book.objects.create(title="Beowulf", author=first)
+        second_book = Book.objects.create(title="Pearl", author=second)
+        main = Library.objects.create(name="Branch")
+        other = Library.objects.create(name="Branch")
+        main.books.add(first_book)
+
+        self.assertEqual(
+            query_samples.get_books_by_authors(["Anonymous"]),
+            {first: [first_book], second: [second_book]},
+        )
+        self.assertEqual(
+            query_samples.get_books_in_libraries(["Branch"]), {main: [first_book], other: []}
+        )
+        with self.assertRaises(Author.MultipleObjectsReturned):
+            query_samples.get_books_by_author("Anonymous")
+        with self.assertRaises(Library.MultipleObjectsReturned):
+            query_samples.get_books_in_library("Branch")
+
+    def test_single_name_helpers(self):
+        author = Author.objects.create(name="Author")
+        book = Book.objects.create(title="Book", author=author)
+        central = Library.objects.create(name="Central")
+        central.books.add(book)
+        librarian = Librarian.objects.create(name="Ada", library=central)
+        Library.objects.create(name="Annex")
+
+        self.assertQuerySetEqual(query_samples.get_books_by_author("Author"), [book])
+        self.assertQuerySetEqual(query_samples.get_books_in_library("Central"), [book])
+        self.assertQuerySetEqual(query_samples.get_books_in_library("Unknown"), [])
+        self.assertEqual(query_samples.get_librarian_for_library("Central"), librarian)
+        self.assertIsNone(query_samples.get_librarian_for_library("Unknown"))
+        with self.assertRaises(Author.DoesNotExist):
+            query_samples.get_books_by_author("Unknown")
+        with self.assertRaises(Librarian.DoesNotExist):
+            query_samples.get_librarian_for_library("Annex")
+
+
+class RoleRequiredTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("ada", password="pw")
+        self.client.force_login(self.user)
+
+    def get(self, name):
+        return self.client.get(reverse(name), secure=True)
+
+    def test_role_is_checked(self):
+        self.assertEqual(self.get("member_view").status_code, 200)
+        self.assertEqual(self.get("admin_view").status_code, 302)
+
+    def test_anonymous_user_is_redirected(self):
+        self.client.logout()
+        self.assertEqual(self.get("member_view").status_code, 302)
+
+    def test_cached_role_skips_profile_query(self):
+        self.get("member_view")
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.get("member_view").status_code, 200)
+        tables = " ".join(query["sql"] for query in context.captured_queries)
+        self.assertNotIn("relationship_app_userprofile", tables)
+
+    def test_role_change_invalidates_cache(self):
+        self.assertEqual(self.get("admin_view").status_code, 302)
+        profile = UserProfile.objects.get(user=self.user)
+        profile.role = "Admin"
+        profile.save()
+        self.assertEqual(self.get("admin_view").status_code, 200)
+        self.assertEqual(self.get("member_view").status_code, 302)
+
+
+class UserProfileLifecycleTests(TestCase):
+    def setUp(self):
+        self.User = get_user_model()
+
+    def profile_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return [q["sql"] for q in context.captured_queries if "relationship_app_userprofile" in q["sql"]]
+
+    def test_create_user_writes_profile_once(self):
+        queries = self.profile_queries(lambda: self.User.objects.create_user("ada", password="pw"))
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith("INSERT"))
+
+    def test_login_does_not_touch_profile(self):
+        self.User.objects.create_user("ada", password="pw")
+        queries = self.profile_queries(
+            lambda: self.assertTrue(self.client.login(username="ada", password="pw"))
+        )
+        self.assertEqual(queries, [])
+
+    def test_profile_saved_with_user_only_when_changed(self):
+        self.User.objects.create_user("ada", password="pw")
+        user = self.User.objects.select_related("userprofile").get(username="ada")
+        self.assertEqual(self.profile_queries(user.save), [])
+
+        user.userprofile.role = "Librarian"
+        self.assertEqual(len(self.profile_queries(user.save)), 1)
+        self.assertEqual(UserProfile.objects.get(user=user).role, "Librarian")
+
+    def test_create_for_users_batches_profiles(self):
+        users = self.User.objects.bulk_create(
+            [self.User(username=f"user{i}") for i in range(3)]
+        )
+        with self.assertNumQueries(1):
+            UserProfile.objects.create_for_users(users, role="Librarian")
+        self.assertEqual(users[0].userprofile.role, "Librarian")
+        self.assertEqual(
+            UserProfile.objects.filter(user__in=users, role="Librarian").count(), 3
+        )
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name="George Orwell")
+        self.book = Book.objects.create(title="1984", author=self.author)
+        self.library = Library.objects.create(name="Central")
+        self.library.books.add(self.book)
+        self.detail_url = reverse("library_detail", kwargs={"pk": self.library.pk})
+
+    def get(self, url):
+        return self.client.get(url, secure=True)
+
+    def test_list_books_is_served_from_cache(self):
+        self.get(reverse("list_books"))
+        with self.assertNumQueries(0):
+            response = self.get(reverse("list_books"))
+        self.assertContains(response, "1984 by George Orwell")
+
+    def test_library_detail_only_fetches_library_when_cached(self):
+        self.get(self.detail_url)
+        with self.assertNumQueries(1):
+            response = self.get(self.detail_url)
+        self.assertContains(response, "1984 by George Orwell")
+
+    def test_model_changes_invalidate(self):
+        self.get(reverse("list_books"))
+        self.get(self.detail_url)
+
+        self.author.name = "Eric Blair"
+        self.author.save()
+        self.assertContains(self.get(reverse("list_books")), "1984 by Eric Blair")
+
+        other = Book.objects.create(title="Animal Farm", author=self.author)
+        self.assertContains(self.get(reverse("list_books")), "Animal Farm")
+        self.assertNotContains(self.get(self.detail_url), "Animal Farm")
+
+        self.library.books.add(other)
+        self.assertContains(self.get(self.detail_url), "Animal Farm")
+
+        other.delete()
+        self.assertNotContains(self.get(reverse("list_books")), "Animal Farm")
+        self.assertNotContains(self.get(self.detail_url), "Animal Farm")
+
+
+class TemplateWarmupTests(TestCase):
+    def test_production_settings_warm_every_template(self):
+        from LibraryProject import settings_production
+        from LibraryProject.template_warmup import get_template_names, warm_templates
+
+        apps = settings_production.WARM_TEMPLATES
+        names = [name for label in apps for name in get_template_names(label)]
+        self.assertIn("relationship_app/list_books.html", names)
+        self.assertIn("bookshelf/book_list.html", names)
+
+        with override_settings(
+            DEBUG=settings_production.DEBUG, TEMPLATES=settings_production.TEMPLATES
+        ):
+            with self.assertNoLogs("LibraryProject.template_warmup"):
+                self.assertEqual(warm_templates(apps), len(names))
+            loader = engines["django"].engine.template_loaders[0]
+            self.assertIsInstance(loader, CachedLoader)
+            self.assertEqual(len(loader.get_template_cache), len(names))
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.orwell = Author.objects.create(name="George Orwell")
+        self.austen = Author.objects.create(name="Jane Austen")
+        self.library = Library.objects.create(name="Central")
+        for index in range(7):
+            author = self.orwell if index % 2 else self.austen
+            book = Book.objects.create(title=f"Book {index}", author=author)
+            self.library.books.add(book)
+
+    def get(self, url):
+        response = self.client.get(url, secure=True)
+        links = {
+            label: html.unescape(href)
+            for href, label in re.findall(r'<a href="([^"]*)">(Previous|Next)</a>', response.content.decode())
+        }
+        titles = re.findall(r"<li>(Book \d+)", response.content.decode())
+        return response, titles, links
+
+    def test_walks_pages_forwards_and_backwards(self):
+        url = reverse("list_books")
+        _, titles, links = self.get(url + "?page_size=3")
+        self.assertEqual(titles, ["Book 0", "Book 1", "Book 2"])
+        self.assertEqual(set(links), {"Next"})
+
+        _, titles, links = self.get(url + links["Next"])
+        self.assertEqual(titles, ["Book 3", "Book 4", "Book 5"])
+        self.assertEqual(set(links), {"Previous", "Next"})
+        self.assertIn("page_size=3", links["Next"])
+
+        _, last, last_links = self.get(url + links["Next"])
+        self.assertEqual(last, ["Book 6"])
+        self.assertEqual(set(last_links), {"Previous"})
+
+        _, titles, links = self.get(url + links["Previous"])
+        self.assertEqual(titles, ["Book 0", "Book 1", "Book 2"])
+        self.assertEqual(set(links), {"Next"})
+
+    def test_default_page_size_bounds_the_page(self):
+        author = Author.objects.create(name="Prolific")
+        Book.objects.bulk_create(Book(title=f"Extra {i:03d}", author=author) for i in range(60))
+        response = self.client.get(reverse("list_books"), secure=True)
+        self.assertEqual(response.content.decode().count("<li>"), 50)
+
+    def test_author_filter(self):
+        url = reverse("list_books") + f"?author={self.orwell.pk}"
+        _, titles, _ = self.get(url)
+        self.assertEqual(titles, ["Book 1", "Book 3", "Book 5"])
+        with self.assertNumQueries(1):
+            self.client.get(url + "&page_size=2", secure=True)
+
+    def test_library_detail_is_paginated(self):
+        url = reverse("library_detail", kwargs={"pk": self.library.pk})
+        _, titles, links = self.get(url + f"?page_size=2&author={self.austen.pk}")
+        self.assertEqual(titles, ["Book 0", "Book 2"])
+        _, titles, _ = self.get(url + links["Next"])
+        self.assertEqual(titles, ["Book 4", "Book 6"])
+
+    def test_invalid_parameters_are_not_found(self):
+        url = reverse("list_books")
+        self.assertEqual(self.client.get(url + "?cursor=bogus", secure=True).status_code, 404)
+        self.assertEqual(self.client.get(url + "?author=x", secure=True).status_code, 404)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.orwell = Author.objects.create(name="George Orwell")
+        self.library = Library.objects.create(name="Central")
+        for index in range(5):
+            self.library.books.add(Book.objects.create(title=f"Book {index}", author=self.orwell))
+
+    def get_async(self, url):
+        return async_to_sync(self.async_client.get)(url, secure=True)
+
+    def assertSameAsSync(self, name, async_name, query="", **kwargs):
+        sync_response = self.client.get(reverse(name, kwargs=kwargs) + query, secure=True)
+        async_response = self.get_async(reverse(async_name, kwargs=kwargs) + query)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        return async_response
+
+    def test_list_books_matches_sync_view(self):
+        for query in ("", "?page_size=2", f"?page_size=2&author={self.orwell.pk}"):
+            with self.subTest(query=query):
+                self.assertSameAsSync("list_books", "list_books_async", query)
+        response = self.get_async(reverse("list_books_async") + "?page_size=2")
+        cursor = re.search(r"cursor=([\w-]+)", response.content.decode()).group(1)
+        response = self.assertSameAsSync("list_books", "list_books_async", f"?page_size=2&cursor={cursor}")
+        self.assertEqual(re.findall(r"<li>(Book \d+)", response.content.decode()), ["Book 2", "Book 3"])
+
+    def test_library_detail_matches_sync_view(self):
+        pk = self.library.pk
+        self.assertSameAsSync("library_detail", "library_detail_async", "?page_size=3", pk=pk)
+        self.assertSameAsSync("library_detail", "library_detail_async", pk=pk + 1)
+        self.assertSameAsSync("library_detail", "library_detail_async", "?cursor=bogus", pk=pk)
+
+    def test_cached_fragment_skips_queries(self):
+        url = reverse("list_books_async")
+        self.get_async(url)
+        with self.assertNumQueries(0):
+            self.assertContains(self.get_async(url), "Book 4 by George Orwell")
+
+    def test_server_timing_counts_async_queries(self):
+        response = self.get_async(reverse("list_books_async"))
+        self.assertIn('desc="1 queries"', response["Server-Timing"])
+
+
+class BookCountTests(TestCase):
+    def setUp(self):
+        self.orwell = Author.objects.create(name="George Orwell")
+        self.austen = Author.objects.create(name="Jane Austen")
+        self.central = Library.objects.create(name="Central")
+        self.annex = Library.objects.create(name="Annex")
+
+    def assertCounts(self, *expected):
+        counts = [obj.book_count for obj in Author.objects.order_by("pk")]
+        counts += [obj.book_count for obj in Library.objects.order_by("pk")]
+        self.assertEqual(counts, list(expected))
+
+    def test_author_counts(self):
+        book = Book.objects.create(title="1984", author=self.orwell)
+        Book.objects.create(title="Animal Farm", author=self.orwell)
+        self.assertCounts(2, 0, 0, 0)
+
+        book = Book.objects.get(pk=book.pk)
+        book.author = self.austen
+        book.save()
+        book.save()
+        self.assertCounts(1, 1, 0, 0)
+
+        book.delete()
+        self.assertCounts(1, 0, 0, 0)
+
+    def test_deferred_author_keeps_counts(self):
+        book = Book.objects.create(title="1984", author=self.orwell)
+        book = Book.objects.only("title").get(pk=book.pk)
+        book.title = "Nineteen Eighty-Four"
+        book.save()
+        self.assertCounts(1, 0, 0, 0)
+
+        book.author = self.austen
+        book.save()
+        self.assertCounts(0, 1, 0, 0)
+
+    def test_library_counts_from_both_sides(self):
+        first = Book.objects.create(title="1984", author=self.orwell)
+        second = Book.objects.create(title="Emma", author=self.austen)
+
+        self.central.books.add(first, second)
+        self.central.books.add(first)
+        first.libraries.add(self.annex)
+        self.assertCounts(1, 1, 2, 1)
+
+        self.central.books.remove(first)
+        self.central.books.remove(first)
+        self.assertCounts(1, 1, 1, 1)
+
+        second.libraries.add(self.annex)
+        first.libraries.clear()
+        self.assertCounts(1, 1, 1, 1)
+
+        self.annex.books.clear()
+        self.assertCounts(1, 1, 1, 0)
+
+        second.libraries.remove(self.central)
+        self.assertCounts(1, 1, 0, 0)
+
+    def test_deleting_books_updates_libraries(self):
+        book = Book.objects.create(title="1984", author=self.orwell)
+        self.central.books.add(book)
+        self.annex.books.add(book)
+        self.orwell.delete()
+        self.assertCounts(0, 0, 0)
+
+    def test_rebuild_command_fixes_drift(self):
+        books = Book.objects.bulk_create(
+            [Book(title=f"Book {i}", author=self.austen) for i in range(3)]
+        )
+        Library.books.through.objects.bulk_create(
+            [Library.books.through(library=self.annex, book=book) for book in books]
+        )
+        self.assertCounts(0, 0, 0, 0)
+
+        out = io.StringIO()
+        call_command("rebuild_book_counts", stdout=out)
+        self.assertIn("Fixed book counts of 1 authors and 1 libraries.", out.getvalue())
+        self.assertCounts(0, 3, 0, 3)
+
+    def test_delete_after_bulk_create(self):
+        book, = Book.objects.bulk_create([Book(title="Uncounted", author=self.orwell)])
+        Library.books.through.objects.create(library=self.central, book=book)
+        self.assertCounts(0, 0, 0, 0)
+
+        Book.objects.get(pk=book.pk).delete()
+        self.assertCounts(0, 0, 0, 0)
+
+
+@override_settings(REPLICA_ROUTER={"REPLICAS": ["replica"], "STICKY_SECONDS": 5})
+class ReplicaRoutingTests(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        get_user_model().objects.create_user("ada", password="pw")
+        # The replica has replayed the first book but not the second
+        orwell = Author.objects.create(name="George Orwell")
+        self.library = Library.objects.create(name="Central")
+        self.library.books.add(Book.objects.create(title="1984", author=orwell))
+        Author.objects.using("replica").create(pk=orwell.pk, name="George Orwell")
+        Library.objects.using("replica").create(pk=self.library.pk, name="Central")
+        Book.objects.using("replica").create(pk=1984, title="1984", author_id=orwell.pk)
+        Library.books.through.objects.using("replica").create(library_id=self.library.pk, book_id=1984)
+        self.library.books.add(Book.objects.create(title="Animal Farm", author=orwell))
+
+    def titles(self, name, **kwargs):
+        url = reverse(name, kwargs=kwargs)
+        if name.endswith("_async"):
+            response = async_to_sync(self.async_client.get)(url, secure=True)
+        else:
+            response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return re.findall(r"<li>(.+?) by", response.content.decode())
+
+    def log_in(self):
+        response = self.client.post(
+            reverse("login"), {"username": "ada", "password": "pw"}, secure=True
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_reads_use_replica(self):
+        for name in ("list_books", "list_books_async"):
+            with self.subTest(name=name):
+                self.assertEqual(self.titles(name), ["1984"])
+        for name in ("library_detail", "library_detail_async"):
+            with self.subTest(name=name):
+                self.assertEqual(self.titles(name, pk=self.library.pk), ["1984"])
+
+    def test_writer_reads_own_writes(self):
+        # Logging in writes the session and last_login
+        self.log_in()
+        self.assertEqual(self.titles("list_books"), ["1984", "Animal Farm"])
+        self.assertEqual(self.titles("library_detail", pk=self.library.pk), ["1984", "Animal Farm"])
+
+    def test_other_clients_see_replica_lag(self):
+        self.log_in()
+        self.client.cookies.clear()
+        self.assertEqual(self.titles("list_books"), ["1984"])
+
+    def test_pin_expires(self):
+        self.log_in()
+        later = time.time() + 6
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(self.titles("list_books"), ["1984"])
+
+    def test_writes_go_to_primary(self):
+        with replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_write(Book), "default")
+        self.log_in()
+        self.assertIsNotNone(get_user_model().objects.using("default").get(username="ada").last_login)
+        self.assertFalse(get_user_model().objects.using("replica").exists())
+
+    @override_settings(REPLICA_ROUTER={"REPLICAS": []})
+    def test_no_replicas(self):
+        self.assertEqual(self.titles("list_books"), ["1984", "Animal Farm"])
+
+
+class SQLiteBackendTests(TestCase):
+    def connect(self, **options):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {
+            **connection.settings_dict,
+            "NAME": os.path.join(directory.name, "db.sqlite3"),
+            "OPTIONS": options,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias="pragmas")
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_default_pragmas(self):
+        wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 1)
+        self.assertEqual(self.pragma(wrapper, "mmap_size"), 256 * 1024 * 1024)
+        self.assertEqual(self.pragma(wrapper, "cache_size"), -64 * 1024)
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 5000)
+
+    def test_configured_pragmas(self):
+        wrapper = self.connect(pragmas={"journal_mode": None, "busy_timeout": 100})
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "delete")
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 100)
+
+    def test_invalid_pragma(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "invalid entry 'cache_size'"):
+            self.connect(pragmas={"cache_size": "1; DROP TABLE auth_user"})
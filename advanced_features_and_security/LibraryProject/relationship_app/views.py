@@ -1,27 +1,97 @@
+from django.http import Http404
 from django.shortcuts import render, redirect
+from django.template.response import TemplateResponse
 from django.views.generic.detail import DetailView
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
-from django.contrib.auth.decorators import user_passes_test
+from django.utils.decorators import method_decorator
 
+from LibraryProject.db_router import read_from_replica
+
+from .catalog import catalog_cache_context, fragment_is_cached
 from .models import Book
 from .models import Library
 from .models import UserProfile
+from .pagination import KeysetPaginator
+from .roles import role_required
+
+
+def paginate_books(request, books):
+    """
+    Return template context for one page of `books`, optionally filtered
+    with ?author=<id>.
+
+    The page is lazy, so it only queries when the cached list is stale.
+    """
+    author = request.GET.get("author")
+    if author:
+        try:
+            books = books.filter(author_id=int(author))
+        except ValueError:
+            raise Http404("Invalid author.")
+    page = KeysetPaginator(books).get_page(request)
+
+    # Links keep every parameter but the cursor
+    params = request.GET.copy()
+    params.pop(KeysetPaginator.cursor_query_param, None)
+    base_query = params.urlencode() + "&" if params else ""
+    return {"books": page, "page": page, "base_query": base_query, **catalog_cache_context()}
+
+
+async def afetch_page(request, fragment_name, context):
+    """
+    Load the page of a paginate_books() context with the async ORM,
+    unless the cached fragment means the template will not read it.
+    """
+    if not fragment_is_cached(fragment_name, context["catalog_version"], request.get_full_path()):
+        await context["page"].afetch()
 
 
 # Function-based view: list all books
+@read_from_replica
 def list_books(request):
-    books = Book.objects.all()
-    return render(request, "relationship_app/list_books.html", {"books": books})
+    # The template shows book.author.name; join it in instead of one query per book
+    books = Book.objects.select_related("author")
+    context = paginate_books(request, books)
+    return render(request, "relationship_app/list_books.html", context)
+
+
+# Async variant of list_books, for ASGI deployments
+@read_from_replica
+async def list_books_async(request):
+    books = Book.objects.select_related("author")
+    context = paginate_books(request, books)
+    await afetch_page(request, "list_books", context)
+    # Rendered by the handler, in a thread: should the fragment expire
+    # after the check above, the lazy page can still load itself
+    return TemplateResponse(request, "relationship_app/list_books.html", context)
 
 
 # Class-based view: show details for a specific library
+@method_decorator(read_from_replica, name="get")
 class LibraryDetailView(DetailView):
     model = Library
     template_name = "relationship_app/library_detail.html"
     context_object_name = "library"
 
+    def get_context_data(self, **kwargs):
+        books = self.object.books.select_related("author")
+        return super().get_context_data(**paginate_books(self.request, books), **kwargs)
+
+
+# Async variant of LibraryDetailView, for ASGI deployments
+@method_decorator(read_from_replica, name="get")
+class AsyncLibraryDetailView(LibraryDetailView):
+    async def get(self, request, *args, **kwargs):
+        try:
+            self.object = await self.get_queryset().aget(pk=self.kwargs[self.pk_url_kwarg])
+        except Library.DoesNotExist:
+            raise Http404("No library found matching the query")
+        context = self.get_context_data(object=self.object)
+        await afetch_page(request, "library_detail", context)
+        return self.render_to_response(context)
+
 
 # Authentication views
 
@@ -45,45 +115,19 @@ def register(request):
     return render(request, "relationship_app/register.html", {"form": form})
 
 
-# Role check helper functions
-
-def is_admin(user):
-    return (
-        user.is_authenticated
-        and hasattr(user, "userprofile")
-        and user.userprofile.role == "Admin"
-    )
-
-
-def is_librarian(user):
-    return (
-        user.is_authenticated
-        and hasattr(user, "userprofile")
-        and user.userprofile.role == "Librarian"
-    )
-
-
-def is_member(user):
-    return (
-        user.is_authenticated
-        and hasattr(user, "userprofile")
-        and user.userprofile.role == "Member"
-    )
-
-
 # Role-based views
 
-@user_passes_test(is_admin)
+@role_required("Admin")
 def admin_view(request):
     return render(request, "relationship_app/admin_view.html")
 
 
-@user_passes_test(is_librarian)
+@role_required("Librarian")
 def librarian_view(request):
     return render(request, "relationship_app/librarian_view.html")
 
 
-@user_passes_test(is_member)
+@role_required("Member")
 def member_view(request):
     return render(request, "relationship_app/member_view.html")
 
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Book
+from .search import search_books
 
 
 @admin.register(Book)
@@ -8,4 +9,10 @@ class BookAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'author')
     list_filter = ('author',)
     search_fields = ('title', 'author')
-    ordering = ('title',)
\ No newline at end of file
+    ordering = ('title',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search through the full-text index instead of LIKE scans."""
+        if not search_term:
+            return queryset, False
+        return search_books(queryset, search_term, ranked=False), False
\ No newline at end of file
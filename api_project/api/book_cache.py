@@ -0,0 +1,185 @@
+"""
+Write-through object cache for api.models.Book, keyed on primary key.
+
+BookViewSet.retrieve reads books from here instead of issuing one SELECT
+per request. Entries are:
+
+* filled on read, with cache.add() so that a slow reader never replaces
+  a newer value written through by a concurrent save;
+* written through whenever a Book is saved and dropped when it is
+  deleted (api.signals, which covers BookViewSet.perform_create,
+  perform_update and perform_destroy), and after the bulk actions.
+  Inside a transaction the entry is dropped straight away and written
+  when the transaction commits, so a rollback never leaves data behind.
+
+Concurrent misses for the same book in one process are coalesced into a
+single query (single-flight), so a hot book expiring sends one request
+per worker to the database instead of every request waiting for it.
+Misses read wherever the view's reads go, so BookViewSet.retrieve fills
+from a replica (see api_project.db_router). The exception is a book
+written in the last STICKY_SECONDS: a replica may not have it yet, and
+caching its old row would serve it to everyone for TIMEOUT, so that fill
+reads the primary. Missing books are not cached.
+
+Configuration (settings.API_BOOK_CACHE):
+    CACHE_ALIAS: Django cache holding the entries (default 'default',
+        None disables the cache)
+    TIMEOUT: Seconds an entry stays cached (default 300)
+
+Use a shared cache backend when running several workers, otherwise a
+worker that did not perform a write keeps serving the old row until
+TIMEOUT expires.
+"""
+
+import copy
+import threading
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from api_project.db_router import get_router_settings, replica_reads
+
+from .cache import SingleFlight
+from .models import Book
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+KEY_PREFIX = 'api:book:'
+WRITTEN_KEY_PREFIX = 'api:book-written:'
+
+
+def get_book_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'API_BOOK_CACHE', {})}
+
+
+class BookCache:
+    """
+    Book instances by primary key, with hit/miss counters.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def configure(self):
+        conf = get_book_cache_settings()
+        self.alias = conf['CACHE_ALIAS']
+        self.timeout = conf['TIMEOUT']
+        self.flight = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias] if self.alias else None
+
+    def key(self, pk):
+        return f'{KEY_PREFIX}{pk}'
+
+    def written_key(self, pk):
+        return f'{WRITTEN_KEY_PREFIX}{pk}'
+
+    def load(self, pk, primary=False):
+        """
+        Read a book from the database, or return None if it does not exist.
+
+        With `primary`, read the primary even inside replica_reads().
+        """
+        with replica_reads(False) if primary else nullcontext():
+            return Book.objects.filter(pk=pk).first()
+
+    def get(self, pk):
+        """Return the book with primary key `pk`, or None if there is none."""
+        if self.cache is None:
+            return self.load(pk)
+
+        key = self.key(pk)
+        book = self.cache.get(key)
+        if book is not None:
+            self.count(hits=1)
+            return book
+
+        book, shared = self.flight.do(key, lambda: self.fill(key, pk))
+        self.count(misses=1, coalesced=int(shared))
+        # Waiters share the leader's instance; hand each its own copy
+        return copy.copy(book) if shared and book is not None else book
+
+    def fill(self, key, pk):
+        book = self.load(pk, primary=self.cache.get(self.written_key(pk)) is not None)
+        if book is not None:
+            self.cache.add(key, book, timeout=self.timeout)
+        return book
+
+    def count(self, hits=0, misses=0, coalesced=0):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.coalesced += coalesced
+
+    def write(self, books, using=None):
+        """Write `books` through to the cache once their transaction commits."""
+        if self.cache is None or not books:
+            return
+        entries = {self.key(book.pk): book for book in books}
+        self.mark_written([book.pk for book in books], using)
+        if transaction.get_connection(using).in_atomic_block:
+            self.cache.delete_many(list(entries))
+            transaction.on_commit(
+                lambda: self.cache.set_many(entries, timeout=self.timeout), using=using
+            )
+        else:
+            self.cache.set_many(entries, timeout=self.timeout)
+
+    def evict(self, pks, using=None):
+        """Drop the books with primary keys `pks`, now and on commit."""
+        if self.cache is None or not pks:
+            return
+        keys = [self.key(pk) for pk in pks]
+        self.mark_written(pks, using)
+        self.cache.delete_many(keys)
+        if transaction.get_connection(using).in_atomic_block:
+            transaction.on_commit(lambda: self.cache.delete_many(keys), using=using)
+
+    def mark_written(self, pks, using=None):
+        """
+        Send fills of `pks` to the primary for the next STICKY_SECONDS,
+        counted from the commit.
+        """
+        markers = dict.fromkeys((self.written_key(pk) for pk in pks), True)
+
+        def mark():
+            self.cache.set_many(markers, timeout=get_router_settings()['STICKY_SECONDS'])
+
+        mark()
+        if transaction.get_connection(using).in_atomic_block:
+            transaction.on_commit(mark, using=using)
+
+    def clear(self):
+        """Reset the counters (entries expire on their own)."""
+        with self._lock:
+            self.hits = self.misses = self.coalesced = 0
+
+    def stats(self):
+        """
+        Return lookup counters.
+
+        `misses` counts lookups not answered by the cache; `coalesced` is
+        the part of them that waited for another thread's query instead
+        of running their own, so `misses - coalesced` queries were made.
+        """
+        with self._lock:
+            hits, misses, coalesced = self.hits, self.misses, self.coalesced
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'coalesced': coalesced,
+            'queries': misses - coalesced,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+        }
+
+
+book_cache = BookCache()
@@ -0,0 +1,127 @@
+"""
+Small in-process caching helpers used by the API.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    Keeps hit/miss counters so callers can expose a hit ratio.
+
+    Args:
+        maxsize (int): Maximum number of entries kept before evicting
+            the least recently used one
+        ttl (float): Seconds an entry stays valid (None for no expiry)
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self.timer():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else self.timer() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        """Drop every entry whose value matches `predicate`."""
+        with self._lock:
+            stale = [k for k, (v, _) in self._data.items() if predicate(v)]
+            for key in stale:
+                del self._data[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single call.
+
+    While one thread runs `func` for a key, other threads asking for the
+    same key wait for it and get its result (or its exception) instead
+    of running `func` themselves.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Return (result, shared), where shared is True for waiters."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
@@ -0,0 +1,69 @@
+"""
+Catalog version for api.models.Book.
+
+A single counter, kept in Django's cache framework, that changes whenever
+any Book row is written. Views use it to build ETag / Last-Modified headers
+without querying or serializing the table.
+
+Use a shared cache backend (memcached, redis, database) when running
+several worker processes, otherwise each worker keeps its own counter.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+VERSION_KEY = 'api:book-catalog:version'
+MODIFIED_KEY = 'api:book-catalog:modified'
+
+
+def _initial_version():
+    # Seeded from the clock so that a flushed or evicted counter never
+    # hands out a version (and therefore an ETag) that was used before.
+    return int(time.time() * 1000)
+
+
+def get_catalog_state():
+    """
+    Return (version, last_modified) for the Book catalog.
+
+    last_modified is a timezone-aware datetime of the most recent write
+    seen by the cache (or of the first read after a cache flush).
+    """
+    values = cache.get_many([VERSION_KEY, MODIFIED_KEY])
+    if VERSION_KEY in values and MODIFIED_KEY in values:
+        return values[VERSION_KEY], values[MODIFIED_KEY]
+
+    cache.add(VERSION_KEY, _initial_version(), timeout=None)
+    cache.add(MODIFIED_KEY, timezone.now(), timeout=None)
+    values = cache.get_many([VERSION_KEY, MODIFIED_KEY])
+    return values.get(VERSION_KEY, 0), values.get(MODIFIED_KEY, timezone.now())
+
+
+def get_catalog_version():
+    """Return the current catalog version."""
+    return get_catalog_state()[0]
+
+
+def bump_catalog_version():
+    """Mark the catalog as changed."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _initial_version(), timeout=None)
+    cache.set(MODIFIED_KEY, timezone.now(), timeout=None)
+
+
+def catalog_changed(using=None):
+    """
+    Bump the catalog version for a write made on `using`.
+
+    The version is bumped straight away and again when the surrounding
+    transaction commits, so a reader that sneaks in between the write and
+    the commit cannot pin the pre-commit data to the new version.
+    """
+    bump_catalog_version()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(bump_catalog_version, using=using)
@@ -0,0 +1,29 @@
+"""
+Model fields for SQLite FTS5 full-text search.
+"""
+
+from django.db import models
+from django.db.models import Lookup
+
+
+class FTS5MatchField(models.Field):
+    """
+    The hidden column an FTS5 table exposes under its own name.
+
+    It is never read; it exists so that queries can filter on it with the
+    `match` lookup, e.g. ``Book.objects.filter(search_index__match='...')``.
+    """
+
+    def db_type(self, connection):
+        return None
+
+
+@FTS5MatchField.register_lookup
+class Match(Lookup):
+    """``<fts table> MATCH <expression>``."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
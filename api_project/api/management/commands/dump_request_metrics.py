@@ -0,0 +1,89 @@
+"""
+Print the per-route request metrics collected by QueryMetricsMiddleware.
+
+    python manage.py dump_request_metrics [--json] [--sort total] [--reset]
+
+Reads the files every worker writes to REQUEST_METRICS['DIR'] and merges
+them. Percentiles are estimated from the histogram buckets.
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_project.middleware import (
+    QUERY_BUCKETS,
+    TIME_BUCKETS_MS,
+    get_metrics_settings,
+    histogram_quantile,
+    load_metrics,
+)
+
+SORT_KEYS = {
+    'requests': lambda stats: stats['requests'],
+    'total': lambda stats: stats['total_ms'],
+    'queries': lambda stats: stats['queries'] / stats['requests'],
+    'db': lambda stats: stats['db_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Print per-route query count, SQL time, latency and size histograms.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true', help='Print raw merged JSON.')
+        parser.add_argument(
+            '--sort', choices=sorted(SORT_KEYS), default='total',
+            help='Column to sort routes by (descending).',
+        )
+        parser.add_argument(
+            '--reset', action='store_true', help='Delete the metrics files afterwards.'
+        )
+
+    def handle(self, *args, **options):
+        directory = get_metrics_settings()['DIR']
+        if not directory:
+            raise CommandError("Set REQUEST_METRICS['DIR'] to collect request metrics.")
+
+        routes = load_metrics(directory)
+        if options['json']:
+            self.stdout.write(json.dumps(routes, indent=2, sort_keys=True))
+        elif not routes:
+            self.stdout.write('No request metrics recorded yet.')
+        else:
+            self.write_table(routes, SORT_KEYS[options['sort']])
+
+        if options['reset']:
+            for path in Path(directory).glob('request-metrics-*.json'):
+                path.unlink()
+
+    def write_table(self, routes, sort_key):
+        headers = (
+            'route', 'requests', 'avg ms', 'p50 ms', 'p95 ms',
+            'avg queries', 'p95 queries', 'max queries', 'avg db ms', 'avg KiB',
+        )
+        rows = []
+        for route, stats in sorted(routes.items(), key=lambda item: -sort_key(item[1])):
+            count = stats['requests']
+            rows.append((
+                route,
+                str(count),
+                f"{stats['total_ms'] / count:.1f}",
+                f"<={histogram_quantile(stats['total_ms_histogram'], TIME_BUCKETS_MS, 0.5)}",
+                f"<={histogram_quantile(stats['total_ms_histogram'], TIME_BUCKETS_MS, 0.95)}",
+                f"{stats['queries'] / count:.1f}",
+                f"<={histogram_quantile(stats['queries_histogram'], QUERY_BUCKETS, 0.95)}",
+                str(stats['max_queries']),
+                f"{stats['db_ms'] / count:.1f}",
+                f"{stats['bytes'] / stats['sized'] / 1024:.1f}" if stats['sized'] else '-',
+            ))
+
+        widths = [max(len(h), *(len(r[i]) for r in rows)) for i, h in enumerate(headers)]
+        line = '  '.join(h.ljust(w) if i == 0 else h.rjust(w)
+                         for i, (h, w) in enumerate(zip(headers, widths)))
+        self.stdout.write(line)
+        self.stdout.write('-' * len(line))
+        for row in rows:
+            self.stdout.write('  '.join(c.ljust(w) if i == 0 else c.rjust(w)
+                                        for i, (c, w) in enumerate(zip(row, widths))))
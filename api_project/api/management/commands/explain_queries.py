@@ -0,0 +1,115 @@
+"""
+Run EXPLAIN QUERY PLAN over the API's known queries.
+
+    python manage.py explain_queries [--verbose]
+
+Exits with an error if any query plan contains a full table scan or a
+temporary sort, or if a trigger keeping the search index in sync is
+missing, so it can run in CI to catch index regressions.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+
+from api.models import Book
+from api.search import has_search_index, missing_sync_triggers, search_books
+
+# "SCAN api_book" reads the whole table. "SCAN api_book USING INDEX ..."
+# walks an index in order, which is only cheap when a LIMIT stops it early.
+# Virtual tables (FTS5) plan their own access.
+SCAN_RE = re.compile(
+    r'\bSCAN (?:TABLE )?\w+\b(?! VIRTUAL TABLE)(?P<index> USING (?:COVERING )?INDEX)?'
+)
+TEMP_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (?:ORDER BY|GROUP BY|DISTINCT)')
+
+
+def get_known_queries():
+    """
+    Return (label, queryset, allowed) for the queries the API issues.
+
+    `allowed` lists plan features that are expected for that query:
+    'scan' (it reads the whole table on purpose) or 'sort'.
+    """
+    queries = [
+        ('BookList page 1', Book.objects.order_by('title', 'id')[:51], ()),
+        ('BookList keyset page',
+         Book.objects.filter(Q(title__gte='m') & (Q(title__gt='m') | Q(id__gt=1)))
+         .order_by('title', 'id')[:51], ()),
+        ('BookViewSet retrieve', Book.objects.filter(pk=1), ()),
+        ('BookExport stream',
+         Book.objects.order_by('id').values_list('id', 'title', 'author'), ('scan',)),
+        ('Admin author filter',
+         Book.objects.filter(author='Tolkien').order_by('title'), ()),
+    ]
+    if has_search_index():
+        # Ranking has to sort the matches; the match itself uses the index
+        queries.append(
+            ('BookList search', search_books(Book.objects.all(), 'hobbit')[:50], ('sort',))
+        )
+    return queries
+
+
+def find_problems(plan, allowed=(), limited=False):
+    """
+    Return the plan lines that indicate a full scan or a temp sort.
+
+    `limited` says whether the query has a LIMIT, which turns an ordered
+    index walk into a short read.
+    """
+    problems = []
+    for line in plan.splitlines():
+        scan = SCAN_RE.search(line)
+        if 'scan' not in allowed and scan and not (scan['index'] and limited):
+            problems.append(line.strip())
+        elif 'sort' not in allowed and TEMP_SORT_RE.search(line):
+            problems.append(line.strip())
+    return problems
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN QUERY PLAN over the API's known queries and flag full scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose', action='store_true', help='Print every query plan.'
+        )
+        parser.add_argument(
+            '--database', default='default', help='Database alias to explain against.'
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if connections[alias].vendor != 'sqlite':
+            raise CommandError('explain_queries understands SQLite query plans only.')
+
+        failures = 0
+        for label, queryset, allowed in get_known_queries():
+            plan = queryset.using(alias).explain()
+            problems = find_problems(plan, allowed, queryset.query.is_sliced)
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'FAIL {label}'))
+                for line in problems:
+                    self.stdout.write(f'    {line}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'ok   {label}'))
+            if options['verbose']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    | {line}')
+
+        missing = missing_sync_triggers(alias)
+        if missing:
+            self.stdout.write(self.style.ERROR('FAIL search index sync triggers'))
+            for name in missing:
+                self.stdout.write(f'    missing {name}')
+            raise CommandError(
+                f'Search index triggers missing: {", ".join(missing)}. '
+                'A migration rebuilt api_book; recreate them as migration 0003 does.'
+            )
+        self.stdout.write(self.style.SUCCESS('ok   search index sync triggers'))
+
+        if failures:
+            raise CommandError(f'{failures} known queries fall back to a full scan.')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'ordering': ['title'], 'verbose_name': 'Book', 'verbose_name_plural': 'Books'},
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title', 'id'], name='api_book_title_id_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:51
+
+import api.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+FTS_TABLE_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS api_book_fts USING fts5(
+    title, author,
+    content='api_book', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+FTS_TRIGGERS_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS api_book_fts_ai AFTER INSERT ON api_book BEGIN
+        INSERT INTO api_book_fts(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_book_fts_ad AFTER DELETE ON api_book BEGIN
+        INSERT INTO api_book_fts(api_book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_book_fts_au AFTER UPDATE ON api_book BEGIN
+        INSERT INTO api_book_fts(api_book_fts, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO api_book_fts(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+]
+
+
+def create_fts_index(apps, schema_editor):
+    """Create and populate the FTS5 index (SQLite only)."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(FTS_TABLE_SQL)
+    for sql in FTS_TRIGGERS_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(
+        "INSERT INTO api_book_fts(api_book_fts) VALUES ('rebuild')"
+    )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in ('api_book_fts_ai', 'api_book_fts_ad', 'api_book_fts_au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    schema_editor.execute('DROP TABLE IF EXISTS api_book_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_book_title_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchIndex',
+            fields=[
+                ('book', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='api.book')),
+                ('title', models.TextField()),
+                ('author', models.TextField()),
+                ('rank', models.FloatField()),
+                ('match', api.fields.FTS5MatchField(db_column='api_book_fts')),
+            ],
+            options={
+                'db_table': 'api_book_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
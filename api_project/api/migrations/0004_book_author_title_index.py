@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_book_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'title'], name='api_book_author_title_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:01
+
+"""
+Make (title, author) unique on Book.
+
+On SQLite the constraint is created as a plain unique index. Adding it
+as a table constraint (AddConstraint) would make SQLite rebuild api_book,
+and the rebuild drops the triggers that keep the FTS5 search index from
+migration 0003 in sync. Search would then silently stop seeing new and
+changed books. The model state still records a UniqueConstraint, so
+Django validates it and other databases get a real constraint.
+
+A later migration that alters Book on SQLite has the same problem and
+must recreate the triggers; `manage.py explain_queries` fails when one
+is missing. Rows that already break the constraint must be removed
+before migrating.
+"""
+
+from django.db import migrations, models
+
+CONSTRAINT = models.UniqueConstraint(
+    fields=('title', 'author'), name='api_book_unique_title_author'
+)
+
+
+def add_constraint(apps, schema_editor):
+    """
+    Add the constraint; on SQLite as a unique index.
+
+    SQLite can only add a table constraint by rebuilding api_book, which
+    would drop the FTS triggers from migration 0003.
+    """
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE UNIQUE INDEX api_book_unique_title_author ON api_book (title, author)'
+        )
+    else:
+        schema_editor.add_constraint(apps.get_model('api', 'Book'), CONSTRAINT)
+
+
+def remove_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP INDEX IF EXISTS api_book_unique_title_author')
+    else:
+        schema_editor.remove_constraint(apps.get_model('api', 'Book'), CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_book_author_title_index'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddConstraint(model_name='book', constraint=CONSTRAINT),
+            ],
+            database_operations=[
+                migrations.RunPython(add_constraint, remove_constraint),
+            ],
+        ),
+    ]
@@ -0,0 +1,243 @@
+"""
+Reusable view behaviour for the Book API.
+"""
+
+import hashlib
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from api_project.db_router import replica_reads
+
+from .catalog import get_catalog_state
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and retrieve requests with ETag / Last-Modified headers.
+
+    Both headers are derived from the catalog version (see api.catalog),
+    so an unchanged catalog is answered with 304 Not Modified before the
+    queryset is evaluated or the serializer is touched.
+    """
+
+    def get_etag(self, request, version):
+        """
+        Build a strong ETag for the current request.
+
+        The query string and negotiated media type are part of the tag
+        because different pages and renderers produce different bodies.
+        """
+        parts = [
+            str(version),
+            getattr(self, 'action', None) or request.method,
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', '') or '',
+        ]
+        digest = hashlib.md5('|'.join(parts).encode('utf-8'), usedforsecurity=False)
+        return f'"{digest.hexdigest()}"'
+
+    def get_validators(self, request):
+        """
+        Return (etag, timestamp, response), where response is a 304/412
+        answer when the request's preconditions already settle it.
+        """
+        version, last_modified = get_catalog_state()
+        etag = self.get_etag(request, version)
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        return etag, timestamp, response
+
+    def set_validators(self, response, etag, timestamp):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        etag, timestamp, response = self.get_validators(request)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.set_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, request, handler, *args, **kwargs):
+        """conditional_response() for an async handler."""
+        etag, timestamp, response = self.get_validators(request)
+        if response is None:
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        return self.set_validators(response, etag, timestamp)
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Serve JSON list responses straight from `queryset.values()`.
+
+    For plain model fields a ModelSerializer only copies attributes, but it
+    does so through per-field machinery that costs more than the query.
+    When the negotiated renderer is JSON, the list action skips the
+    serializer and model instantiation and renders the value dicts
+    directly; the bytes are identical as long as `list_values_fields`
+    matches the serializer's fields. Other renderers (the browsable API)
+    use the regular serializer path.
+    """
+    list_values_fields = None
+
+    def use_values_list(self, request):
+        return (
+            self.list_values_fields is not None
+            and isinstance(getattr(request, 'accepted_renderer', None), JSONRenderer)
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_values_list(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*self.list_values_fields)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(rows))
+
+
+class ResponseCacheMixin:
+    """
+    Serve JSON list responses from a cache shared by every user.
+
+    `response_cache` is an api.response_cache.ResponseCache. On a hit the
+    stored body is returned before the queryset, serializer or renderer
+    is touched; on a miss the rendered body is stored once the response
+    is finalized. Only use it on views whose list is the same for every
+    user allowed to see it, and list it after ConditionalGetMixin so
+    that 304s are answered first.
+    """
+    response_cache = None
+
+    def get_response_cache_key(self, request):
+        """Return the cache key for this request, or None if it is not cacheable."""
+        if self.response_cache is None or self.response_cache.cache is None:
+            return None
+        if not isinstance(getattr(request, 'accepted_renderer', None), JSONRenderer):
+            return None
+        version, _ = get_catalog_state()
+        view = type(self)
+        action = getattr(self, 'action', None) or 'list'
+        # Bodies read from a lagging replica are kept apart from the
+        # primary's, which clients pinned by api_project.db_router read
+        database = self.get_queryset().db
+        scope = f'{view.__module__}.{view.__qualname__}.{action}@{database}'
+        return self.response_cache.key(request, version, scope)
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is not None:
+            entry = self.response_cache.get(key)
+            if entry is not None:
+                content, content_type = entry
+                return HttpResponse(content, content_type=content_type)
+        self.response_cache_key = key
+        return super().list(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'response_cache_key', None)
+        if key is not None and isinstance(response, Response) and response.status_code == 200:
+            response.render()
+            self.response_cache.set(key, response)
+        return response
+
+
+class CachedRetrieveMixin:
+    """
+    Look the retrieve action's object up in `object_cache`.
+
+    `object_cache` has a get(pk) method returning the instance or None,
+    such as api.book_cache.book_cache. Other actions (update, destroy)
+    keep reading the database, so they never write back a cached copy.
+    """
+    object_cache = None
+
+    def get_object(self):
+        if self.action != 'retrieve' or self.object_cache is None:
+            return super().get_object()
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = self.object_cache.get(int(self.kwargs[lookup_url_kwarg]))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None:
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+
+class ReplicaReadMixin:
+    """
+    Serve the list and retrieve actions from a read replica.
+
+    See api_project.db_router: clients that wrote recently are kept on
+    the primary, and so is everything else the view does.
+    """
+
+    def list(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().retrieve(request, *args, **kwargs)
+
+
+class AsyncDispatchMixin:
+    """
+    Dispatch an APIView to ``async def`` handlers, for ASGI deployments.
+
+    DRF's dispatch() is synchronous. This one awaits the handler and runs
+    initial() (authentication, permission and throttle checks) in a
+    thread, because authenticators may query the database. Every handler
+    but options() must be a coroutine, so that Django serves the view
+    without a thread of its own.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -1,5 +1,7 @@
 from django.db import models
 
+from .fields import FTS5MatchField
+
 
 class Book(models.Model):
     """
@@ -17,5 +19,44 @@ class Book(models.Model):
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            # Backs keyset pagination: WHERE (title, id) > (?, ?) ORDER BY title, id
+            models.Index(fields=['title', 'id'], name='api_book_title_id_idx'),
+            # Admin author filter: WHERE author = ? ORDER BY title
+            models.Index(fields=['author', 'title'], name='api_book_author_title_idx'),
+        ]
+        constraints = [
+            # One row per title and author; BookSerializer validates it
+            # (per batch in BookListSerializer) before the database does
+            models.UniqueConstraint(fields=['title', 'author'], name='api_book_unique_title_author'),
+        ]
         verbose_name = 'Book'
-        verbose_name_plural = 'Books'
\ No newline at end of file
+        verbose_name_plural = 'Books'
+
+
+class BookSearchIndex(models.Model):
+    """
+    Read-only view of the SQLite FTS5 index over Book title and author.
+
+    The table (api_book_fts) is an external-content FTS5 table created by
+    migration 0003 and kept in sync with api_book by SQL triggers, so every
+    write path, including bulk_create/bulk_update, updates it. It only
+    exists on SQLite; use api.search.search_books() rather than querying
+    it directly.
+    """
+    book = models.OneToOneField(
+        Book,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index',
+    )
+    title = models.TextField()
+    author = models.TextField()
+    rank = models.FloatField()
+    match = FTS5MatchField(db_column='api_book_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'api_book_fts'
@@ -0,0 +1,175 @@
+"""
+Keyset (cursor) pagination for the Book API.
+
+Pagination is opt-in: clients that send neither ``cursor`` nor ``page_size``
+keep receiving the plain, unpaginated list.
+
+Pages are selected with a ``WHERE (title, id) > (?, ?)`` style predicate
+instead of ``OFFSET``, so fetching page 10 000 costs the same index seek as
+page one. The ``(title, id)`` index on ``Book`` backs both the filter and
+the ordering.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class BookCursorPagination(BasePagination):
+    """
+    Opt-in keyset pagination ordered on (title, id).
+
+    Query parameters:
+        cursor: Opaque position returned in ``next`` / ``previous`` links
+        page_size: Number of books per page (capped at ``max_page_size``)
+
+    Response (when paginated):
+        {"next": url | null, "previous": url | null, "results": [...]}
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def is_requested(self, request):
+        """Return True if the client opted in to pagination."""
+        params = request.query_params
+        return (
+            self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """
+        Return (title, id, reverse) for the current cursor, or None when
+        starting from the beginning of the list.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode('ascii'))
+            title, pk, reverse = json.loads(raw.decode('utf-8'))
+            if not isinstance(title, str) or not isinstance(pk, int):
+                raise ValueError
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        return title, pk, bool(reverse)
+
+    def encode_cursor(self, title, pk, reverse=False):
+        payload = json.dumps([title, pk, int(reverse)], separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8'))
+        return encoded.decode('ascii').rstrip('=')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        queryset = self.get_page_queryset(queryset, request)
+        return self.get_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() reading the page with the async ORM."""
+        if not self.is_requested(request):
+            return None
+        queryset = self.get_page_queryset(queryset, request)
+        return self.get_page([row async for row in queryset.aiterator()])
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the (unevaluated) page_size + 1 rows following the cursor,
+        in cursor direction.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            queryset = queryset.order_by('title', 'id')
+        else:
+            title, pk, reverse = self.cursor
+            if reverse:
+                # The leading range predicate gives the index a start point;
+                # the OR only discards rows that share the boundary title.
+                queryset = queryset.filter(
+                    Q(title__lte=title) & (Q(title__lt=title) | Q(id__lt=pk))
+                ).order_by('-title', '-id')
+            else:
+                queryset = queryset.filter(
+                    Q(title__gte=title) & (Q(title__gt=title) | Q(id__gt=pk))
+                ).order_by('title', 'id')
+        return queryset[:self.page_size + 1]
+
+    def get_page(self, rows):
+        """Trim the rows fetched by get_page_queryset() to the page."""
+        cursor = self.cursor
+        title, pk, reverse = cursor if cursor is not None else (None, None, False)
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.first_position = self.get_position(rows[0]) if rows else (title, pk)
+        self.last_position = self.get_position(rows[-1]) if rows else (title, pk)
+        return rows
+
+    def get_position(self, item):
+        if isinstance(item, dict):
+            return item['title'], item['id']
+        return item.title, item.pk
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position[1] is None:
+            return None
+        cursor = self.encode_cursor(*self.last_position)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_position[1] is None:
+            return None
+        cursor = self.encode_cursor(*self.first_position, reverse=True)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,146 @@
+"""
+Renderers for the Book API.
+
+FastJSONRenderer is a byte-for-byte compatible JSONRenderer that encodes
+with orjson when it is installed (it is optional; without it the stock
+encoder is used).
+
+NDJSONRenderer and CSVRenderer can render a regular response body, but
+their main job is `stream()`: turning an iterator of row tuples into an
+iterator of encoded chunks for StreamingHttpResponse, so an export never
+holds more than one chunk of rows in memory.
+"""
+
+import csv
+import io
+import json
+import math
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+def _has_non_finite(data):
+    """Return True if `data` contains a NaN or infinite float at any depth."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that produces the same bytes, faster.
+
+    orjson is only used for the configuration it matches exactly: compact,
+    non-ASCII-escaping output without indentation (DRF's defaults). Any
+    other configuration, or data orjson cannot encode, falls back to
+    JSONRenderer.
+
+    orjson writes NaN and infinities as null where JSONRenderer raises
+    ValueError. When the body contains null, the data is searched for such
+    floats and, if one is found, rendered again by JSONRenderer so that it
+    raises; bodies with ordinary nulls keep the orjson output.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer, which escapes U+2028/U+2029 for JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Base class for renderers that can stream rows.
+
+    Subclasses implement `header()` and `encode_rows()`.
+    """
+    charset = 'utf-8'
+    rows_per_chunk = 500
+
+    def header(self, fields):
+        return ''
+
+    def encode_rows(self, rows, fields):
+        raise NotImplementedError('`encode_rows()` must be implemented.')
+
+    def stream(self, rows, fields):
+        """
+        Yield encoded chunks for `rows`, an iterable of tuples whose values
+        line up with `fields`.
+        """
+        header = self.header(fields)
+        if header:
+            yield header.encode(self.charset)
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.rows_per_chunk:
+                yield self.encode_rows(chunk, fields).encode(self.charset)
+                chunk = []
+        if chunk:
+            yield self.encode_rows(chunk, fields).encode(self.charset)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = [data]
+        fields = list(data[0]) if data else []
+        rows = [tuple(item.get(field) for field in fields) for item in data]
+        return b''.join(self.stream(rows, fields))
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """
+    Newline-delimited JSON: one object per line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    # json.dumps() builds a new encoder per call when given options
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+    def encode_rows(self, rows, fields):
+        encode = self.encoder.encode
+        return ''.join(encode(dict(zip(fields, row))) + '\n' for row in rows)
+
+
+class CSVRenderer(StreamingRenderer):
+    """
+    Comma-separated values with a header row.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def header(self, fields):
+        return self.encode_rows([fields], fields)
+
+    def encode_rows(self, rows, fields):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
@@ -0,0 +1,120 @@
+"""
+Shared cache of rendered Book list responses.
+
+Every authenticated user sees the same catalog, so BookList and the
+BookViewSet list action (api.mixins.ResponseCacheMixin) store the
+rendered JSON body once and serve it to everyone. A request that hits
+the cache runs no query after authentication: no Book query, no
+serializer and no renderer.
+
+Entries are keyed on the catalog version (api.catalog), so any Book
+write moves every list to a new key and the old entries are left to
+expire. The rest of the key is the view and action, the database the
+list is read from (a replica or the primary), the scheme and host
+(pagination links are absolute), the negotiated media type and the
+query string, normalized so that parameter order does not matter.
+Only JSON responses are cached; the browsable API shows the current
+user and is always rendered.
+
+Configuration (settings.API_RESPONSE_CACHE):
+    CACHE_ALIAS: Django cache holding the bodies (default 'default',
+        None disables the cache)
+    TIMEOUT: Seconds a body stays cached (default 300)
+    MAX_SIZE: Largest body, in bytes, worth caching (default 1 MiB);
+        the unpaginated list of a large catalog is rendered every time
+"""
+
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'MAX_SIZE': 1024 * 1024,
+}
+KEY_PREFIX = 'api:response:'
+
+
+def get_response_cache_settings():
+    return {**DEFAULTS, **getattr(settings, 'API_RESPONSE_CACHE', {})}
+
+
+def normalize_query(query_params):
+    """Return the query string with parameters and values in sorted order."""
+    return urlencode(sorted(
+        (key, value) for key in query_params for value in query_params.getlist(key)
+    ))
+
+
+class ResponseCache:
+    """
+    Rendered response bodies by catalog version and request, with
+    hit/miss counters.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def configure(self):
+        conf = get_response_cache_settings()
+        self.alias = conf['CACHE_ALIAS']
+        self.timeout = conf['TIMEOUT']
+        self.max_size = conf['MAX_SIZE']
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias] if self.alias else None
+
+    def key(self, request, version, scope):
+        parts = [
+            scope,
+            request.scheme,
+            request.get_host(),
+            getattr(request, 'accepted_media_type', '') or '',
+            normalize_query(request.query_params),
+        ]
+        digest = hashlib.md5('|'.join(parts).encode('utf-8'), usedforsecurity=False)
+        return f'{KEY_PREFIX}{version}:{digest.hexdigest()}'
+
+    def get(self, key):
+        """Return (content, content_type) for `key`, or None."""
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key, response):
+        """Store a rendered response, unless its body is too large."""
+        if len(response.content) > self.max_size:
+            return
+        self.cache.set(
+            key, (response.content, response['Content-Type']), timeout=self.timeout
+        )
+
+    def clear(self):
+        """Reset the counters (entries expire on their own)."""
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / lookups if lookups else 0.0,
+        }
+
+
+response_cache = ResponseCache()
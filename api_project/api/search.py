@@ -0,0 +1,100 @@
+"""
+Full-text search over api.models.Book.
+
+On SQLite, searches go through the FTS5 index (api.models.BookSearchIndex)
+and are ranked with bm25. Other databases, or a database migrated without
+the index, fall back to case-insensitive LIKE filtering.
+
+The index is kept in sync by triggers on api_book (migration 0003).
+SQLite drops a table's triggers when a schema change rebuilds it, as most
+AlterField/AddConstraint operations on Book do there, so such migrations
+must recreate them; explain_queries fails when one is missing.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+from .models import Book, BookSearchIndex
+
+TOKEN_RE = re.compile(r'\w+')
+SYNC_TRIGGERS = ('api_book_fts_ai', 'api_book_fts_ad', 'api_book_fts_au')
+
+
+def get_search_terms(query):
+    """Split a user query into plain word tokens."""
+    return TOKEN_RE.findall(query or '')
+
+
+def build_match_expression(terms):
+    """
+    Turn word tokens into an FTS5 MATCH expression.
+
+    Every token is quoted (so FTS5 operators in user input are taken
+    literally) and used as a prefix; tokens are ANDed together.
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def has_search_index(using='default'):
+    """Return True if the FTS5 index exists on the `using` database."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    cached = getattr(connection, '_api_book_fts', None)
+    if cached is None:
+        table = BookSearchIndex._meta.db_table
+        cached = table in connection.introspection.table_names()
+        connection._api_book_fts = cached
+    return cached
+
+
+def missing_sync_triggers(using='default'):
+    """Return the names of the index's sync triggers missing on `using`."""
+    if not has_search_index(using):
+        return []
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        present = {name for name, in cursor.fetchall()}
+    return [name for name in SYNC_TRIGGERS if name not in present]
+
+
+def search_books(queryset, query, ranked=True):
+    """
+    Filter `queryset` down to books matching `query`.
+
+    Args:
+        queryset: A Book queryset to search within
+        query (str): Free text; every word must match the start of a word
+            in the title or author
+        ranked (bool): Order by relevance (best first) instead of
+            leaving the ordering untouched
+
+    Returns:
+        QuerySet of matching books
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    if not has_search_index(queryset.db):
+        return search_like(query, queryset)
+
+    queryset = queryset.filter(search_index__match=build_match_expression(terms))
+    if ranked:
+        queryset = queryset.order_by('search_index__rank', 'title', 'id')
+    return queryset
+
+
+def search_like(query, queryset=None):
+    """
+    Search with icontains (LIKE) filters, as the admin did originally.
+
+    Used when there is no FTS5 index, and as the benchmark baseline.
+    """
+    queryset = Book.objects.all() if queryset is None else queryset
+    condition = Q()
+    for term in get_search_terms(query):
+        condition &= Q(title__icontains=term) | Q(author__icontains=term)
+    return queryset.filter(condition)
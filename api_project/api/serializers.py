@@ -1,15 +1,267 @@
+import json
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework.utils import html
+from rest_framework.validators import UniqueTogetherValidator
 from .models import Book
 
 
+def parse_book_id(value):
+    """
+    Return `value` as a Book primary key for the bulk actions.
+
+    Only JSON integers are ids: booleans, floats and strings raise
+    ValidationError. An integer outside the primary key's range cannot
+    name a book and returns None, which callers report as not found.
+    """
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise serializers.ValidationError({'id': ['A valid integer is required.']})
+    connection = connections[Book.objects.db]
+    low, high = connection.ops.integer_field_range(Book._meta.pk.get_internal_type())
+    if (low is not None and value < low) or (high is not None and value > high):
+        return None
+    return value
+
+
+class BookListSerializer(serializers.ListSerializer):
+    """
+    List serializer used when BookSerializer is instantiated with many=True.
+
+    Unlike the stock ListSerializer, `partition()` validates every item
+    and keeps going past invalid ones, so bulk endpoints can write the
+    valid rows and report per-item errors for the rest.
+
+    For bulk updates pass `instance` as a dict mapping primary key to Book;
+    each item is then validated against the book named by its "id".
+
+    Uniqueness (the child's UniqueTogetherValidators, e.g. title + author)
+    is checked for the whole batch at once: one query on SQLite, one per
+    few hundred items elsewhere, instead of one SELECT per item. Items
+    get the same errors the validator would give them one at a time, and
+    an item repeating an earlier item of the same batch is rejected too.
+    """
+    not_a_list_message = 'Expected a list of items but got type "{input_type}".'
+    max_items_message = 'Ensure this list has no more than {max_length} items.'
+    duplicate_id_message = 'This id is listed more than once.'
+
+    def validate_list(self, data):
+        """Reject payloads that are not a list, or are too long or short."""
+        if not isinstance(data, list):
+            message = self.not_a_list_message.format(input_type=type(data).__name__)
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='not_a_list'
+            )
+        if not self.allow_empty and len(data) == 0:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages['empty']]},
+                code='empty',
+            )
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.max_items_message.format(max_length=self.max_length)
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='max_length'
+            )
+        if self.min_length is not None and len(data) < self.min_length:
+            message = self.error_messages['min_length'].format(min_length=self.min_length)
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code='min_length'
+            )
+
+    def get_child_instance(self, item, seen):
+        """
+        Return the Book an update item targets (None when creating).
+
+        `seen` holds the primary keys targeted by earlier items; an item
+        repeating one of them is rejected.
+        """
+        if self.instance is None:
+            return None
+        if not isinstance(item, dict) or item.get('id') in (None, ''):
+            raise serializers.ValidationError({'id': ['This field is required.']})
+        instance = self.instance.get(parse_book_id(item['id']))
+        if instance is None:
+            raise serializers.ValidationError({'id': ['Not found.']})
+        if instance.pk in seen:
+            raise serializers.ValidationError({'id': [self.duplicate_id_message]})
+        seen.add(instance.pk)
+        return instance
+
+    def get_batch_validators(self):
+        """
+        Return the child validators that validate_items() runs per batch.
+
+        Conditional constraints and NULLS NOT DISTINCT (DRF 3.16+) are left
+        to the validators themselves; the getattr() defaults keep older
+        DRF releases, whose validators have neither, working.
+        """
+        return [
+            validator for validator in self.child.validators
+            if isinstance(validator, UniqueTogetherValidator)
+            and getattr(validator, 'condition', None) is None
+            and getattr(validator, 'nulls_distinct', None) is not False
+        ]
+
+    def validate_items(self, items):
+        """
+        Validate every item of `items`.
+
+        Returns:
+            (valid, errors) where `valid` is a list of (index, instance,
+            validated_data) tuples and `errors` maps index to error detail.
+        """
+        batched = self.get_batch_validators()
+        validators = self.child.validators
+        self.child.validators = [v for v in validators if v not in batched]
+        valid, errors, seen = [], {}, set()
+        try:
+            for index, item in enumerate(items):
+                try:
+                    instance = self.get_child_instance(item, seen)
+                    self.child.instance = instance
+                    self.child.initial_data = item
+                    validated = self.child.run_validation(item)
+                except serializers.ValidationError as exc:
+                    errors[index] = exc.detail
+                else:
+                    valid.append((index, instance, validated))
+        finally:
+            self.child.instance = None
+            self.child.validators = validators
+
+        for validator in batched:
+            for index, error in self.check_unique_together(validator, valid).items():
+                errors[index] = error.detail
+            valid = [entry for entry in valid if entry[0] not in errors]
+        return valid, errors
+
+    def check_unique_together(self, validator, valid):
+        """
+        Return {index: ValidationError} for the items of `valid` that break
+        `validator`, looking every other row up in one batch.
+        """
+        sources = [self.child.fields[name].source for name in validator.fields]
+        keys = {}
+        for index, instance, data in valid:
+            current = tuple(getattr(instance, source) for source in sources) if instance else None
+            key = tuple(
+                data[source] if source in data else current[position]
+                for position, source in enumerate(sources)
+            )
+            # Like UniqueTogetherValidator: NULLs never clash, and an
+            # update that keeps its values cannot start clashing
+            if None in key or key == current:
+                continue
+            keys[index] = (key, instance.pk if instance else None)
+
+        existing = self.find_existing(validator.queryset, sources, {key for key, _ in keys.values()})
+        message = validator.message.format(field_names=', '.join(validator.fields))
+        claimed, failed = set(), {}
+        for index, (key, pk) in keys.items():
+            if existing.get(key, set()) - {pk} or key in claimed:
+                failed[index] = serializers.ValidationError(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [message]},
+                    code=getattr(validator, 'code', 'unique'),
+                )
+            else:
+                claimed.add(key)
+        return failed
+
+    def find_existing(self, queryset, sources, keys):
+        """
+        Return {values: {pk, ...}} for the rows of `queryset` whose
+        `sources` fields hold one of the value tuples in `keys`.
+
+        On SQLite the tuples are sent as a single JSON parameter and
+        matched with a row-value IN, so the unique index is probed once
+        per tuple in one query. Other databases OR the tuples together,
+        as many per query as the parameter limit allows.
+        """
+        existing = defaultdict(set)
+        if not keys:
+            return existing
+        queryset = queryset.all()
+        connection = connections[queryset.db]
+        keys = list(keys)
+
+        if connection.vendor == 'sqlite' and not queryset.query.has_filters():
+            qn = connection.ops.quote_name
+            opts = queryset.model._meta
+            columns = ', '.join(
+                f'{qn(opts.db_table)}.{qn(opts.get_field(source).column)}' for source in sources
+            )
+            picks = ', '.join(f"json_extract(value, '$[{i}]')" for i in range(len(sources)))
+            condition = RawSQL(
+                f'({columns}) IN (SELECT {picks} FROM json_each(%s))',
+                [json.dumps(keys)],
+                output_field=BooleanField(),
+            )
+            batches = [queryset.filter(condition)]
+        else:
+            size = max(1, (connection.features.max_query_params or 2000) // len(sources))
+            batches = [
+                queryset.filter(reduce(or_, (
+                    Q(**dict(zip(sources, key))) for key in keys[start:start + size]
+                )))
+                for start in range(0, len(keys), size)
+            ]
+
+        for batch in batches:
+            for pk, *values in batch.values_list('pk', *sources):
+                existing[tuple(values)].add(pk)
+        return existing
+
+    def partition(self):
+        """
+        Validate every item of `initial_data`.
+
+        Returns:
+            (valid, errors) where `valid` is a list of (index, instance,
+            validated_data) tuples and `errors` a list of
+            {"index": i, "errors": {...}} dicts in input order.
+        """
+        self.validate_list(self.initial_data)
+        valid, errors = self.validate_items(self.initial_data)
+        errors = [{'index': index, 'errors': errors[index]} for index in sorted(errors)]
+        return valid, errors
+
+    def to_internal_value(self, data):
+        """ListSerializer.to_internal_value(), with uniqueness checked per batch."""
+        if html.is_html_input(data):
+            data = html.parse_html_list(data, default=[])
+        self.validate_list(data)
+        valid, errors = self.validate_items(data)
+        if errors:
+            # DRF before LIST_SERIALIZER_ERRORS_AS_DICT always used a list
+            if not getattr(api_settings, 'LIST_SERIALIZER_ERRORS_AS_DICT', False):
+                errors = [errors.get(index, {}) for index in range(len(data))]
+            raise serializers.ValidationError(errors)
+        return [validated for _, _, validated in valid]
+
+    def create(self, validated_data):
+        return Book.objects.bulk_create(Book(**item) for item in validated_data)
+
+
 class BookSerializer(serializers.ModelSerializer):
     """
     Serializer for the Book model.
-    
+
     Converts Book model instances to JSON format and vice versa.
     Includes all fields from the Book model.
     """
-    
+
     class Meta:
         model = Book
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_serializer_class = BookListSerializer
+        # Declared rather than derived: DRF only builds validators from a
+        # UniqueConstraint since 3.15, and requirements allow 3.14
+        validators = [
+            UniqueTogetherValidator(queryset=Book.objects.all(), fields=('title', 'author')),
+        ]
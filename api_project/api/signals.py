@@ -1,8 +1,13 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+from .authentication import token_cache
+from .book_cache import book_cache
+from .catalog import catalog_changed
+from .models import Book
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
@@ -10,4 +15,57 @@ def create_auth_token(sender, instance=None, created=False, **kwargs):
     Automatically create a token for newly created users.
     """
     if created:
-        Token.objects.create(user=instance)
\ No newline at end of file
+        Token.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """
+    Drop a deleted (or regenerated) token from the authentication cache.
+    """
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def evict_user_tokens(sender, instance, created=False, update_fields=None, **kwargs):
+    """
+    Drop cached tokens when a user changes, e.g. is deactivated.
+
+    The last_login update Django performs on every login is ignored.
+    """
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    keys = ()
+    if token_cache.shared is not None:
+        keys = Token.objects.filter(user_id=instance.pk).values_list('key', flat=True)
+    token_cache.invalidate_user(instance.pk, keys)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def bump_book_catalog(sender, using=None, **kwargs):
+    """
+    Invalidate ETags for the Book endpoints whenever a book is written.
+
+    Covers BookViewSet create/update/destroy and any other save()/delete().
+    Bulk writes that skip signals must call api.catalog.catalog_changed().
+    """
+    catalog_changed(using=using)
+
+
+@receiver(post_save, sender=Book)
+def write_through_book(sender, instance, using=None, **kwargs):
+    """
+    Write saved books through to the object cache (api.book_cache).
+
+    Bulk updates that skip signals must call book_cache.write() themselves.
+    """
+    book_cache.write([instance], using=using)
+
+
+@receiver(post_delete, sender=Book)
+def evict_deleted_book(sender, instance, using=None, **kwargs):
+    """
+    Drop deleted books from the object cache.
+    """
+    book_cache.evict([instance.pk], using=using)
@@ -1,9 +1,43 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+from unittest import addModuleCleanup, mock, skipIf
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, transaction
+from django.test import override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
 from rest_framework.test import APITestCase
+from rest_framework.validators import UniqueTogetherValidator
 from rest_framework.authtoken.models import Token
+from api_project.db_router import ReplicaRouter, replica_reads
+from api_project.sqlite_backend.base import DatabaseWrapper
+from .authentication import token_cache
+from .book_cache import book_cache
+from .response_cache import response_cache
 from .models import Book
+from .renderers import FastJSONRenderer, orjson
+from .search import has_search_index, search_books, search_like
+from .serializers import BookSerializer
+
+
+def setUpModule():
+    # Keep the metrics these requests generate out of the source tree
+    metrics = override_settings(REQUEST_METRICS={'DIR': None})
+    metrics.enable()
+    addModuleCleanup(metrics.disable)
 
 
 class AuthenticationTestCase(APITestCase):
@@ -115,4 +149,1334 @@ class BookViewSetAuthenticationTestCase(APITestCase):
         """Test deleting a book with authentication."""
         self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
         response = self.client.delete(self.detail_url)
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class BookPaginationTestCase(APITestCase):
+    """Test cases for opt-in keyset pagination on the book list endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        # Duplicate titles make sure the id tie-breaker is honoured
+        for i in range(7):
+            Book.objects.create(title=f'Title {i // 2}', author=f'Author {i}')
+        self.expected_ids = list(
+            Book.objects.order_by('title', 'id').values_list('id', flat=True)
+        )
+        self.list_url = reverse('book-list')
+
+    def test_unpaginated_by_default(self):
+        """Test that the list stays a plain array without opting in."""
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_walk_forward_and_back(self):
+        """Test that following next/previous links visits every book once."""
+        seen = []
+        url = f'{self.list_url}?page_size=3'
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(book['id'] for book in response.data['results'])
+            pages.append(response.data)
+            url = response.data['next']
+        self.assertEqual(seen, self.expected_ids)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(
+            [book['id'] for book in response.data['results']],
+            self.expected_ids[3:6]
+        )
+
+    def test_viewset_list_paginates(self):
+        """Test that BookViewSet.list supports the same pagination."""
+        response = self.client.get(reverse('book_all-list'), {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [book['id'] for book in response.data['results']],
+            self.expected_ids[:2]
+        )
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor returns 404."""
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ConditionalGetTestCase(APITestCase):
+    """Test cases for ETag / Last-Modified handling on the book endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.book = Book.objects.create(title='Test Book', author='Test Author')
+        self.list_url = reverse('book-list')
+        self.viewset_list_url = reverse('book_all-list')
+        self.detail_url = reverse('book_all-detail', kwargs={'pk': self.book.pk})
+
+    def assertNotModified(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(again['ETag'], response['ETag'])
+        self.assertEqual(again.content, b'')
+        return response['ETag']
+
+    def test_list_not_modified(self):
+        """Test that an unchanged list returns 304 without hitting the table."""
+        etag = self.assertNotModified(self.list_url)
+        with self.assertNumQueries(0):
+            # The token lookup is cached and a 304 never touches Book
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_retrieve_not_modified(self):
+        """Test that an unchanged book returns 304."""
+        self.assertNotModified(self.detail_url)
+
+    def test_etag_depends_on_query_string(self):
+        """Test that different pages get different ETags."""
+        first = self.client.get(self.list_url)
+        paged = self.client.get(self.list_url, {'page_size': 1})
+        self.assertNotEqual(first['ETag'], paged['ETag'])
+
+    def test_writes_change_etag(self):
+        """Test that create, update and destroy all invalidate ETags."""
+        writes = [
+            lambda: self.client.post(
+                self.viewset_list_url, {'title': 'New', 'author': 'Someone'}
+            ),
+            lambda: self.client.patch(self.detail_url, {'title': 'Renamed'}),
+            lambda: self.client.delete(self.detail_url),
+        ]
+        for write in writes:
+            etag = self.client.get(self.viewset_list_url)['ETag']
+            self.assertLess(write().status_code, 300)
+            response = self.client.get(
+                self.viewset_list_url, HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    """Test cases for the token lookup cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        token_cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('book_all-detail', kwargs={'pk': 0})
+
+    def test_repeat_requests_skip_token_query(self):
+        """Test that only the first request looks the token up."""
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        with self.assertNumQueries(1):
+            # Only the (missing) Book lookup remains
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        stats = token_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_deleted_token_is_evicted(self):
+        """Test that deleting a token revokes access immediately."""
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_evicted(self):
+        """Test that deactivating a user revokes access immediately."""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_keeps_cache(self):
+        """Test that the last_login update does not flush cached tokens."""
+        self.client.get(self.url)
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(len(token_cache.local), 1)
+
+    @override_settings(API_TOKEN_CACHE={'CACHE_ALIAS': 'default'})
+    def test_shared_cache_skips_local_tier(self):
+        """Test that another worker's eviction revokes access here at once."""
+        token_cache.configure()
+        self.addCleanup(token_cache.configure)
+        self.addCleanup(cache.clear)
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+        self.assertEqual(len(token_cache.local), 0)
+
+        # Deactivate without signals here and evict the way the worker
+        # that saved the user would
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.delete(f'api:token:{self.token.key}')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(token_cache.stats()['hits'], 1)
+        self.assertEqual(token_cache.stats()['misses'], 2)
+
+    def assertFillAfterEvictionDropped(self):
+        token, version = token_cache.get(self.token.key)
+        self.assertIsNone(token)
+        # Revoked while the miss was loading the token from the database
+        token_cache.invalidate(self.token.key)
+        token_cache.add(self.token.key, self.token, version)
+        self.assertIsNone(token_cache.get(self.token.key)[0])
+
+        token, version = token_cache.get(self.token.key)
+        token_cache.add(self.token.key, self.token, version)
+        self.assertEqual(token_cache.get(self.token.key)[0], self.token)
+
+    def test_fill_after_eviction_is_dropped(self):
+        """Test that a lookup overlapping an eviction does not re-cache the token."""
+        self.assertFillAfterEvictionDropped()
+
+    @override_settings(API_TOKEN_CACHE={'CACHE_ALIAS': 'default'})
+    def test_shared_fill_after_eviction_is_dropped(self):
+        """Test the same for the shared cache, where fills use cache.add()."""
+        token_cache.configure()
+        self.addCleanup(token_cache.configure)
+        self.addCleanup(cache.clear)
+        self.assertFillAfterEvictionDropped()
+
+        # A stale entry written by a fill that lost the race is ignored
+        # and cleared, so the next fill replaces it
+        token_cache.invalidate(self.token.key)
+        cache.set(f'api:token:{self.token.key}', ('old-version', self.token))
+        self.assertIsNone(token_cache.get(self.token.key)[0])
+        token, version = token_cache.get(self.token.key)
+        token_cache.add(self.token.key, self.token, version)
+        self.assertEqual(token_cache.get(self.token.key)[0], self.token)
+
+    def test_invalid_token(self):
+        """Test that unknown tokens are still rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token not-a-real-token')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BookBulkActionsTestCase(APITestCase):
+    """Test cases for the bulk create/update/delete actions on BookViewSet."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.bulk_url = reverse('book_all-bulk')
+
+    def test_bulk_create(self):
+        """Test that all valid books are created in one INSERT."""
+        payload = [{'title': f'Book {i}', 'author': 'Author'} for i in range(5)]
+        response = self.client.post(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['created']), 5)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Book.objects.count(), 5)
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test that invalid items are reported without aborting the batch."""
+        payload = [
+            {'title': 'Good', 'author': 'Author'},
+            {'title': '', 'author': 'Author'},
+            {'title': 'Also good', 'author': 'Author'},
+        ]
+        response = self.client.post(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('title', response.data['errors'][0]['errors'])
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_bulk_create_requires_list(self):
+        """Test that a non-list payload is rejected."""
+        response = self.client.post(
+            self.bulk_url, {'title': 'Book', 'author': 'Author'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        """Test partial updates by id, including unknown ids."""
+        first = Book.objects.create(title='First', author='Author')
+        second = Book.objects.create(title='Second', author='Author')
+        payload = [
+            {'id': first.pk, 'title': 'First (revised)'},
+            {'id': second.pk, 'author': 'Someone Else'},
+            {'id': 999999, 'title': 'Missing'},
+            {'title': 'No id'},
+        ]
+        response = self.client.patch(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([e['index'] for e in response.data['errors']], [2, 3])
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.title, 'First (revised)')
+        self.assertEqual(second.title, 'Second')
+        self.assertEqual(second.author, 'Someone Else')
+
+    def test_bulk_update_rejects_repeated_ids(self):
+        """Test that an id listed twice is updated once and the repeat reported."""
+        book = Book.objects.create(title='First', author='Author')
+        payload = [{'id': book.pk, 'title': 'Z'}, {'id': book.pk, 'title': 'Y'}]
+        response = self.client.patch(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([b['title'] for b in response.data['updated']], ['Z'])
+        self.assertEqual(response.data['errors'], [
+            {'index': 1, 'errors': {'id': ['This id is listed more than once.']}},
+        ])
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'Z')
+
+    def test_bulk_update_checks_size_first(self):
+        """Test that oversized payloads are rejected before any Book query."""
+        payload = [{'id': i, 'title': 'T'} for i in range(1001)]
+        with self.assertNumQueries(1):
+            # Only the token lookup
+            response = self.client.patch(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_rejects_invalid_ids(self):
+        """Test that only JSON integers are ids, and oversized ones are not found."""
+        book = Book.objects.create(title='First', author='Author')
+        payload = [
+            {'id': book.pk + 0.9, 'title': 'Float'},
+            {'id': True, 'title': 'Bool'},
+            {'id': str(book.pk), 'title': 'String'},
+            {'id': 10 ** 20, 'title': 'Oversized'},
+        ]
+        response = self.client.patch(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [
+            {'index': 0, 'errors': {'id': ['A valid integer is required.']}},
+            {'index': 1, 'errors': {'id': ['A valid integer is required.']}},
+            {'index': 2, 'errors': {'id': ['A valid integer is required.']}},
+            {'index': 3, 'errors': {'id': ['Not found.']}},
+        ])
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'First')
+
+    def test_bulk_delete_rejects_invalid_ids(self):
+        """Test that floats, booleans and oversized ids never delete a book."""
+        book = Book.objects.create(title='Book', author='A')
+        payload = [book.pk + 0.9, True, 10 ** 20, -(10 ** 20)]
+        response = self.client.delete(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [
+            {'index': 0, 'errors': {'id': ['A valid integer is required.']}},
+            {'index': 1, 'errors': {'id': ['A valid integer is required.']}},
+            {'index': 2, 'errors': {'id': ['Not found.']}},
+            {'index': 3, 'errors': {'id': ['Not found.']}},
+        ])
+        self.assertTrue(Book.objects.filter(pk=book.pk).exists())
+
+    def test_bulk_delete(self):
+        """Test deleting by id list."""
+        books = [Book.objects.create(title=f'Book {i}', author='A') for i in range(3)]
+        payload = [books[0].pk, books[2].pk, 999999]
+        response = self.client.delete(self.bulk_url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['deleted'], [books[0].pk, books[2].pk])
+        self.assertEqual(response.data['errors'][0]['index'], 2)
+        self.assertEqual(list(Book.objects.values_list('pk', flat=True)), [books[1].pk])
+
+    def test_bulk_delete_rejects_repeated_ids(self):
+        """Test that an id listed twice is deleted and reported once."""
+        book = Book.objects.create(title='Book', author='A')
+        response = self.client.delete(self.bulk_url, [book.pk, book.pk], format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['deleted'], [book.pk])
+        self.assertEqual(response.data['errors'], [
+            {'index': 1, 'errors': {'id': ['This id is listed more than once.']}},
+        ])
+
+    def test_bulk_delete_bumps_and_evicts_once(self):
+        """Test that a bulk delete bumps the catalog and evicts the cache once."""
+        books = [Book.objects.create(title=f'Book {i}', author='A') for i in range(3)]
+        with mock.patch('api.views.catalog_changed') as changed, \
+                mock.patch.object(book_cache, 'evict') as evict, \
+                mock.patch('api.signals.catalog_changed') as signal_changed:
+            response = self.client.delete(
+                self.bulk_url, [book.pk for book in books], format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Book.objects.exists())
+        changed.assert_called_once_with()
+        evict.assert_called_once_with(sorted(book.pk for book in books))
+        signal_changed.assert_not_called()
+
+    def test_bulk_writes_change_etag(self):
+        """Test that bulk writes invalidate list ETags."""
+        list_url = reverse('book_all-list')
+        etag = self.client.get(list_url)['ETag']
+        self.client.post(self.bulk_url, [{'title': 'T', 'author': 'A'}], format='json')
+        response = self.client.get(list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class BookBatchValidationTestCase(APITestCase):
+    """Test cases for the batched uniqueness checks of BookListSerializer."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.hobbit = Book.objects.create(title='The Hobbit', author='J.R.R. Tolkien')
+        self.dune = Book.objects.create(title='Dune', author='Frank Herbert')
+
+    def single_item_errors(self, item, instance=None):
+        """Return the errors BookSerializer gives `item` on its own."""
+        serializer = BookSerializer(instance, data=item, partial=instance is not None)
+        self.assertFalse(serializer.is_valid())
+        return serializer.errors
+
+    def test_one_query_per_batch(self):
+        """Test that a batch checks uniqueness with a single query."""
+        payload = [{'title': f'Book {i}', 'author': 'Author'} for i in range(200)]
+        serializer = BookSerializer(data=payload, many=True)
+        with self.assertNumQueries(1):
+            valid, errors = serializer.partition()
+        self.assertEqual((len(valid), errors), (200, []))
+
+    def test_existing_rows_rejected_like_single_items(self):
+        """Test that clashing items get the single-item validator's errors."""
+        clash = {'title': 'The Hobbit', 'author': 'J.R.R. Tolkien'}
+        payload = [{'title': 'The Hobbit', 'author': 'Someone Else'}, clash]
+        valid, errors = BookSerializer(data=payload, many=True).partition()
+        self.assertEqual([index for index, _, _ in valid], [0])
+        self.assertEqual(errors, [{'index': 1, 'errors': self.single_item_errors(clash)}])
+        self.assertEqual(errors[0]['errors']['non_field_errors'][0].code, 'unique')
+
+    def test_repeats_within_batch_rejected(self):
+        """Test that only the first of two identical new items is accepted."""
+        payload = [{'title': 'New', 'author': 'Author'}] * 3
+        valid, errors = BookSerializer(data=payload, many=True).partition()
+        self.assertEqual([index for index, _, _ in valid], [0])
+        self.assertEqual([error['index'] for error in errors], [1, 2])
+
+    def test_field_errors_come_first(self):
+        """Test that items failing field validation are not looked up."""
+        payload = [{'title': '', 'author': 'J.R.R. Tolkien'}, {'title': 'Dune', 'author': 'Frank Herbert'}]
+        valid, errors = BookSerializer(data=payload, many=True).partition()
+        self.assertEqual(errors[0]['errors'], self.single_item_errors(payload[0]))
+        self.assertEqual(errors[1]['errors'], self.single_item_errors(payload[1]))
+
+    def test_updates(self):
+        """Test that updates may keep their own values but not take another book's."""
+        instances = Book.objects.in_bulk([self.hobbit.pk, self.dune.pk])
+        payload = [
+            {'id': self.hobbit.pk, 'title': 'The Hobbit'},
+            {'id': self.dune.pk, 'title': 'The Hobbit', 'author': 'J.R.R. Tolkien'},
+        ]
+        serializer = BookSerializer(instances, data=payload, many=True, partial=True)
+        valid, errors = serializer.partition()
+        self.assertEqual([index for index, _, _ in valid], [0])
+        self.assertEqual(
+            errors[0]['errors'],
+            self.single_item_errors({'title': 'The Hobbit', 'author': 'J.R.R. Tolkien'}, self.dune),
+        )
+
+    def test_is_valid_uses_batch(self):
+        """Test that many=True is_valid() reports per-item errors in DRF's format."""
+        payload = [
+            {'title': 'Fresh', 'author': 'Author'},
+            {'title': 'Dune', 'author': 'Frank Herbert'},
+        ]
+        serializer = BookSerializer(data=payload, many=True)
+        with self.assertNumQueries(1):
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {1: self.single_item_errors(payload[1])})
+
+        with mock.patch.object(api_settings, 'LIST_SERIALIZER_ERRORS_AS_DICT', False):
+            serializer = BookSerializer(data=payload, many=True)
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, [{}, self.single_item_errors(payload[1])])
+
+        serializer = BookSerializer(data=payload[:1], many=True)
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data, [{'title': 'Fresh', 'author': 'Author'}])
+
+    def test_other_databases_chunk_lookups(self):
+        """Test that the portable lookup finds the same rows, chunked by the parameter limit."""
+        payload = [{'title': f'Book {i}', 'author': 'Author'} for i in range(5)]
+        payload.append({'title': 'Dune', 'author': 'Frank Herbert'})
+        features = connections['default'].features
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'), \
+                mock.patch.object(features, 'max_query_params', 4), \
+                self.assertNumQueries(3):
+            valid, errors = BookSerializer(data=payload, many=True).partition()
+        self.assertEqual([error['index'] for error in errors], [5])
+
+    def test_bulk_create_endpoint(self):
+        """Test that the bulk create action reports duplicates per item."""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=user)
+        payload = [
+            {'title': 'Emma', 'author': 'Jane Austen'},
+            {'title': 'Dune', 'author': 'Frank Herbert'},
+        ]
+        response = self.client.post(reverse('book_all-bulk'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('must make a unique set', str(response.data['errors'][0]['errors']))
+
+    def test_bulk_create_integrity_error(self):
+        """Test that a book created concurrently after validation gives a 400."""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=user)
+        payload = [{'title': 'Emma', 'author': 'Jane Austen'}]
+        with mock.patch('api.serializers.BookListSerializer.partition', return_value=(
+            [(0, None, {'title': 'Dune', 'author': 'Frank Herbert'})], [],
+        )):
+            response = self.client.post(reverse('book_all-bulk'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(api_settings.NON_FIELD_ERRORS_KEY, response.data)
+        self.assertEqual(Book.objects.filter(title='Dune').count(), 1)
+
+    def test_unique_validator_declared(self):
+        """Test that title + author uniqueness does not depend on the DRF version."""
+        validators = [
+            validator for validator in BookSerializer().validators
+            if isinstance(validator, UniqueTogetherValidator)
+        ]
+        self.assertEqual([tuple(v.fields) for v in validators], [('title', 'author')])
+
+
+class BookExportTestCase(APITestCase):
+    """Test cases for the streaming catalog export."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.books = [
+            Book.objects.create(title='Zebra, "the" book', author='Ann'),
+            Book.objects.create(title='Ærø', author='Bo'),
+        ]
+        self.url = reverse('book-export')
+
+    def test_export_ndjson(self):
+        """Test that NDJSON is the default and has one object per line."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'id': b.pk, 'title': b.title, 'author': b.author} for b in self.books]
+        )
+
+    def test_export_csv(self):
+        """Test CSV output with a header row and proper quoting."""
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('books.csv', response['Content-Disposition'])
+
+        body = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], ['id', 'title', 'author'])
+        self.assertEqual(rows[1], [str(self.books[0].pk), 'Zebra, "the" book', 'Ann'])
+        self.assertEqual(len(rows), 3)
+
+    def test_export_requires_authentication(self):
+        """Test that the export is not public."""
+        self.client.credentials()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class BookListFastPathTestCase(APITestCase):
+    """Test cases for the values()-based list fast path."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        for title, author in [
+            ('Plain', 'Author'),
+            ('Ünïcødé ✓', 'Ærø'),
+            ('Line\u2028separator "quoted" \\ back', 'Tab\there'),
+        ]:
+            Book.objects.create(title=title, author=author)
+
+    def serializer_bytes(self):
+        data = BookSerializer(Book.objects.all(), many=True).data
+        return JSONRenderer().render(data)
+
+    def assertByteCompatible(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, self.serializer_bytes())
+
+    def test_list_matches_serializer_output(self):
+        """Test that both list endpoints render exactly like BookSerializer."""
+        self.assertByteCompatible(reverse('book-list'))
+        self.assertByteCompatible(reverse('book_all-list'))
+
+    def test_list_matches_without_orjson(self):
+        """Test the fallback encoder when orjson is not installed."""
+        with mock.patch('api.renderers.orjson', None):
+            self.assertByteCompatible(reverse('book-list'))
+
+    def test_non_finite_floats_rejected(self):
+        """Test that NaN and infinities raise like JSONRenderer instead of becoming null."""
+        renderer = FastJSONRenderer()
+        for value in (float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({'value': value})
+            with self.assertRaises(ValueError):
+                renderer.render({'value': value})
+        self.assertEqual(renderer.render({'value': None}), b'{"value":null}')
+        with self.assertRaises(ValueError):
+            renderer.render([{'value': None}, {'nested': [1.5, float('-inf')]}])
+
+    @skipIf(orjson is None, 'orjson is not installed')
+    def test_null_keeps_fast_path(self):
+        """Test that ordinary nulls do not send the body through JSONRenderer."""
+        renderer = FastJSONRenderer()
+        with mock.patch.object(JSONRenderer, 'render') as render:
+            ret = renderer.render([{'title': None, 'score': 1.5}])
+        render.assert_not_called()
+        self.assertEqual(ret, b'[{"title":null,"score":1.5}]')
+
+    def test_fast_path_fields_match_serializer(self):
+        """Test that the values() field list tracks BookSerializer."""
+        from .views import BookList, BookViewSet
+        fields = tuple(BookSerializer().fields)
+        self.assertEqual(BookList.list_values_fields, fields)
+        self.assertEqual(BookViewSet.list_values_fields, fields)
+
+    def test_paginated_fast_path(self):
+        """Test that pagination works on values() rows."""
+        response = self.client.get(reverse('book-list'), {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_browsable_api_uses_serializer(self):
+        """Test that the HTML renderer still works."""
+        response = self.client.get(reverse('book-list'), HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class BookSearchTestCase(APITestCase):
+    """Test cases for full-text search on BookList."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        self.hobbit = Book.objects.create(title='The Hobbit', author='J. R. R. Tolkien')
+        self.rings = Book.objects.create(title='The Lord of the Rings', author='J. R. R. Tolkien')
+        self.dune = Book.objects.create(title='Dune', author='Frank Herbert')
+        self.url = reverse('book-list')
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book['id'] for book in response.data]
+
+    def test_uses_fts_index(self):
+        """Test that the FTS5 index was created by the migration."""
+        self.assertTrue(has_search_index())
+
+    def test_search_by_author_and_prefix(self):
+        """Test word and prefix matches across title and author."""
+        self.assertCountEqual(self.search('tolkien'), [self.hobbit.pk, self.rings.pk])
+        self.assertEqual(self.search('hob'), [self.hobbit.pk])
+        self.assertEqual(self.search('tolkien rings'), [self.rings.pk])
+        self.assertEqual(self.search('nothing-like-this'), [])
+
+    def test_search_ranks_best_match_first(self):
+        """Test that books matching more often rank higher."""
+        tolkien = Book.objects.create(title='Tolkien', author='Tolkien Tolkien')
+        self.assertEqual(self.search('tolkien')[0], tolkien.pk)
+
+    def test_search_ignores_fts_syntax(self):
+        """Test that FTS5 operators in user input are taken literally."""
+        self.assertEqual(self.search('dune" OR "hobbit'), [])
+        self.assertEqual(self.search('"dune*'), [self.dune.pk])
+
+    def test_index_follows_writes(self):
+        """Test that updates, deletes and bulk writes reach the index."""
+        self.hobbit.title = 'There and Back Again'
+        self.hobbit.save()
+        self.assertEqual(self.search('hobbit'), [])
+        self.assertEqual(self.search('again'), [self.hobbit.pk])
+
+        self.dune.delete()
+        self.assertEqual(self.search('dune'), [])
+
+        Book.objects.bulk_create([Book(title='Dune Messiah', author='Frank Herbert')])
+        self.assertEqual(len(self.search('messiah')), 1)
+
+    def test_search_limit(self):
+        """Test that page_size caps the number of results."""
+        self.assertEqual(len(self.search('tolkien', page_size=1)), 1)
+
+    def test_matches_like_baseline(self):
+        """Test that whole-word queries find the same books as LIKE."""
+        for query in ('tolkien', 'dune', 'the'):
+            self.assertCountEqual(
+                search_books(Book.objects.all(), query),
+                search_like(query),
+            )
+
+
+class ExplainQueriesCommandTestCase(APITestCase):
+    """Test cases for the explain_queries management command."""
+
+    def test_known_queries_use_indexes(self):
+        """Test that no known query falls back to a full scan."""
+        out = io.StringIO()
+        call_command('explain_queries', stdout=out)
+        self.assertNotIn('FAIL', out.getvalue())
+        self.assertIn('ok   search index sync triggers', out.getvalue())
+
+    def test_missing_search_trigger_is_detected(self):
+        """Test that a migration dropping the FTS triggers fails the command."""
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER api_book_fts_au')
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, 'api_book_fts_au'):
+            call_command('explain_queries', stdout=out)
+        self.assertIn('FAIL search index sync triggers', out.getvalue())
+
+    def test_full_scan_is_detected(self):
+        """Test that an unindexed LIKE filter is reported."""
+        from .management.commands.explain_queries import find_problems
+        plan = Book.objects.filter(title__icontains='hobbit').explain()
+        self.assertTrue(find_problems(plan))
+        self.assertFalse(find_problems(plan, allowed=('scan',)))
+
+
+class QueryMetricsMiddlewareTestCase(APITestCase):
+    """Test cases for per-request query metrics."""
+
+    def setUp(self):
+        """Set up test data."""
+        from api_project.middleware import registry
+        self.registry = registry
+        self.registry.reset()
+        self.addCleanup(
+            self.registry.configure, registry.directory, registry.flush_interval
+        )
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.book = Book.objects.create(title='Test Book', author='Test Author')
+
+    def test_server_timing_header(self):
+        """Test that responses report query count and timings."""
+        response = self.client.get(reverse('book_all-detail', kwargs={'pk': self.book.pk}))
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('view;dur=', timing)
+        self.assertIn('total;dur=', timing)
+        self.assertRegex(timing, r'desc="\d+ queries"')
+
+    def test_routes_are_aggregated(self):
+        """Test that requests are grouped by URL pattern, not by URL."""
+        other = Book.objects.create(title='Other', author='Author')
+        for book in (self.book, other):
+            self.client.get(reverse('book_all-detail', kwargs={'pk': book.pk}))
+
+        routes = self.registry.snapshot()
+        detail = [route for route in routes if 'books_all' in route and 'pk' in route]
+        self.assertEqual(len(detail), 1)
+        self.assertEqual(routes[detail[0]]['requests'], 2)
+
+    def test_concurrent_flushes(self):
+        """Test that threads flushing at once neither collide nor raise."""
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(50):
+                    self.registry.flush()
+            except Exception as exc:
+                errors.append(exc)
+
+        with tempfile.TemporaryDirectory() as directory:
+            self.registry.configure(directory, 0)
+            self.registry.record('GET test', 1, 1.0, 1.0, 1.0, 10)
+            threads = [threading.Thread(target=flush) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(os.listdir(directory), [f'request-metrics-{os.getpid()}.json'])
+        self.assertEqual(errors, [])
+
+    def test_failed_flush_does_not_fail_request(self):
+        """Test that an unwritable metrics directory is logged, not raised."""
+        url = reverse('book_all-detail', kwargs={'pk': self.book.pk})
+        self.client.get(url)
+        with tempfile.NamedTemporaryFile() as not_a_directory:
+            self.registry.configure(not_a_directory.name, 0)
+            with self.assertLogs('api_project.middleware', 'WARNING'):
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dump_command_merges_worker_files(self):
+        """Test that dump_request_metrics reads what the registry flushed."""
+        self.client.get(reverse('book-list'))
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(REQUEST_METRICS={'DIR': directory}):
+                self.registry.configure(directory, 10)
+                self.registry.flush()
+                out = io.StringIO()
+                call_command('dump_request_metrics', '--reset', stdout=out)
+        self.assertIn('GET api/books/', out.getvalue())
+
+
+class ImportUsersCommandTestCase(APITestCase):
+    """Test cases for the import_users management command."""
+
+    def import_users(self, content, **options):
+        """Run import_users on a CSV file holding `content`."""
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as csv_file:
+            csv_file.write(content)
+        self.addCleanup(os.remove, path)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        options.setdefault('processes', 1)
+        call_command('import_users', path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_matches_create_user(self):
+        """Test that imported users look like users made by create_user."""
+        expected = User.objects.create_user('ref', 'Ada@EXAMPLE.com', 's3cret')
+        stdout, stderr = self.import_users(
+            'username,email,password\nada,Ada@EXAMPLE.com,s3cret\nnopass,,\n',
+            batch_size=1,
+        )
+        self.assertIn('Imported 2 users, skipped 0.', stdout)
+
+        ada = User.objects.get(username='ada')
+        self.assertEqual(ada.email, expected.email)
+        self.assertTrue(ada.check_password('s3cret'))
+        self.assertFalse(User.objects.get(username='nopass').has_usable_password())
+        for user in (ada, expected):
+            self.assertEqual(len(Token.objects.get(user=user).key), 40)
+
+    def test_imported_user_can_authenticate(self):
+        """Test that an imported user's token and password work."""
+        self.import_users('username,password\nada,s3cret\n')
+        response = self.client.post(
+            reverse('api_token_auth'), {'username': 'ada', 'password': 's3cret'}
+        )
+        self.assertEqual(response.data['token'], Token.objects.get(user__username='ada').key)
+
+    def test_skips_existing_and_repeated_usernames(self):
+        """Test that existing or repeated usernames are reported and skipped."""
+        User.objects.create_user('taken')
+        stdout, stderr = self.import_users('username\ntaken\nnew\nnew\n')
+        self.assertIn('Imported 1 users, skipped 2.', stdout)
+        self.assertIn("Row 1: skipped, username 'taken' already exists.", stderr)
+        self.assertEqual(Token.objects.filter(user__username='new').count(), 1)
+
+    def test_hashes_in_process_pool(self):
+        """Test that passwords hashed by worker processes verify."""
+        self.import_users('username,password\na,pw-a\nb,pw-b\n', processes=2)
+        self.assertTrue(User.objects.get(username='a').check_password('pw-a'))
+        self.assertTrue(User.objects.get(username='b').check_password('pw-b'))
+
+    def test_requires_username_column(self):
+        """Test that a file without a username column is rejected."""
+        with self.assertRaisesMessage(CommandError, 'needs a "username" column'):
+            self.import_users('email\nada@example.com\n')
+
+
+class AsyncBookListTestCase(APITestCase):
+    """Test cases for the async variant of BookList."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        Book.objects.bulk_create(
+            Book(title=f'Book {index}', author=f'Author {index % 3}')
+            for index in range(7)
+        )
+        Book.objects.create(title='The Hobbit', author='J.R.R. Tolkien')
+
+    def get_both(self, query='', **headers):
+        """Fetch BookList and AsyncBookList with the same query string."""
+        sync_response = self.client.get(reverse('book-list') + query, headers=headers)
+        async_response = async_to_sync(self.async_client.get)(
+            reverse('book-list-async') + query,
+            headers={'Authorization': f'Token {self.token.key}', **headers},
+        )
+        return sync_response, async_response
+
+    def assertSameBody(self, sync_response, async_response):
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(
+            json.loads(async_response.content.decode().replace('/books/async/', '/books/')),
+            json.loads(sync_response.content),
+        )
+
+    def test_matches_sync_list(self):
+        """Test that plain, paginated and search responses match BookList."""
+        for query in ('', '?page_size=3', '?q=hobbit', '?format=api'):
+            with self.subTest(query=query):
+                sync_response, async_response = self.get_both(query)
+                if query == '?format=api':
+                    self.assertContains(async_response, 'The Hobbit')
+                else:
+                    self.assertSameBody(sync_response, async_response)
+
+    def test_walks_pages(self):
+        """Test that next links of the async view lead to the same pages."""
+        _, page = self.get_both('?page_size=3')
+        titles = []
+        while page.json()['next']:
+            titles += [book['title'] for book in page.json()['results']]
+            page = async_to_sync(self.async_client.get)(
+                page.json()['next'],
+                headers={'Authorization': f'Token {self.token.key}'},
+            )
+        titles += [book['title'] for book in page.json()['results']]
+        self.assertEqual(titles, list(Book.objects.values_list('title', flat=True)))
+
+    def test_not_modified(self):
+        """Test that a matching ETag is answered with 304."""
+        _, response = self.get_both()
+        _, response = self.get_both(**{'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_requires_authentication(self):
+        """Test that anonymous requests are rejected like BookList's."""
+        response = async_to_sync(self.async_client.get)(reverse('book-list-async'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.client.post(reverse('book-list-async')).status_code,
+            status.HTTP_405_METHOD_NOT_ALLOWED,
+        )
+
+    def test_server_timing_counts_async_queries(self):
+        """Test that the metrics middleware sees queries run by the async ORM."""
+        _, response = self.get_both()
+        self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+
+class BookObjectCacheTestCase(APITestCase):
+    """Test cases for the write-through Book cache behind retrieve."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        book_cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.book = Book.objects.create(title='Test Book', author='Test Author')
+        self.url = reverse('book_all-detail', kwargs={'pk': self.book.pk})
+
+    def get_title(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['title']
+
+    def test_repeat_retrieve_skips_query(self):
+        """Test that only the first retrieve reads the book."""
+        self.get_title()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_title(), 'Test Book')
+        stats = book_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_update_writes_through(self):
+        """Test that an update lands in the cache when it commits."""
+        self.get_title()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url, {'title': 'Renamed'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_title(), 'Renamed')
+
+    def test_create_writes_through(self):
+        """Test that a created book is cached straight away."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('book_all-list'), {'title': 'New', 'author': 'Someone'}
+            )
+        self.url = reverse('book_all-detail', kwargs={'pk': response.json()['id']})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_title(), 'New')
+
+    def test_bulk_update_writes_through(self):
+        """Test that the bulk update action refreshes cached books."""
+        self.get_title()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('book_all-bulk'), [{'id': self.book.pk, 'title': 'Bulk'}], format='json'
+            )
+        self.assertEqual(self.get_title(), 'Bulk')
+
+    def test_destroy_evicts(self):
+        """Test that a deleted book is no longer served."""
+        self.get_title()
+        self.client.delete(self.url)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rollback_leaves_cache_consistent(self):
+        """Test that a rolled back save never reaches the cache."""
+        self.get_title()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.book.title = 'Uncommitted'
+            self.book.save()
+            raise RuntimeError
+        self.assertEqual(self.get_title(), 'Test Book')
+
+    def test_invalid_pk(self):
+        """Test that a non-numeric id is a 404."""
+        response = self.client.get(reverse('book_all-detail', kwargs={'pk': 'abc'}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_concurrent_misses_load_once(self):
+        """Test that concurrent misses for one book share a single query."""
+        release = threading.Event()
+        loads = []
+
+        def load(pk, primary=False):
+            loads.append(pk)
+            release.wait(5)
+            return self.book
+
+        results = []
+        with mock.patch.object(book_cache, 'load', side_effect=load):
+            threads = [
+                threading.Thread(target=lambda: results.append(book_cache.get(self.book.pk)))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.2)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(loads, [self.book.pk])
+        self.assertEqual([book.title for book in results], ['Test Book'] * 5)
+        self.assertEqual(book_cache.stats()['coalesced'], 4)
+        self.assertEqual(book_cache.stats()['queries'], 1)
+
+    @override_settings(API_BOOK_CACHE={'CACHE_ALIAS': None})
+    def test_disabled(self):
+        """Test that retrieve reads the database every time when the cache is off."""
+        book_cache.configure()
+        self.addCleanup(book_cache.configure)
+        self.get_title()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_title(), 'Test Book')
+
+
+class ResponseCacheTestCase(APITestCase):
+    """Test cases for the shared list response cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        response_cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.other_token, created = Token.objects.get_or_create(
+            user=User.objects.create_user(username='other', password='testpass123')
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        Book.objects.bulk_create(
+            Book(title=f'Book {index}', author=f'Author {index}') for index in range(5)
+        )
+        self.list_url = reverse('book-list')
+
+    def as_other_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.other_token.key}')
+        # Authenticate once so that the token lookup is cached
+        self.client.get(reverse('book_all-detail', kwargs={'pk': 0}))
+
+    def test_shared_across_users(self):
+        """Test that a list rendered for one user is served to another without queries."""
+        for url in (self.list_url, reverse('book_all-list'), self.list_url + '?page_size=2'):
+            with self.subTest(url=url):
+                self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+                first = self.client.get(url)
+                self.as_other_user()
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.status_code, status.HTTP_200_OK)
+                self.assertEqual(second.content, first.content)
+                for header in ('Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Allow'):
+                    self.assertEqual(second[header], first[header])
+        self.assertEqual(response_cache.stats()['hits'], 3)
+
+    def test_query_string_is_normalized(self):
+        """Test that parameter order does not change the cache entry."""
+        self.client.get(self.list_url + '?page_size=2&format=json')
+        with self.assertNumQueries(0):
+            self.client.get(self.list_url + '?format=json&page_size=2')
+        self.client.get(self.list_url + '?page_size=3&format=json')
+        self.assertEqual(response_cache.stats()['hits'], 1)
+
+    def test_book_write_invalidates(self):
+        """Test that a Book write moves the list to a new entry."""
+        self.client.get(self.list_url)
+        Book.objects.create(title='New Book', author='Someone')
+        titles = [book['title'] for book in self.client.get(self.list_url).json()]
+        self.assertIn('New Book', titles)
+
+    def test_browsable_api_not_cached(self):
+        """Test that the per-user browsable API is always rendered."""
+        self.client.get(self.list_url + '?format=api')
+        response = self.client.get(self.list_url + '?format=api')
+        self.assertContains(response, 'testuser')
+        self.assertEqual(response_cache.stats(), {'hits': 0, 'misses': 0, 'hit_ratio': 0.0})
+
+    @override_settings(API_RESPONSE_CACHE={'MAX_SIZE': 10})
+    def test_large_bodies_not_cached(self):
+        """Test that bodies over MAX_SIZE are rendered every time."""
+        response_cache.configure()
+        self.addCleanup(response_cache.configure)
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.assertEqual(response_cache.stats()['misses'], 2)
+
+
+class SQLiteBackendTestCase(APITestCase):
+    """Test cases for the tuned SQLite backend."""
+
+    def connect(self, **options):
+        """Open a connection to a scratch database file."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            'OPTIONS': options,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='pragmas')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        """Return the value of PRAGMA `name`."""
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_default_pragmas(self):
+        """Test that new connections get the default PRAGMAs."""
+        wrapper = self.connect()
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self.pragma(wrapper, 'mmap_size'), 256 * 1024 * 1024)
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+
+    def test_configured_pragmas(self):
+        """Test that OPTIONS['pragmas'] overrides or drops defaults."""
+        wrapper = self.connect(pragmas={'journal_mode': None, 'busy_timeout': 100})
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 100)
+
+    def test_invalid_pragma(self):
+        """Test that PRAGMA values are not interpolated unchecked."""
+        with self.assertRaisesMessage(ImproperlyConfigured, "invalid entry 'cache_size'"):
+            self.connect(pragmas={'cache_size': '1; DROP TABLE auth_user'})
+
+
+@override_settings(REPLICA_ROUTER={'REPLICAS': ['replica'], 'STICKY_SECONDS': 5})
+class ReplicaRoutingTestCase(APITestCase):
+    """Test cases for read-replica routing with read-your-writes pinning."""
+
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.token, created = Token.objects.get_or_create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.other_token, created = Token.objects.get_or_create(
+            user=User.objects.create_user(username='other', password='testpass123')
+        )
+
+        # The replica has replayed the first book but not the second
+        self.old_book = Book.objects.create(title='Old Book', author='Someone')
+        Book.objects.using('replica').create(pk=self.old_book.pk, title='Old Book', author='Someone')
+        self.new_book = Book.objects.create(title='New Book', author='Someone')
+
+    def list_titles(self, url=None):
+        response = self.client.get(url or reverse('book-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [book['title'] for book in response.json()]
+
+    def create_book(self, title):
+        response = self.client.post(
+            reverse('book_all-list'), {'title': title, 'author': 'Writer'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()['id']
+
+    def test_reads_use_replica(self):
+        """Test that list and retrieve are served from the replica."""
+        # Long after the writes: nothing cached, no book recently written
+        cache.clear()
+        self.assertEqual(self.list_titles(), ['Old Book'])
+        self.assertEqual(self.list_titles(reverse('book_all-list')), ['Old Book'])
+        response = self.client.get(
+            reverse('book_all-detail', kwargs={'pk': self.new_book.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(API_BOOK_CACHE={'CACHE_ALIAS': None})
+    def test_uncached_retrieve_reads_replica(self):
+        """Test that retrieve reads the replica with the object cache off."""
+        book_cache.configure()
+        self.addCleanup(book_cache.configure)
+        response = self.client.get(
+            reverse('book_all-detail', kwargs={'pk': self.new_book.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_object_cache_fill_after_write_reads_primary(self):
+        """Test that a recently written book is cached from the primary, not the replica."""
+        cache.delete(book_cache.key(self.new_book.pk))
+        response = self.client.get(
+            reverse('book_all-detail', kwargs={'pk': self.new_book.pk})
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_async_reads_use_replica(self):
+        """Test that AsyncBookList is served from the replica too."""
+        response = async_to_sync(self.async_client.get)(
+            reverse('book-list-async'),
+            headers={'Authorization': f'Token {self.token.key}'},
+        )
+        self.assertEqual(
+            [book['title'] for book in response.json()], ['Old Book']
+        )
+
+    def test_writer_reads_own_writes(self):
+        """Test that a client that wrote reads from the primary."""
+        self.create_book('Fresh Book')
+        self.assertFalse(Book.objects.using('replica').filter(title='Fresh Book').exists())
+        expected = ['Fresh Book', 'New Book', 'Old Book']
+        self.assertEqual(self.list_titles(), expected)
+        self.assertEqual(self.list_titles(reverse('book-list-async')), expected)
+
+    def test_other_clients_see_replica_lag(self):
+        """Test that clients that did not write keep reading the lagging replica."""
+        self.create_book('Fresh Book')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.other_token.key}')
+        self.assertEqual(self.list_titles(), ['Old Book'])
+
+    def test_pin_expires(self):
+        """Test that the writer goes back to the replica after STICKY_SECONDS."""
+        self.create_book('Fresh Book')
+        later = time.time() + 6
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(self.list_titles(), ['Old Book'])
+
+    def test_writes_go_to_primary(self):
+        """Test that writes inside a replica_reads() block still use the primary."""
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertEqual(router.db_for_write(Book), 'default')
+        book_id = self.create_book('Fresh Book')
+        self.assertTrue(Book.objects.using('default').filter(pk=book_id).exists())
+
+    def test_reads_outside_views_use_primary(self):
+        """Test that reads outside a request never go to a replica."""
+        with replica_reads():
+            self.assertEqual(ReplicaRouter().db_for_read(Book), 'default')
+        self.assertTrue(Book.objects.filter(title='New Book').exists())
+
+    def test_writer_skips_replica_response_cache(self):
+        """Test that a cached list read from the replica is not served to a pinned writer."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.other_token.key}')
+        self.list_titles()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        Book.objects.using('replica').create(title='Replayed', author='Someone')
+        self.create_book('Fresh Book')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.other_token.key}')
+        self.assertEqual(self.list_titles(), ['Old Book', 'Replayed'])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(self.list_titles(), ['Fresh Book', 'New Book', 'Old Book'])
+
+    @override_settings(REPLICA_ROUTER={'REPLICAS': []})
+    def test_no_replicas(self):
+        """Test that routing is off when no replicas are configured."""
+        self.assertEqual(self.list_titles(), ['New Book', 'Old Book'])
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BookList, BookViewSet
+from .views import AsyncBookList, BookExport, BookList, BookViewSet
 
 router = DefaultRouter()
 router.register(r'books_all', BookViewSet, basename='book_all')
 
 urlpatterns = [
     path('books/', BookList.as_view(), name='book-list'),
+    path('books/export/', BookExport.as_view(), name='book-export'),
+    path('books/async/', AsyncBookList.as_view(), name='book-list-async'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
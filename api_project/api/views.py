@@ -6,16 +6,53 @@ Permissions: All endpoints require authenticated users.
 
 Views:
     BookList: List all books (GET only)
+    AsyncBookList: BookList served with the async ORM under ASGI
     BookViewSet: Full CRUD operations on books
+    BookExport: Stream the whole catalog as NDJSON or CSV
+
+Pagination:
+    List endpoints are unpaginated by default. Passing ``page_size`` or
+    ``cursor`` switches to keyset pagination ordered on (title, id); see
+    api.pagination.BookCursorPagination.
+
+Conditional GET:
+    List and retrieve responses carry ETag and Last-Modified headers tied
+    to the catalog version (api.catalog). Requests sending a matching
+    If-None-Match / If-Modified-Since get 304 Not Modified without the
+    queryset being evaluated.
 """
 
-from rest_framework import generics, viewsets
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from rest_framework import generics, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from api_project.db_router import replica_reads
+
+from .book_cache import book_cache
+from .catalog import catalog_changed
+from .mixins import (
+    AsyncDispatchMixin, CachedRetrieveMixin, ConditionalGetMixin, ReplicaReadMixin,
+    ResponseCacheMixin, ValuesListMixin,
+)
 from .models import Book
-from .serializers import BookSerializer
+from .pagination import BookCursorPagination
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .response_cache import response_cache
+from .search import search_books
+from .serializers import BookListSerializer, BookSerializer, parse_book_id
 
 
-class BookList(generics.ListAPIView):
+class BookList(
+    ReplicaReadMixin, ConditionalGetMixin, ResponseCacheMixin, ValuesListMixin,
+    generics.ListAPIView,
+):
     """
     API view to retrieve list of all books.
     
@@ -23,16 +60,131 @@ class BookList(generics.ListAPIView):
     * Only authenticated users can access this view.
     
     Endpoint: GET /api/books/
+    Endpoint: GET /api/books/?page_size=50[&cursor=...]
+    Endpoint: GET /api/books/?q=tolkien hobbit[&page_size=20]
     
     Returns:
-        List of all books in JSON format
+        List of all books in JSON format, or a page of books with
+        next/previous links when pagination is requested
+
+    Search:
+        ``q`` returns books whose title or author contains every word of
+        the query (as a word prefix), best matches first. Search results
+        are not paginated; at most ``page_size`` (default 50) are returned.
+
+    JSON responses are cached for all users until the catalog changes
+    (api.response_cache).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BookCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_values_fields = ('id', 'title', 'author')
+    response_cache = response_cache
+    search_query_param = 'q'
+
+    def get_search_query(self):
+        return self.request.query_params.get(self.search_query_param, '').strip()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        query = self.get_search_query()
+        if query:
+            limit = self.paginator.get_page_size(self.request)
+            queryset = search_books(queryset, query)[:limit]
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        if self.get_search_query():
+            return None
+        return super().paginate_queryset(queryset)
+
+
+class AsyncBookList(AsyncDispatchMixin, BookList):
+    """
+    Async variant of BookList, for ASGI deployments.
+
+    Endpoint: GET /api/books/async/ (same parameters and responses as
+    /api/books/)
+
+    Rows are read with the async ORM (aiterator), so while a worker waits
+    on the database its event loop keeps serving other requests. Under
+    WSGI use BookList; Django would run this view in its own event loop.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        with replica_reads():
+            return await self.aconditional_response(request, self.alist, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        if self.get_search_query():
+            # search_books() may introspect the database for the FTS index
+            queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+        use_values = self.use_values_list(request)
+        if use_values:
+            queryset = queryset.values(*self.list_values_fields)
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            rows = page
+        else:
+            rows = [row async for row in queryset.aiterator()]
+        data = rows if use_values else self.get_serializer(rows, many=True).data
+
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None or self.get_search_query():
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+
+
+class BookExport(generics.GenericAPIView):
+    """
+    API view to stream the entire book catalog.
+
+    * Requires token authentication.
+    * Only authenticated users can access this view.
+
+    Endpoint: GET /api/books/export/?format=ndjson (default)
+    Endpoint: GET /api/books/export/?format=csv
+
+    Rows are read with a chunked database cursor and written to the client
+    as they arrive, so memory use does not depend on the catalog size.
+    """
+    queryset = Book.objects.all()
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    export_fields = ('id', 'title', 'author')
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        rows = (
+            self.get_queryset()
+            .order_by('id')
+            .values_list(*self.export_fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(rows, self.export_fields),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="books.{renderer.format}"'
+        )
+        return response
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, ResponseCacheMixin, ValuesListMixin,
+    CachedRetrieveMixin, viewsets.ModelViewSet,
+):
     """
     A ViewSet for viewing and editing Book instances.
     
@@ -46,10 +198,155 @@ class BookViewSet(viewsets.ModelViewSet):
         PUT /api/books_all/{id}/ - Update a book (full)
         PATCH /api/books_all/{id}/ - Update a book (partial)
         DELETE /api/books_all/{id}/ - Delete a book
+        POST /api/books_all/bulk/ - Create many books from a list
+        PATCH /api/books_all/bulk/ - Partially update many books ("id" per item)
+        DELETE /api/books_all/bulk/ - Delete many books from a list of ids
+
+    Bulk actions validate every item, write the valid ones in a single
+    statement and report the rest as {"index": i, "errors": {...}}. They
+    answer 200/201 when every item succeeded, 207 when only some did and
+    400 when none did.
     
     Permissions:
         All actions require authentication.
+
+    The list action supports the same opt-in keyset pagination as BookList.
+    JSON list responses are cached for all users until the catalog changes
+    (api.response_cache); retrieve reads from the write-through object
+    cache (api.book_cache).
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
-    permission_classes = [IsAuthenticated]
\ No newline at end of file
+    permission_classes = [IsAuthenticated]
+    pagination_class = BookCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    list_values_fields = ('id', 'title', 'author')
+    response_cache = response_cache
+    object_cache = book_cache
+    bulk_max_items = 1000
+
+    def get_bulk_status(self, done, errors, success=status.HTTP_200_OK):
+        if not errors:
+            return success
+        if done:
+            return status.HTTP_207_MULTI_STATUS
+        return status.HTTP_400_BAD_REQUEST
+
+    @action(detail=False, methods=['post'], url_path='bulk', url_name='bulk')
+    def bulk_create(self, request):
+        """Create every valid book in the payload with one bulk INSERT."""
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_items
+        )
+        valid, errors = serializer.partition()
+
+        try:
+            with transaction.atomic():
+                books = serializer.create([data for _, _, data in valid])
+                if books:
+                    catalog_changed()
+        except IntegrityError:
+            # A concurrent request stored one of the books after validation
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'A book in this batch was created by another request; '
+                    'nothing was created.'
+                ]
+            })
+
+        created = BookSerializer(books, many=True).data
+        code = self.get_bulk_status(books, errors, status.HTTP_201_CREATED)
+        return Response({'created': created, 'errors': errors}, status=code)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update every valid item with one bulk UPDATE."""
+        serializer = self.get_serializer(
+            {}, data=request.data, many=True, partial=True,
+            max_length=self.bulk_max_items,
+        )
+        # Reject oversized or malformed payloads before touching the database
+        serializer.validate_list(request.data)
+        ids = set()
+        for item in request.data:
+            try:
+                ids.add(parse_book_id(item['id']))
+            except (KeyError, TypeError, ValidationError):
+                pass
+        ids.discard(None)
+        serializer.instance = self.get_queryset().in_bulk(ids)
+        valid, errors = serializer.partition()
+
+        books, fields = [], set()
+        for _, book, data in valid:
+            for field, value in data.items():
+                setattr(book, field, value)
+            fields.update(data)
+            books.append(book)
+
+        with transaction.atomic():
+            if fields:
+                Book.objects.bulk_update(books, sorted(fields))
+                catalog_changed()
+                book_cache.write(books)
+
+        updated = BookSerializer(books, many=True).data
+        code = self.get_bulk_status(books, errors)
+        return Response({'updated': updated, 'errors': errors}, status=code)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request):
+        """Delete every book whose id is listed in the payload."""
+        if not isinstance(request.data, list):
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['Expected a list of ids.']
+            })
+        if len(request.data) > self.bulk_max_items:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Ensure this list has no more than {self.bulk_max_items} items.'
+                ]
+            })
+
+        ids, errors, seen = [], [], set()
+        for index, value in enumerate(request.data):
+            try:
+                pk = parse_book_id(value)
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+                continue
+            if pk is None:
+                errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+                continue
+            if pk in seen:
+                errors.append({
+                    'index': index,
+                    'errors': {'id': [BookListSerializer.duplicate_id_message]},
+                })
+                continue
+            seen.add(pk)
+            ids.append((index, pk))
+
+        with transaction.atomic():
+            existing = set(
+                self.get_queryset().filter(pk__in=[pk for _, pk in ids])
+                .values_list('pk', flat=True)
+            )
+            if existing:
+                # Nothing cascades from Book, so skip the per-row post_delete
+                # handlers and bump the catalog and evict the cache once.
+                doomed = Book.objects.filter(pk__in=existing)
+                doomed._raw_delete(doomed.db)
+                catalog_changed()
+                book_cache.evict(sorted(existing))
+
+        deleted = []
+        for index, pk in ids:
+            if pk in existing:
+                deleted.append(pk)
+            else:
+                errors.append({'index': index, 'errors': {'id': ['Not found.']}})
+        errors.sort(key=lambda error: error['index'])
+
+        code = self.get_bulk_status(deleted, errors)
+        return Response({'deleted': deleted, 'errors': errors}, status=code)
@@ -0,0 +1,277 @@
+"""
+Project middleware.
+
+QueryMetricsMiddleware records per-request query count, SQL time, view
+time and response size (see dump_request_metrics).
+
+It runs natively under WSGI and ASGI, so async views are not pushed
+into a thread by a sync-only middleware.
+"""
+
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, suppress
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_DEFAULTS = {
+    'DIR': None,
+    'FLUSH_INTERVAL': 10,
+    'SERVER_TIMING': True,
+}
+
+# Histogram bucket upper bounds; the last bucket is open-ended
+TIME_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def get_route(request):
+    """Return a low-cardinality key for the request: method and URL pattern."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} <unresolved>'
+    return f'{request.method} {match.route or match.view_name}'
+
+
+def get_metrics_settings():
+    return {**METRICS_DEFAULTS, **getattr(settings, 'REQUEST_METRICS', {})}
+
+
+def bucket_index(bounds, value):
+    return bisect.bisect_left(bounds, value)
+
+
+def new_route_stats():
+    return {
+        'requests': 0,
+        'queries': 0,
+        'db_ms': 0.0,
+        'view_ms': 0.0,
+        'total_ms': 0.0,
+        'bytes': 0,
+        'sized': 0,
+        'max_queries': 0,
+        'total_ms_histogram': [0] * (len(TIME_BUCKETS_MS) + 1),
+        'queries_histogram': [0] * (len(QUERY_BUCKETS) + 1),
+    }
+
+
+def merge_route_stats(into, other):
+    """Add the counters of `other` to `into` (both new_route_stats() dicts)."""
+    for key in ('requests', 'queries', 'db_ms', 'view_ms', 'total_ms', 'bytes', 'sized'):
+        into[key] += other[key]
+    into['max_queries'] = max(into['max_queries'], other['max_queries'])
+    for key in ('total_ms_histogram', 'queries_histogram'):
+        into[key] = [a + b for a, b in zip(into[key], other[key])]
+    return into
+
+
+def histogram_quantile(histogram, bounds, quantile):
+    """Estimate a quantile as the upper bound of the bucket it falls in."""
+    total = sum(histogram)
+    if not total:
+        return 0
+    target = quantile * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= target:
+            return bounds[index] if index < len(bounds) else float('inf')
+    return float('inf')
+
+
+class MetricsRegistry:
+    """In-process per-route aggregates, periodically written to disk."""
+
+    def __init__(self):
+        self.routes = {}
+        self.lock = threading.Lock()
+        self.directory = None
+        self.flush_interval = 10
+        self.last_flush = time.monotonic()
+
+    def configure(self, directory, flush_interval):
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+
+    def record(self, route, queries, db_ms, view_ms, total_ms, size):
+        with self.lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = new_route_stats()
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['db_ms'] += db_ms
+            stats['view_ms'] += view_ms
+            stats['total_ms'] += total_ms
+            if size is not None:
+                stats['bytes'] += size
+                stats['sized'] += 1
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            stats['total_ms_histogram'][bucket_index(TIME_BUCKETS_MS, total_ms)] += 1
+            stats['queries_histogram'][bucket_index(QUERY_BUCKETS, queries)] += 1
+            now = time.monotonic()
+            due = now - self.last_flush >= self.flush_interval
+            if due:
+                # Claim this flush so concurrent requests do not start another
+                self.last_flush = now
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.routes))
+
+    def flush(self):
+        """
+        Write this process's aggregates to REQUEST_METRICS['DIR'].
+
+        Errors are logged, not raised, so metrics can never fail a request.
+        """
+        with self.lock:
+            self.last_flush = time.monotonic()
+        if self.directory is None:
+            return
+        path = self.directory / f'request-metrics-{os.getpid()}.json'
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # A private temporary file per flush, so concurrent flushes never
+            # replace or remove each other's
+            with tempfile.NamedTemporaryFile(
+                'w', dir=self.directory, prefix=f'{path.stem}-', suffix='.tmp', delete=False
+            ) as tmp:
+                json.dump(self.snapshot(), tmp)
+            os.replace(tmp.name, path)
+        except OSError:
+            logger.warning('Could not write request metrics to %s', path, exc_info=True)
+            if tmp is not None:
+                with suppress(OSError):
+                    os.remove(tmp.name)
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+
+registry = MetricsRegistry()
+
+
+def load_metrics(directory):
+    """Merge every worker's metrics file in `directory` into one dict."""
+    merged = {}
+    for path in sorted(Path(directory).glob('request-metrics-*.json')):
+        try:
+            routes = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for route, stats in routes.items():
+            merge_route_stats(merged.setdefault(route, new_route_stats()), stats)
+    return merged
+
+
+class QueryRecorder:
+    """execute_wrapper callable that counts queries and sums their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class QueryMetricsMiddleware:
+    """
+    Record database cost and timing for every request.
+
+    For each request this counts SQL queries and their total time (via
+    connection.execute_wrapper), measures view and total time and the
+    response size, and:
+
+    * adds a Server-Timing header, e.g.
+      ``Server-Timing: db;dur=3.1;desc="4 queries", view;dur=7.9, total;dur=8.4``
+    * aggregates per-route histograms in-process, which are written to
+      REQUEST_METRICS['DIR'] every REQUEST_METRICS['FLUSH_INTERVAL'] seconds
+      (one JSON file per worker) for the dump_request_metrics command.
+
+    The per-query cost is one wrapper call and two perf_counter() reads.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        conf = get_metrics_settings()
+        self.server_timing = conf['SERVER_TIMING']
+        self.registry = registry
+        self.registry.configure(conf['DIR'], conf['FLUSH_INTERVAL'])
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with self.record_queries(recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        # The async ORM runs queries in the request's sync thread, which has
+        # its own connections, so the wrappers are installed there
+        stack = await sync_to_async(self.record_queries)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder, start)
+
+    def record_queries(self, recorder):
+        """Return an ExitStack with `recorder` wrapping every connection."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def finish(self, request, response, recorder, start):
+        end = time.perf_counter()
+        total_ms = (end - start) * 1000
+        view_start = getattr(request, '_metrics_view_start', None)
+        view_ms = (end - view_start) * 1000 if view_start is not None else 0.0
+        db_ms = recorder.duration * 1000
+        size = None if response.streaming else len(response.content)
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+                f'view;dur={view_ms:.1f}, total;dur={total_ms:.1f}'
+            )
+        self.registry.record(
+            get_route(request), recorder.count, db_ms, view_ms, total_ms, size
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_start = time.perf_counter()
+        return None
@@ -2,7 +2,8 @@
 Django settings for api_project project.
 
 Authentication and Permission Configuration:
-- Token Authentication is enabled for API endpoints
+- Token Authentication is enabled for API endpoints (with a lookup cache,
+  see api.authentication.CachedTokenAuthentication)
 - Session Authentication is enabled for the browsable API
 - Default permission requires authentication for all endpoints
 """
@@ -30,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_project.middleware.QueryMetricsMiddleware',
+    'api_project.db_router.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +42,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request metrics (see api_project.middleware.QueryMetricsMiddleware)
+# Each worker writes its per-route aggregates to DIR every FLUSH_INTERVAL
+# seconds; `python manage.py dump_request_metrics` merges and prints them.
+REQUEST_METRICS = {
+    'DIR': BASE_DIR / 'request_metrics',
+    'FLUSH_INTERVAL': 10,
+    'SERVER_TIMING': True,
+}
+
 ROOT_URLCONF = 'api_project.urls'
 
 TEMPLATES = [
@@ -61,8 +73,46 @@ WSGI_APPLICATION = 'api_project.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # django.db.backends.sqlite3 plus per-connection PRAGMAs (WAL,
+        # synchronous=NORMAL, mmap, cache size, busy timeout); override them
+        # with OPTIONS['pragmas'], see api_project.sqlite_backend.base
+        'ENGINE': 'api_project.sqlite_backend',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests. Under ASGI the async ORM uses a
+        # new thread, and so a new connection, per request: set this to 0.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Take the write lock at BEGIN (waiting up to busy_timeout), so a
+            # transaction never fails when it turns from reading to writing
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+# Stand-in read replica: a second SQLite file. Point it at a real replica
+# and list it in REPLICA_ROUTER['REPLICAS'] to move catalog reads there.
+DATABASES['replica'] = {**DATABASES['default'], 'NAME': BASE_DIR / 'db-replica.sqlite3'}
+
+# Writes go to PRIMARY; the catalog list/retrieve views read from REPLICAS,
+# except for clients that wrote in the last STICKY_SECONDS (see
+# api_project.db_router). No REPLICAS means every query uses PRIMARY.
+DATABASE_ROUTERS = ['api_project.db_router.ReplicaRouter']
+REPLICA_ROUTER = {
+    'PRIMARY': 'default',
+    'REPLICAS': [],
+    'STICKY_SECONDS': 5,
+}
+
+# Cache
+# The Book catalog version (api.catalog) and cached books (api.book_cache)
+# live here. Point this at a shared backend (memcached/redis) when running
+# more than one worker process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-project',
+        # Room for the hot part of the catalog (the default is 300 entries)
+        'OPTIONS': {'MAX_ENTRIES': 20000},
     }
 }
 
@@ -88,10 +138,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+}
+
+# Token lookup cache used by api.authentication.CachedTokenAuthentication.
+# Set CACHE_ALIAS to a shared cache to reuse lookups across workers and
+# revoke tokens on every worker at once.
+API_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 300,
+    'CACHE_ALIAS': None,
+}
+
+# Write-through Book cache used by BookViewSet.retrieve (api.book_cache).
+# CACHE_ALIAS None turns it off.
+API_BOOK_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+# Shared cache of rendered list responses for BookList and the BookViewSet
+# list action (api.response_cache). CACHE_ALIAS None turns it off.
+API_RESPONSE_CACHE = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'MAX_SIZE': 1024 * 1024,
+}
@@ -0,0 +1,67 @@
+"""
+SQLite backend tuned for serving web requests.
+
+Identical to django.db.backends.sqlite3, except that every new
+connection first runs the PRAGMAs in OPTIONS['pragmas'], merged over
+these defaults:
+
+    journal_mode=WAL      readers and the writer no longer block each other
+    synchronous=NORMAL    sync at WAL checkpoints, not on every commit;
+                          a power loss can lose the last commits, never
+                          corrupt the database
+    mmap_size=256 MiB     read pages through a memory map instead of read()
+    cache_size=-65536     64 MiB page cache per connection (negative = KiB)
+    busy_timeout=5000     wait up to 5 s for the write lock before
+                          raising "database is locked"
+
+Set a PRAGMA to None to keep SQLite's own default. Use it with
+CONN_MAX_AGE, so a connection (and its warm page cache) serves many
+requests, and with OPTIONS['transaction_mode'] = 'IMMEDIATE', so that
+transactions take the write lock up front and wait busy_timeout for it
+rather than failing when they upgrade from reading to writing.
+"""
+
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE_RE = re.compile(r'^(-?\d+|[A-Za-z_]+)$')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_pragmas(self):
+        """Return the (name, value) PRAGMAs to run on each new connection."""
+        configured = self.settings_dict['OPTIONS'].get('pragmas') or {}
+        pragmas = []
+        for name, value in {**DEFAULT_PRAGMAS, **configured}.items():
+            if value is None:
+                continue
+            if not PRAGMA_NAME_RE.match(name) or not PRAGMA_VALUE_RE.match(str(value)):
+                raise ImproperlyConfigured(
+                    f"settings.DATABASES[{self.alias!r}]['OPTIONS']['pragmas'] "
+                    f'has an invalid entry {name!r}: {value!r}.'
+                )
+            pragmas.append((name, value))
+        return pragmas
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Not a sqlite3.connect() argument; read by get_new_connection()
+        params.pop('pragmas', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.get_pragmas():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
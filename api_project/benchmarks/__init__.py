@@ -0,0 +1,10 @@
+"""
+Stand-alone benchmarks for api_project.
+
+Run from the api_project directory, e.g.:
+
+    python -m benchmarks.bench_pagination --sizes 1000 100000 1000000
+
+Each benchmark builds its own throwaway SQLite database, so it never
+touches db.sqlite3.
+"""
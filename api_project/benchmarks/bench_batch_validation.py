@@ -0,0 +1,86 @@
+"""
+Validating many BookSerializer items: per-item uniqueness queries versus
+BookListSerializer's batched check.
+
+"per item" is DRF's stock ListSerializer, which runs the (title, author)
+UniqueTogetherValidator, and so one SELECT, for every item. "batched" is
+BookSerializer(many=True). --clash of the items repeat a book already
+in the table; both must reject exactly those.
+
+    python -m benchmarks.bench_batch_validation --rows 100000 --existing 100000 --clash 0.1
+"""
+
+import argparse
+import os
+import random
+import time
+
+from .common import fill_books, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--existing', type=int, default=100000)
+    parser.add_argument('--clash', type=float, default=0.1,
+                        help='Fraction of items that duplicate an existing book')
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+def run(args):
+    from django.db import connection
+    from rest_framework import serializers
+
+    from api.models import Book
+    from api.serializers import BookSerializer
+    from api_project.middleware import QueryRecorder
+
+    fill_books(args.existing)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    existing = list(Book.objects.values_list('title', 'author'))
+    rng = random.Random(0)
+    clashes = set(rng.sample(range(args.rows), int(args.rows * args.clash)))
+    payload = [
+        dict(zip(('title', 'author'), rng.choice(existing))) if index in clashes
+        else {'title': f'New title {index:07d}', 'author': f'Author {index % 997}'}
+        for index in range(args.rows)
+    ]
+
+    def per_item():
+        serializer = serializers.ListSerializer(child=BookSerializer(), data=payload)
+        serializer.is_valid()
+        return set(serializer.errors) if serializer.errors else set()
+
+    def batched():
+        serializer = BookSerializer(data=payload, many=True)
+        serializer.is_valid()
+        return set(serializer.errors) if serializer.errors else set()
+
+    rows = []
+    for label, func in (('per item', per_item), ('batched', batched)):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            start = time.perf_counter()
+            rejected = func()
+            elapsed = time.perf_counter() - start
+        assert rejected == clashes, (label, len(rejected), len(clashes))
+        rows.append((
+            label, f'{elapsed:.2f}', f'{args.rows / elapsed:,.0f}',
+            recorder.count, f'{recorder.duration:.2f}', len(rejected),
+        ))
+
+    print(f'{args.rows} items against {args.existing} books, {len(clashes)} duplicates')
+    print_table(('validation', 'seconds', 'items/s', 'queries', 'SQL seconds', 'rejected'), rows)
+
+
+if __name__ == '__main__':
+    main()
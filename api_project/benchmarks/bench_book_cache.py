@@ -0,0 +1,131 @@
+"""
+GET /api/books_all/{id}/ under a Zipf-distributed access pattern, with
+and without the write-through Book cache (api.book_cache).
+
+Client threads pick ids with probability proportional to 1 / rank**s,
+so a few thousand titles take most of the traffic, and send the
+requests through Django's WSGIHandler, as in a threaded WSGI server.
+A short --ttl makes hot entries expire during the run, so that
+concurrent misses are coalesced by the single-flight loader.
+
+    python -m benchmarks.bench_book_cache --books 100000 --requests 20000 --threads 8 --zipf 1.1
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+
+from .bench_sqlite_tuning import percentile, wsgi_request
+from .common import fill_books, make_user, print_table, setup_django
+
+CONFIGS = {
+    'no cache': {'CACHE_ALIAS': None},
+    'book cache': {'CACHE_ALIAS': 'default'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--zipf', type=float, default=1.1, help='Zipf exponent s')
+    parser.add_argument('--ttl', type=float, default=5, help='Book cache TIMEOUT in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+def zipf_ids(pks, count, exponent, seed):
+    """Return `count` ids drawn from `pks` with a Zipf(exponent) distribution."""
+    rng = random.Random(seed)
+    ranked = list(pks)
+    rng.shuffle(ranked)
+    weights = itertools.accumulate(1 / rank ** exponent for rank in range(1, len(ranked) + 1))
+    return rng.choices(ranked, cum_weights=list(weights), k=count)
+
+
+def run(args):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from rest_framework.authtoken.models import Token
+
+    from api.book_cache import book_cache
+    from api.models import Book
+
+    settings.DEBUG = False
+    settings.REQUEST_METRICS = {**settings.REQUEST_METRICS, 'DIR': None, 'SERVER_TIMING': False}
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    fill_books(args.books)
+    token = Token.objects.get_or_create(user=make_user())[0].key
+    ids = zipf_ids(
+        Book.objects.values_list('pk', flat=True), args.requests, args.zipf, args.seed
+    )
+    hot = len({pk for pk in ids})
+    connection.close()
+    application = get_wsgi_application()
+
+    rows = []
+    for name, conf in CONFIGS.items():
+        settings.API_BOOK_CACHE = {**conf, 'TIMEOUT': args.ttl}
+        book_cache.configure()
+        cache.clear()
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+        chunks = [ids[n::args.threads] for n in range(args.threads)]
+
+        def client(chunk):
+            for pk in chunk:
+                start = time.perf_counter()
+                code, _ = wsgi_request(application, 'GET', f'/api/books_all/{pk}/', token)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    (latencies if code == 200 else errors).append(elapsed)
+
+        threads = [threading.Thread(target=client, args=(chunk,)) for chunk in chunks]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        stats = book_cache.stats()
+        queries = stats['queries'] if book_cache.cache is not None else len(ids)
+        rows.append((
+            name,
+            f'{len(latencies) / elapsed:.0f}',
+            f'{percentile(latencies, 0.5):.2f}',
+            f'{percentile(latencies, 0.99):.2f}',
+            f"{stats['hit_ratio']:.3f}" if book_cache.cache is not None else '-',
+            f'{queries / len(ids):.3f}',
+            stats['coalesced'],
+            len(errors),
+        ))
+
+    print(f'{args.books} books, {args.requests} requests over {hot} distinct ids '
+          f'(zipf s={args.zipf:g}), {args.threads} threads, TIMEOUT {args.ttl:g} s')
+    print_table(
+        ('config', 'req/s', 'p50 ms', 'p99 ms', 'hit ratio', 'book queries/req',
+         'coalesced', 'errors'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
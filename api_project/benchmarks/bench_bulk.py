@@ -0,0 +1,85 @@
+"""
+Throughput of single-item POSTs versus the bulk create/update/delete actions.
+
+Loads the same books through POST /api/books_all/ one at a time and
+through POST /api/books_all/bulk/ in batches, then times bulk PATCH and
+DELETE over the same rows.
+
+    python -m benchmarks.bench_bulk --items 5000 --batch 1000
+"""
+
+import argparse
+import os
+import time
+
+from .common import make_user, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def run(args):
+    from rest_framework.test import APIClient
+
+    from api.models import Book
+
+    client = APIClient()
+    client.force_authenticate(user=make_user())
+    payload = [
+        {'title': f'Title {i:07d}', 'author': f'Author {i % 97}'}
+        for i in range(args.items)
+    ]
+    batches = [
+        payload[i:i + args.batch] for i in range(0, len(payload), args.batch)
+    ]
+
+    def rate(seconds):
+        return f'{args.items / seconds:,.0f}'
+
+    rows = []
+
+    start = time.perf_counter()
+    for item in payload:
+        assert client.post('/api/books_all/', item, format='json').status_code == 201
+    single = time.perf_counter() - start
+    rows.append(('create (single)', f'{single:.3f}', rate(single), '1.0x'))
+    Book.objects.all().delete()
+
+    start = time.perf_counter()
+    for batch in batches:
+        assert client.post('/api/books_all/bulk/', batch, format='json').status_code == 201
+    bulk = time.perf_counter() - start
+    rows.append(('create (bulk)', f'{bulk:.3f}', rate(bulk), f'{single / bulk:.1f}x'))
+
+    ids = list(Book.objects.values_list('id', flat=True))
+    id_batches = [ids[i:i + args.batch] for i in range(0, len(ids), args.batch)]
+
+    start = time.perf_counter()
+    for batch in id_batches:
+        changes = [{'id': pk, 'author': 'Updated'} for pk in batch]
+        assert client.patch('/api/books_all/bulk/', changes, format='json').status_code == 200
+    elapsed = time.perf_counter() - start
+    rows.append(('update (bulk)', f'{elapsed:.3f}', rate(elapsed), ''))
+
+    start = time.perf_counter()
+    for batch in id_batches:
+        assert client.delete('/api/books_all/bulk/', batch, format='json').status_code == 200
+    elapsed = time.perf_counter() - start
+    rows.append(('delete (bulk)', f'{elapsed:.3f}', rate(elapsed), ''))
+
+    print(f'{args.items:,} items, bulk batches of {args.batch}')
+    print_table(['path', 'seconds', 'items/sec', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
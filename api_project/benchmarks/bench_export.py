@@ -0,0 +1,91 @@
+"""
+Peak memory of the streaming export versus the regular list endpoint.
+
+Consumes GET /api/books/export/ (NDJSON and CSV) at growing table sizes
+and records the tracemalloc peak. The streaming peak should stay flat;
+the unpaginated GET /api/books/ is measured up to --list-max rows for
+comparison and grows with the table. Timings include tracemalloc
+overhead and are only comparable with each other.
+
+    python -m benchmarks.bench_export --sizes 100000 1000000 5000000
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from .common import disable_response_cache, fill_books, make_user, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--list-max', type=int, default=100000)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    disable_response_cache()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def measure(func):
+    """Return (peak MiB, seconds, bytes produced) for a call of `func`."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    produced = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20, elapsed, produced
+
+
+def run(args):
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from api.views import BookExport, BookList
+
+    factory = APIRequestFactory()
+    user = make_user()
+    export_view = BookExport.as_view()
+    list_view = BookList.as_view()
+
+    def export(fmt):
+        request = factory.get('/api/books/export/', {'format': fmt})
+        force_authenticate(request, user=user)
+        response = export_view(request)
+        return sum(len(chunk) for chunk in response.streaming_content)
+
+    def full_list():
+        request = factory.get('/api/books/')
+        force_authenticate(request, user=user)
+        response = list_view(request)
+        response.render()
+        return len(response.content)
+
+    rows = []
+    filled = 0
+    for size in sorted(args.sizes):
+        fill_books(size - filled, start=filled)
+        filled = size
+        for label, func in (
+            ('export ndjson', lambda: export('ndjson')),
+            ('export csv', lambda: export('csv')),
+            ('list (json)', full_list),
+        ):
+            if label.startswith('list') and size > args.list_max:
+                continue
+            peak, elapsed, produced = measure(func)
+            rows.append((
+                f'{size:,}', label, f'{peak:.1f}', f'{elapsed:.2f}',
+                f'{produced / 2 ** 20:.1f}',
+            ))
+
+    print_table(['rows', 'path', 'peak MiB', 'seconds', 'body MiB'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Rows/sec of the Book list endpoint with and without the values() fast path.
+
+"before" is a plain ListAPIView using BookSerializer and JSONRenderer,
+i.e. the original BookList. "after" is the current BookList. Both
+responses are checked to be byte-identical.
+
+    python -m benchmarks.bench_list_serialization --rows 1000 10000 100000
+"""
+
+import argparse
+import os
+
+from .common import (
+    disable_response_cache, fill_books, make_user, print_table, setup_django, timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    disable_response_cache()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def run(args):
+    from rest_framework import generics
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from api import renderers
+    from api.models import Book
+    from api.serializers import BookSerializer
+    from api.views import BookList
+
+    class SerializerBookList(generics.ListAPIView):
+        queryset = Book.objects.all()
+        serializer_class = BookSerializer
+        renderer_classes = [JSONRenderer]
+
+    factory = APIRequestFactory()
+    user = make_user()
+    views = {
+        'before': SerializerBookList.as_view(),
+        'after': BookList.as_view(),
+    }
+
+    def get(view):
+        request = factory.get('/api/books/', HTTP_ACCEPT='application/json')
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        return response.content
+
+    print(f"orjson: {'installed' if renderers.orjson else 'not installed'}")
+    table = []
+    filled = 0
+    for size in sorted(args.rows):
+        fill_books(size - filled, start=filled)
+        filled = size
+        assert get(views['before']) == get(views['after'])
+
+        results = {}
+        for label, view in views.items():
+            median, _ = timed(lambda: get(view), args.repeat, warmup=1)
+            results[label] = median
+        table.append((
+            f'{size:,}',
+            f'{size / results["before"] * 1000:,.0f}',
+            f'{size / results["after"] * 1000:,.0f}',
+            f'{results["before"] / results["after"]:.1f}x',
+        ))
+
+    print_table(['rows', 'before rows/s', 'after rows/s', 'speedup'], table)
+
+
+if __name__ == '__main__':
+    main()
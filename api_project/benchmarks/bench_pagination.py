@@ -0,0 +1,91 @@
+"""
+Keyset pagination latency versus catalog size.
+
+Times GET /api/books/?page_size=50 for the first page and for a page 90%
+of the way through the catalog, and compares the deep page with the
+equivalent LIMIT/OFFSET query. Keyset latency should stay flat as the
+table grows; OFFSET grows linearly.
+
+    python -m benchmarks.bench_pagination --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import os
+
+from .common import (
+    disable_response_cache, fill_books, make_user, print_table, setup_django, timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    disable_response_cache()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def run(args):
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from api.models import Book
+    from api.pagination import BookCursorPagination
+    from api.serializers import BookSerializer
+    from api.views import BookList
+
+    factory = APIRequestFactory()
+    view = BookList.as_view()
+    user = make_user()
+    paginator = BookCursorPagination()
+
+    def get(params):
+        request = factory.get('/api/books/', params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        assert response.status_code == 200, response.status_code
+
+    rows = []
+    filled = 0
+    for size in sorted(args.sizes):
+        fill_books(size - filled, start=filled)
+        filled = size
+
+        offset = int(size * 0.9)
+        title, pk = (
+            Book.objects.order_by('title', 'id').values_list('title', 'id')[offset]
+        )
+        cursor = paginator.encode_cursor(title, pk)
+
+        first, _ = timed(lambda: get({'page_size': args.page_size}), args.repeat)
+        deep, deep_p95 = timed(
+            lambda: get({'page_size': args.page_size, 'cursor': cursor}), args.repeat
+        )
+        by_offset, _ = timed(
+            lambda: BookSerializer(
+                Book.objects.order_by('title', 'id')[offset:offset + args.page_size],
+                many=True,
+            ).data,
+            args.repeat,
+        )
+        rows.append((
+            f'{size:,}', f'{first:.2f}', f'{deep:.2f}', f'{deep_p95:.2f}',
+            f'{by_offset:.2f}',
+        ))
+
+    print_table(
+        ['rows', 'page 1 ms', 'keyset deep ms', 'keyset p95 ms', 'offset deep ms'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
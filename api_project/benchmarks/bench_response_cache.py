@@ -0,0 +1,104 @@
+"""
+Latency and queries of the Book list endpoints with the shared response
+cache off and on (api.response_cache).
+
+Every request is made by a different user, as list traffic is in
+production, and goes through Django's WSGIHandler with the full
+middleware stack. Token lookups are cached before measuring, so the
+queries counted are the list's own; "cached" requests hit an entry
+rendered for another user.
+
+    python -m benchmarks.bench_response_cache --books 20000 --users 50 --repeat 200
+"""
+
+import argparse
+import os
+import time
+
+from .bench_sqlite_tuning import percentile, wsgi_request
+from .common import fill_books, make_user, print_table, setup_django
+
+URLS = (
+    '/api/books/?page_size=50',
+    '/api/books/?q=title%2000',
+    '/api/books_all/?page_size=50',
+    '/api/books/?page_size=1000',
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--books', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+def run(args):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from rest_framework.authtoken.models import Token
+
+    from api.response_cache import response_cache
+    from api_project.middleware import QueryRecorder
+
+    settings.DEBUG = False
+    settings.REQUEST_METRICS = {**settings.REQUEST_METRICS, 'DIR': None}
+    fill_books(args.books)
+    tokens = [
+        Token.objects.get_or_create(user=make_user(f'bench{n}'))[0].key
+        for n in range(args.users)
+    ]
+    application = get_wsgi_application()
+
+    def measure(url):
+        samples = []
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for n in range(args.repeat):
+                start = time.perf_counter()
+                code, _ = wsgi_request(application, 'GET', url, tokens[n % len(tokens)])
+                samples.append((time.perf_counter() - start) * 1000)
+                assert code == 200, code
+        return samples, recorder.count / args.repeat
+
+    rows = []
+    for url in URLS:
+        results = {}
+        for label, alias in (('uncached', None), ('cached', 'default')):
+            settings.API_RESPONSE_CACHE = {**settings.API_RESPONSE_CACHE, 'CACHE_ALIAS': alias}
+            response_cache.configure()
+            cache.clear()
+            for token in tokens:
+                # Cache every token lookup (and, when on, the list itself)
+                wsgi_request(application, 'GET', url, token)
+            results[label] = measure(url)
+        (plain, plain_queries), (cached, cached_queries) = results['uncached'], results['cached']
+        rows.append((
+            url,
+            f'{percentile(plain, 0.5):.2f}', f'{plain_queries:g}',
+            f'{percentile(cached, 0.5):.2f}', f'{percentile(cached, 0.99):.2f}',
+            f'{cached_queries:g}',
+            f'{percentile(plain, 0.5) / percentile(cached, 0.5):.1f}x',
+        ))
+
+    print(f'{args.books} books, {args.users} users, {args.repeat} requests per cell')
+    print_table(
+        ('url', 'uncached p50 ms', 'queries/req', 'cached p50 ms', 'cached p99 ms',
+         'queries/req', 'speed-up'),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+FTS5 search versus the LIKE (icontains) baseline.
+
+Builds catalogs of word-based titles and times a selective query, a
+common word and a two-word query through both search_books() (FTS5 index,
+ranked, top 50) and search_like() (LIKE scan, top 50).
+
+    python -m benchmarks.bench_search --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+
+from .common import print_table, setup_django, timed
+
+WORDS = (
+    'winter garden river shadow empire silent crown glass iron ocean '
+    'forest dragon letter midnight harbor paper stone golden secret '
+    'house queen hunter storm island orchard lantern summer raven bridge'
+).split()
+SURNAMES = (
+    'smith garcia tanaka okafor nguyen kowalski rossi haddad larsen '
+    'moreau silva novak ibrahim chen dubois'
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    db_path = setup_django()
+    try:
+        run(args)
+    finally:
+        os.remove(db_path)
+
+
+def fill(start, stop, rng):
+    from api.models import Book
+
+    for offset in range(start, stop, 10000):
+        Book.objects.bulk_create(
+            Book(
+                title=' '.join(rng.sample(WORDS, 3)) + f' {i}',
+                author=f'{rng.choice(SURNAMES)} {rng.choice(SURNAMES)}',
+            )
+            for i in range(offset, min(offset + 10000, stop))
+        )
+
+
+def run(args):
+    from api.models import Book
+    from api.search import has_search_index, search_books, search_like
+
+    assert has_search_index(), 'FTS5 index missing; is this SQLite with FTS5?'
+    rng = random.Random(42)
+    queries = {
+        'selective': '12345',
+        'common word': 'dragon',
+        'two words': 'dragon okafor',
+    }
+
+    rows = []
+    filled = 0
+    for size in sorted(args.sizes):
+        fill(filled, size, rng)
+        filled = size
+        for label, query in queries.items():
+            fts, _ = timed(
+                lambda: list(search_books(Book.objects.all(), query)[:50]), args.repeat
+            )
+            like, _ = timed(
+                lambda: list(search_like(query).order_by('title', 'id')[:50]), args.repeat
+            )
+            rows.append((
+                f'{size:,}', label, f'{fts:.2f}', f'{like:.2f}', f'{like / fts:.1f}x',
+            ))
+
+    print_table(['rows', 'query', 'fts ms', 'like ms', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""
+Mixed read/write load against SQLite, stock versus tuned.
+
+Reader threads page through GET /api/books/?page_size=50 while writer
+threads create a book with POST /api/books_all/ and delete it again with
+DELETE /api/books_all/bulk/ (a transaction that reads, then writes);
+one write below is that pair.
+Requests go through Django's WSGIHandler, as in a threaded WSGI server.
+Each configuration runs in a fresh process against a fresh database:
+
+    stock          django.db.backends.sqlite3, no options
+    pragmas        api_project.sqlite_backend (WAL, synchronous=NORMAL,
+                   mmap, cache_size, busy_timeout) with IMMEDIATE
+                   transactions, CONN_MAX_AGE = 0
+    pragmas+reuse  as shipped in settings.py (CONN_MAX_AGE = 600)
+
+    python -m benchmarks.bench_sqlite_tuning --books 20000 --readers 6 --writers 2 --seconds 10
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .common import (
+    PROJECT_DIR, disable_response_cache, fill_books, make_user, print_table, setup_django,
+)
+
+CONFIGS = {
+    'stock': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {},
+    },
+    'pragmas': {'CONN_MAX_AGE': 0},
+    'pragmas+reuse': {},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--books', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--child', metavar='CONFIG', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    rows = []
+    for name in CONFIGS:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_sqlite_tuning', '--child', name,
+             '--books', str(args.books), '--readers', str(args.readers),
+             '--writers', str(args.writers), '--seconds', str(args.seconds)],
+            cwd=PROJECT_DIR, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        rows.append((
+            name,
+            f"{result['reads'] / args.seconds:.0f}",
+            f"{result['read_p50']:.1f}", f"{result['read_p99']:.1f}",
+            f"{result['writes'] / args.seconds:.0f}",
+            f"{result['write_p50']:.1f}", f"{result['write_p99']:.1f}",
+            result['errors'],
+        ))
+
+    print(f'{args.books} books, {args.readers} readers, {args.writers} writers, '
+          f'{args.seconds:g} s per configuration')
+    print_table(
+        ('config', 'reads/s', 'read p50', 'read p99',
+         'writes/s', 'write p50', 'write p99', 'errors'),
+        rows,
+    )
+
+
+def wsgi_request(application, method, path, token, body=None):
+    data = json.dumps(body).encode() if body is not None else b''
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_AUTHORIZATION': f'Token {token}',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(data),
+        'wsgi.errors': sys.stderr,
+    }
+    status = []
+    response = application(environ, lambda code, headers: status.append(int(code.split()[0])))
+    content = b''.join(response)
+    response.close()
+    return status[0], content
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+def child(args):
+    """Run one configuration in this process and print the results as JSON."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'api_project.settings'
+
+    from django.conf import settings
+
+    settings.DATABASES['default'].update(CONFIGS[args.child])
+    settings.DEBUG = False
+    settings.REQUEST_METRICS = {**settings.REQUEST_METRICS, 'DIR': None}
+    # "database is locked" errors are counted, not logged
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    db_path = setup_django()
+    disable_response_cache()
+    try:
+        results = measure(args)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+    print(json.dumps(results))
+
+
+def measure(args):
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from rest_framework.authtoken.models import Token
+
+    fill_books(args.books)
+    token = Token.objects.get_or_create(user=make_user())[0].key
+    connection.close()
+
+    application = get_wsgi_application()
+    deadline = time.perf_counter() + args.seconds
+    reads, writes, errors = [], [], []
+    lock = threading.Lock()
+
+    def reader():
+        first_page = url = '/api/books/?page_size=50'
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            code, content = wsgi_request(application, 'GET', url, token)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                (reads if code == 200 else errors).append(elapsed)
+            link = json.loads(content)['next'] if code == 200 else None
+            url = f'{urlsplit(link).path}?{urlsplit(link).query}' if link else first_page
+
+    def writer(number):
+        count = 0
+        while time.perf_counter() < deadline:
+            count += 1
+            start = time.perf_counter()
+            code, content = wsgi_request(
+                application, 'POST', '/api/books_all/', token,
+                {'title': f'Writer {number} book {count}', 'author': 'Bench'},
+            )
+            if code == 201:
+                book_id = json.loads(content)['id']
+                code, _ = wsgi_request(
+                    application, 'DELETE', '/api/books_all/bulk/', token, [book_id]
+                )
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                (writes if code == 200 else errors).append(elapsed)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'reads': len(reads),
+        'read_p50': percentile(reads, 0.5),
+        'read_p99': percentile(reads, 0.99),
+        'writes': len(writes),
+        'write_p50': percentile(writes, 0.5),
+        'write_p99': percentile(writes, 0.99),
+        'errors': len(errors),
+    }
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Shared helpers for the api_project benchmarks.
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django(db_path=None):
+    """
+    Configure Django against a scratch SQLite database and migrate it.
+
+    Returns the path of the database file (removed by the caller if needed).
+    """
+    if str(PROJECT_DIR) not in sys.path:
+        sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_project.settings')
+
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(prefix='api-bench-', suffix='.sqlite3')
+        os.close(fd)
+
+    import django
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def disable_response_cache():
+    """
+    Turn the list response cache off, so that repeated list requests
+    measure the query, serializer and renderer rather than a cache hit.
+    """
+    from django.conf import settings
+
+    from api.response_cache import response_cache
+
+    settings.API_RESPONSE_CACHE = {**settings.API_RESPONSE_CACHE, 'CACHE_ALIAS': None}
+    response_cache.configure()
+
+
+def make_user(username='bench'):
+    """Create (or fetch) a user to authenticate benchmark requests with."""
+    from django.contrib.auth.models import User
+
+    user, _ = User.objects.get_or_create(username=username)
+    return user
+
+
+def fill_books(total, batch_size=10000, start=0):
+    """Insert `total` books with a realistic spread of duplicate titles."""
+    from api.models import Book
+
+    for offset in range(start, start + total, batch_size):
+        stop = min(offset + batch_size, start + total)
+        Book.objects.bulk_create(
+            Book(title=f'Title {(i // 2) * 7919 % 1000003:07d}', author=f'Author {i % 997}')
+            for i in range(offset, stop)
+        )
+
+
+def timed(func, repeat=20, warmup=2):
+    """
+    Call `func` repeatedly and return (median, p95) wall time in milliseconds.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples), p95
+
+
+def print_table(headers, rows):
+    """Print rows as a fixed-width text table."""
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) if rows else len(str(h))
+        for i, h in enumerate(headers)
+    ]
+    line = '  '.join(str(h).rjust(w) for h, w in zip(headers, widths))
+    print(line)
+    print('-' * len(line))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
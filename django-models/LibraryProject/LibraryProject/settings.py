@@ -25,6 +25,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "LibraryProject.middleware.QueryMetricsMiddleware",
+    "LibraryProject.db_router.ReplicaPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,6 +36,28 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Request metrics (see LibraryProject.middleware.QueryMetricsMiddleware)
+# Each worker writes its per-route aggregates to DIR every FLUSH_INTERVAL
+# seconds; `python manage.py dump_request_metrics` merges and prints them.
+REQUEST_METRICS = {
+    "DIR": BASE_DIR / "request_metrics",
+    "FLUSH_INTERVAL": 10,
+    "SERVER_TIMING": True,
+}
+
+# Cache
+# Role lookups (relationship_app.roles) live here. Point this at a shared
+# backend (memcached/redis) when running more than one worker process;
+# until then ROLE_CACHE_TIMEOUT bounds how long another worker can see a
+# user's old role.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "library-project",
+    }
+}
+ROLE_CACHE_TIMEOUT = 300
+
 ROOT_URLCONF = "LibraryProject.urls"
 
 TEMPLATES = [
@@ -60,10 +84,35 @@ WSGI_APPLICATION = "LibraryProject.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        # django.db.backends.sqlite3 plus per-connection PRAGMAs (WAL,
+        # synchronous=NORMAL, mmap, cache size, busy timeout); override them
+        # with OPTIONS["pragmas"], see LibraryProject.sqlite_backend.base
+        "ENGINE": "LibraryProject.sqlite_backend",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Reuse connections across requests. Under ASGI the async ORM uses a
+        # new thread, and so a new connection, per request: set this to 0.
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # Take the write lock at BEGIN (waiting up to busy_timeout), so a
+            # transaction never fails when it turns from reading to writing
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
+# Stand-in read replica: a second SQLite file. Point it at a real replica
+# and list it in REPLICA_ROUTER["REPLICAS"] to move catalog reads there.
+DATABASES["replica"] = {**DATABASES["default"], "NAME": BASE_DIR / "db-replica.sqlite3"}
+
+# Writes go to PRIMARY; the book list and library detail views read from
+# REPLICAS, except for clients that wrote in the last STICKY_SECONDS (see
+# LibraryProject.db_router). No REPLICAS means every query uses PRIMARY.
+DATABASE_ROUTERS = ["LibraryProject.db_router.ReplicaRouter"]
+REPLICA_ROUTER = {
+    "PRIMARY": "default",
+    "REPLICAS": [],
+    "STICKY_SECONDS": 5,
+}
 
 
 # Password validation
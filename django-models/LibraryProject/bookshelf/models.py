@@ -6,5 +6,15 @@ class Book(models.Model):
     author = models.CharField(max_length=100)
     publication_year = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            # Lookups by title (see retrieve.md / update.md / delete.md)
+            models.Index(fields=["title"], name="bookshelf_title_idx"),
+            # Books by an author, listed by title
+            models.Index(fields=["author", "title"], name="bookshelf_author_title_idx"),
+            # Books published in a given year
+            models.Index(fields=["publication_year"], name="bookshelf_pub_year_idx"),
+        ]
+
     def __str__(self):
         return self.title
\ No newline at end of file
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class RelationshipAppConfig(AppConfig):
     name = 'relationship_app'
+
+    def ready(self):
+        from . import counters
+        from . import roles  # noqa: F401  (connects the role cache signals)
+
+        counters.connect_signals()
@@ -0,0 +1,128 @@
+"""
+Denormalized book counts on Author and Library.
+
+Author.book_count and Library.book_count are kept up to date by the
+signal receivers below, which only ever issue
+``UPDATE ... SET book_count = book_count +/- n`` (F-expressions), so
+concurrent writers cannot lose each other's changes. The in-memory
+``book_count`` of an instance is not refreshed; use refresh_from_db().
+
+Writes that bypass signals (bulk_create(), QuerySet.update(), raw SQL)
+leave the counts stale; run ``python manage.py rebuild_book_counts``
+afterwards. Until then decrements stop at zero, so deleting a book that
+was never counted cannot break the PositiveIntegerField's CHECK.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from .models import Author, Book, Library
+
+LibraryBooks = Library.books.through
+MISSING = object()
+
+
+def add_to_count(model, pks, delta):
+    if pks and delta:
+        count = F("book_count") + delta
+        if delta < 0:
+            count = Greatest(count, Value(0))
+        model.objects.filter(pk__in=pks).update(book_count=count)
+
+
+def book_pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    old = getattr(instance, "_loaded_author_id", MISSING)
+    if old is MISSING:
+        # Not loaded from the database (e.g. built with a pk by hand)
+        old = Book.objects.filter(pk=instance.pk).values_list("author_id", flat=True).first()
+    instance._previous_author_id = old
+
+
+def book_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        add_to_count(Author, [instance.author_id], 1)
+    else:
+        old = getattr(instance, "_previous_author_id", None)
+        if old != instance.author_id:
+            add_to_count(Author, [old], -1)
+            add_to_count(Author, [instance.author_id], 1)
+    instance._loaded_author_id = instance.author_id
+
+
+def book_pre_delete(sender, instance, **kwargs):
+    # The library links are removed by cascade, without m2m_changed
+    instance._counted_library_ids = list(
+        LibraryBooks.objects.filter(book_id=instance.pk).values_list("library_id", flat=True)
+    )
+
+
+def book_post_delete(sender, instance, **kwargs):
+    add_to_count(Author, [instance.author_id], -1)
+    add_to_count(Library, getattr(instance, "_counted_library_ids", ()), -1)
+
+
+def library_books_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    m2m_changed receiver for Library.books, from either side.
+
+    post_add's pk_set only holds the links actually created, but remove()
+    and clear() report what was asked for, so pre_remove / pre_clear look
+    up which links exist.
+    """
+    if reverse:
+        # book.libraries.add(...): instance is a Book, pk_set libraries
+        links = LibraryBooks.objects.filter(book_id=instance.pk)
+        link_field = "library_id"
+    else:
+        links = LibraryBooks.objects.filter(library_id=instance.pk)
+        link_field = "book_id"
+
+    if action in ("pre_remove", "pre_clear"):
+        if action == "pre_remove":
+            links = links.filter(**{f"{link_field}__in": pk_set})
+        instance._removed_links = list(links.values_list(link_field, flat=True))
+    elif action == "post_add":
+        if reverse:
+            add_to_count(Library, pk_set, 1)
+        else:
+            add_to_count(Library, [instance.pk], len(pk_set))
+    elif action in ("post_remove", "post_clear"):
+        removed = instance.__dict__.pop("_removed_links", [])
+        if reverse:
+            add_to_count(Library, removed, -1)
+        else:
+            add_to_count(Library, [instance.pk], -len(removed))
+
+
+def rebuild_counts():
+    """
+    Recompute every book_count from the Book and Library.books tables.
+
+    Returns (authors_fixed, libraries_fixed): how many rows were wrong.
+    """
+    fixed = []
+    for model, counted in (
+        (Author, Book.objects.filter(author_id=OuterRef("pk")).values("author_id")),
+        (Library, LibraryBooks.objects.filter(library_id=OuterRef("pk")).values("library_id")),
+    ):
+        actual = Coalesce(
+            Subquery(counted.annotate(total=Count("*")).values("total")), Value(0)
+        )
+        stale = model.objects.annotate(actual=actual).exclude(book_count=F("actual"))
+        fixed.append(model.objects.filter(pk__in=stale.values("pk")).update(book_count=actual))
+    return tuple(fixed)
+
+
+def connect_signals():
+    pre_save.connect(book_pre_save, sender=Book, dispatch_uid="book-count-pre-save")
+    post_save.connect(book_post_save, sender=Book, dispatch_uid="book-count-post-save")
+    pre_delete.connect(book_pre_delete, sender=Book, dispatch_uid="book-count-pre-delete")
+    post_delete.connect(book_post_delete, sender=Book, dispatch_uid="book-count-post-delete")
+    m2m_changed.connect(
+        library_books_changed, sender=LibraryBooks, dispatch_uid="library-book-count"
+    )
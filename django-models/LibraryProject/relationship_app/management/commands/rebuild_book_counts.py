@@ -0,0 +1,23 @@
+"""
+Recompute the denormalized Author.book_count and Library.book_count.
+
+    python manage.py rebuild_book_counts
+
+The counts are maintained by signals (see relationship_app.counters);
+run this after writes that bypass them, such as bulk_create() imports,
+or to repair drift. Only rows whose count is wrong are updated.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from relationship_app.counters import rebuild_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute Author.book_count and Library.book_count from the book tables."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            authors, libraries = rebuild_counts()
+        self.stdout.write(f"Fixed book counts of {authors} authors and {libraries} libraries.")
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0004_alter_book_options'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='author',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='library',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['author', 'title'], name='rel_book_author_title_idx'),
+        ),
+    ]
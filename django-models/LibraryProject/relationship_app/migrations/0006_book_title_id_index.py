@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0005_book_author_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title', 'id'], name='rel_book_title_id_idx'),
+        ),
+    ]
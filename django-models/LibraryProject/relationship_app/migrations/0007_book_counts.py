@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_book_counts(apps, schema_editor):
+    Author = apps.get_model('relationship_app', 'Author')
+    Book = apps.get_model('relationship_app', 'Book')
+    Library = apps.get_model('relationship_app', 'Library')
+    LibraryBooks = Library.books.through
+
+    for model, counted in (
+        (Author, Book.objects.filter(author_id=OuterRef('pk')).values('author_id')),
+        (Library, LibraryBooks.objects.filter(library_id=OuterRef('pk')).values('library_id')),
+    ):
+        total = Subquery(counted.annotate(total=Count('*')).values('total'))
+        model.objects.update(book_count=Coalesce(total, Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relationship_app', '0006_book_title_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='library',
+            name='book_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_book_counts, migrations.RunPython.noop),
+    ]
@@ -5,7 +5,9 @@ from django.dispatch import receiver
 
 
 class Author(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
+    # Maintained by relationship_app.counters; rebuild with rebuild_book_counts
+    book_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.name
@@ -16,6 +18,12 @@ class Book(models.Model):
     author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name="books")
 
     class Meta:
+        indexes = [
+            # Keyset pagination of the catalog on (title, id)
+            models.Index(fields=["title", "id"], name="rel_book_title_id_idx"),
+            # Books by an author, listed by title
+            models.Index(fields=["author", "title"], name="rel_book_author_title_idx"),
+        ]
         permissions = [
             ("can_add_book", "Can add book"),
             ("can_change_book", "Can change book"),
@@ -25,10 +33,21 @@ class Book(models.Model):
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so that changing a book's author can move the count;
+        # when author_id is deferred, book_pre_save reads it from the table
+        if "author_id" in field_names:
+            instance._loaded_author_id = instance.author_id
+        return instance
+
 
 class Library(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     books = models.ManyToManyField(Book, related_name="libraries")
+    # Maintained by relationship_app.counters; rebuild with rebuild_book_counts
+    book_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self) -> str:
         return self.name
@@ -51,13 +70,47 @@ ROLE_CHOICES = (
 )
 
 
+class UserProfileManager(models.Manager):
+    def create_for_users(self, users, role="Member", batch_size=None):
+        """
+        Create profiles for users that were inserted with bulk_create(),
+        which skips the post_save signal, in batched INSERTs.
+
+        Each user's `userprofile` is set to its new profile.
+        """
+        return self.bulk_create(
+            [UserProfile(user=user, role=role) for user in users], batch_size=batch_size
+        )
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default="Member")
 
+    objects = UserProfileManager()
+
     def __str__(self):
         return f"{self.user.username} - {self.role}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields
+        }
+
+    def has_changed(self):
+        """Return True if the profile differs from what is stored in the database."""
+        loaded = getattr(self, "_loaded_values", None)
+        if self._state.adding or loaded is None:
+            return True
+        return any(getattr(self, attname) != value for attname, value in loaded.items())
+
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -67,5 +120,11 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, "userprofile"):
-        instance.userprofile.save()
\ No newline at end of file
+    # Saving a user (Django does on every login) only writes the profile
+    # if it was loaded through this user and modified since. Checking the
+    # cache avoids querying for a profile nobody touched.
+    accessor = UserProfile._meta.get_field("user").remote_field
+    if accessor.is_cached(instance):
+        profile = accessor.get_cached_value(instance)
+        if profile is not None and profile.has_changed():
+            profile.save()
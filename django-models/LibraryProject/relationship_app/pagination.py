@@ -0,0 +1,155 @@
+"""
+Keyset (cursor) pagination for the book list pages.
+
+Pages are selected with a ``WHERE (title, id) > (?, ?)`` style predicate
+instead of ``OFFSET``, so a page deep into a 200k-book catalog costs the
+same index seek as the first one. The ``(title, id)`` and
+``(author, title)`` indexes on Book back the ordering with and without
+the author filter.
+
+Pages are lazy: nothing is queried until the template iterates the page
+or asks for its links.
+Async views load the page up front with ``await page.afetch()``.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class KeysetPaginator:
+    """
+    Paginate a Book queryset on (title, id).
+
+    Query parameters:
+        cursor: Opaque position taken from a page's next/previous cursor
+        page_size: Number of books per page (capped at ``max_page_size``)
+    """
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, encoded):
+        """Return (title, id, reverse), or None for the first page."""
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+            title, pk, reverse = json.loads(raw.decode("utf-8"))
+            if not isinstance(title, str) or not isinstance(pk, int):
+                raise ValueError
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            raise Http404(self.invalid_cursor_message)
+        return title, pk, bool(reverse)
+
+    def encode_cursor(self, title, pk, reverse=False):
+        payload = json.dumps([title, pk, int(reverse)], separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(payload.encode("utf-8"))
+        return encoded.decode("ascii").rstrip("=")
+
+    def get_page(self, request):
+        """Return the KeysetPage requested by ``request.GET``."""
+        cursor = self.decode_cursor(request.GET.get(self.cursor_query_param))
+        return KeysetPage(self, cursor, self.get_page_size(request))
+
+
+class KeysetPage:
+    """
+    One page of books. Iterating it yields the books in (title, id) order.
+    """
+
+    def __init__(self, paginator, cursor, page_size):
+        self.paginator = paginator
+        self.cursor = cursor
+        self.page_size = page_size
+
+    def get_queryset(self):
+        """Return the page_size + 1 rows to fetch, in cursor direction."""
+        queryset = self.paginator.queryset
+        if self.cursor is not None:
+            title, pk, reverse = self.cursor
+            if reverse:
+                # The AND'ed title__lte lets the database seek the index
+                queryset = queryset.filter(Q(title__lte=title) & (Q(title__lt=title) | Q(id__lt=pk)))
+            else:
+                queryset = queryset.filter(Q(title__gte=title) & (Q(title__gt=title) | Q(id__gt=pk)))
+        ordering = ("-title", "-id") if self.reverse else ("title", "id")
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def split_rows(self, books):
+        """Return (books, more_in_direction) from the fetched rows."""
+        more = len(books) > self.page_size
+        books = books[:self.page_size]
+        if self.reverse:
+            books.reverse()
+        return books, more
+
+    @cached_property
+    def _rows(self):
+        return self.split_rows(list(self.get_queryset()))
+
+    async def afetch(self):
+        """Load the page with the async ORM, e.g. before rendering in an async view."""
+        if "_rows" not in self.__dict__:
+            books = [book async for book in self.get_queryset().aiterator()]
+            self.__dict__["_rows"] = self.split_rows(books)
+
+    @property
+    def object_list(self):
+        return self._rows[0]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def reverse(self):
+        return self.cursor is not None and self.cursor[2]
+
+    @property
+    def has_next(self):
+        if not self.object_list:
+            return False
+        # A backwards page always has the page it came from after it
+        return self.reverse or self._rows[1]
+
+    @property
+    def has_previous(self):
+        if not self.object_list:
+            return False
+        return self._rows[1] if self.reverse else self.cursor is not None
+
+    @property
+    def next_cursor(self):
+        if not self.has_next:
+            return None
+        last = self.object_list[-1]
+        return self.paginator.encode_cursor(last.title, last.pk)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return None
+        first = self.object_list[0]
+        return self.paginator.encode_cursor(first.title, first.pk, reverse=True)
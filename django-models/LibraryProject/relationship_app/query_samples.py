@@ -1,6 +1,68 @@
+from django.db import connection
+
 from .models import Author, Book, Library, Librarian
 
 
+def _chunks(names):
+    """
+    Split `names` into de-duplicated chunks that fit in one IN (...) clause.
+    """
+    names = list(dict.fromkeys(names))
+    size = connection.features.max_query_params or len(names) or 1
+    for start in range(0, len(names), size):
+        yield names[start:start + size]
+
+
+def get_books_by_authors(author_names):
+    """
+    Query the books of many authors at once.
+
+    Returns a dict mapping every Author whose name is listed to a list of
+    its books (each with `author` already set). Names are not unique, so
+    results are keyed on the Author: two authors sharing a name get an
+    entry each. Two queries per chunk of names, however many names or
+    books there are.
+    """
+    result = {}
+    for chunk in _chunks(author_names):
+        authors = Author.objects.filter(name__in=chunk).prefetch_related("books")
+        for author in authors:
+            result[author] = list(author.books.all())
+    return result
+
+
+def get_books_in_libraries(library_names):
+    """
+    List the books of many libraries at once.
+
+    Returns a dict mapping every Library whose name is listed to a list of
+    its books, one entry per library even when names repeat. Two queries
+    per chunk of names.
+    """
+    result = {}
+    for chunk in _chunks(library_names):
+        libraries = Library.objects.filter(name__in=chunk).prefetch_related("books")
+        for library in libraries:
+            result[library] = list(library.books.all())
+    return result
+
+
+def get_librarians_for_libraries(library_names):
+    """
+    Retrieve the librarians of many libraries at once.
+
+    Returns a dict mapping every Library whose name is listed to its
+    Librarian, or None when it has no librarian. One query per chunk of
+    names.
+    """
+    result = {}
+    for chunk in _chunks(library_names):
+        libraries = Library.objects.filter(name__in=chunk).select_related("librarian")
+        for library in libraries:
+            result[library] = getattr(library, "librarian", None)
+    return result
+
+
 def get_books_by_author(author_name: str):
     """
     Query all books by a specific author.
@@ -30,4 +92,4 @@ def get_librarian_for_library(library_name: str):
         return None
 
     librarian = Librarian.objects.get(library=library)
-    return librarian
\ No newline at end of file
+    return librarian
@@ -5,6 +5,12 @@ from . import views
 urlpatterns = [
     path("books/", views.list_books, name="list_books"),
     path("libraries/<int:pk>/", views.LibraryDetailView.as_view(), name="library_detail"),
+    path("books/async/", views.list_books_async, name="list_books_async"),
+    path(
+        "libraries/<int:pk>/async/",
+        views.AsyncLibraryDetailView.as_view(),
+        name="library_detail_async",
+    ),
     path(
         "login/",
         LoginView.as_view(template_name="relationship_app/login.html"),